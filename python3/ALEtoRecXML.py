@@ -3,20 +3,25 @@
 #########################################
 ##  Author:         Wandrille Duchemin
 ##  Created:        20-June-2016
-##  Last modified:  10-Apr-2018
+##  Last modified:  18-Oct-2026
 ##
 ##  Decribes functions to transform a reconciled tree in
 ##  NHX format into a tree in the recPhyloXML format
 ##
 ##  requires : ete3 ( http://etetoolkit.org/ )
 ##             ReconciledTree , and ete3-based representation of a reconciled tree
+##             SpeciesTreeIndex
+##             RecPhyloXMLWriter
 ##
 ##  developped for python2.7
 ##
 #########################################
 
 from ete3 import Tree, TreeNode
-from ReconciledTree import RecEvent, ReconciledTree, myBasicTreeXMLLines
+from ReconciledTree import RecEvent, ReconciledTree
+from SpeciesTreeIndex import SpeciesTreeIndex, getSpeciesTreeIndex
+from RecPhyloXMLWriter import RecPhyloXMLWriter
+from CompressedFileIO import openFile
 
 def completeTreeNames(tree, useBS = False ) :
     """
@@ -373,10 +378,13 @@ def ConvertRTtoLossIndepVersion(RT , speciesTree = None, keptChildNameSuffix = "
 
     Takes:
         - RT (ReconciledTree): reconciled tree or subtree to convert
-        - speciesTree (ete3.Tree) [default = None] : species tree
+        - speciesTree (ete3.Tree or SpeciesTreeIndex) [default = None] : species tree
         - keptChildNameSuffix (str) [default = ".c"] : suffix to add to the name of the new child of node that is NOT a loss
     """
 
+    if not speciesTree is None:
+        speciesTree = getSpeciesTreeIndex(speciesTree) ## indexed once, at the root of the recursion
+
     for i, e in enumerate(RT.eventRecs):
 
         if len(e.eventCode)>1 and e.eventCode.endswith("L"):
@@ -467,10 +475,13 @@ if __name__ == "__main__":
                 Given a file containing reconciled trees in ALE reconciled tree format,
                 this script writes the trees in recPhyloXML format.
 
-                usage : python ALEtoRecPhyloXML.py -g geneFileIn [-o fileOut -s separator]
-                            -g geneFileIn       : name of the file containing NHX reconciliations
+                usage : python ALEtoRecPhyloXML.py -g geneFileIn [-o fileOut -s separator --compress.level level --compact]
+                            -g geneFileIn       : name of the file containing NHX reconciliations (may be compressed with gzip, bz2 or xz)
                             -o fileOut          : (optional) name of the output file (default is geneFileIn + ".xml" )
+                                                  it is compressed if its name ends with .gz, .bz2 or .xz
                             -s separator        : (optional) separator between species and gene name (default: "_")
+                            --compress.level level : (optional) compression level of the output file (1-9, by default the one of the compression library)
+                            --compact           : (optional) write the xml without indentation, each tree on a single line
 
                """
 #                            (TODO:)
@@ -485,10 +496,12 @@ if __name__ == "__main__":
     params = {
                             "-g"    : None ,#name of the file containing NHX reconciliations
                             "-o"    : None, #(optional) name of the output file (default is geneFileIn + ".xml" )
-                            "-s"    : "_" #sepparator
+                            "-s"    : "_", #sepparator
+                            "--compress.level" : None, #(optional) compression level of the output file
+                            "--compact" : False #(optional) write the xml without indentation
             }
 
-    flagArgs = ["--include.species"]
+    flagArgs = ["--include.species", "--compact"]
 
     for i in range(1,len(sys.argv)):
 
@@ -537,6 +550,16 @@ if __name__ == "__main__":
                 print ("error:",pname,"must be a positive number.")
                 OK = False
 
+        if not params["--compress.level"] is None:
+            try:
+                params["--compress.level"] = int(params["--compress.level"])
+                if not 1 <= params["--compress.level"] <= 9:
+                    print ("error: --compress.level must be an integer between 1 and 9.")
+                    OK = False
+            except:
+                print ("error: --compress.level must be an integer between 1 and 9.")
+                OK = False
+
     if not OK:
         print (help)
         exit(1)
@@ -550,98 +573,79 @@ if __name__ == "__main__":
 
 
 
-    OUT = open(params["-o"],"w")
+    ## each tree is written as soon as it is converted ; the closing tag is only written if the conversion succeeded
+    with RecPhyloXMLWriter(params["-o"], params["--compress.level"], None if params["--compact"] else "  ") as writer:
 
-    OUT.write( "<recPhylo>" + "\n" )
+        print ("reading input reconciled trees.")
 
-    indentLevel = 1
-    indentChar = "  "
+        spTree = None
+        spTreeIndex = None
+        isUndated = False
 
+        IN = openFile(params["-g"],"r")
 
+        l = IN.readline()
 
-    print ("reading input reconciled trees.")
-
-    spTree = None
-    isUndated = False
-
-    IN = open(params["-g"],"r")
-
-    l = IN.readline()
-
-    while l != "":
+        while l != "":
 
-        if l != "\n":
+            if l != "\n":
 
-            if l.startswith("("):##special ignore white lines
+                if l.startswith("("):##special ignore white lines
 
-                ALEtree = Tree( l, format = 1 )
+                    ALEtree = Tree( l, format = 1 )
 
-                while True:
+                    while True:
 
-                    try:
-                        RT = ALEtreeToReconciledTree(ALEtree, isUndated = isUndated , sepSp= params["-s"])
-                    except ValueError as v:
-                        if not isUndated:
-                            print("encountered ValueError. Trying to read in undated format.")
-                            isUndated = True
-                        else:
-                            print("encountered ValueError even when trying to read in undated format.")
-                            print("error: {0}".format(v))
-                            print("abort.")
+                        try:
+                            RT = ALEtreeToReconciledTree(ALEtree, isUndated = isUndated , sepSp= params["-s"])
+                        except ValueError as v:
+                            if not isUndated:
+                                print("encountered ValueError. Trying to read in undated format.")
+                                isUndated = True
+                            else:
+                                print("encountered ValueError even when trying to read in undated format.")
+                                print("error: {0}".format(v))
+                                print("abort.")
+                                exit(1)
+                        except Exception as e:
+                            print("encountered error: {0}".format(e))
+                            print("this may be due to an incorrect separator between species and gene id.")
+                            print("current separator: '"+params["-s"]+"'. You can change it using option -s.")
                             exit(1)
-                    except Exception as e:
-                        print("encountered error: {0}".format(e))
-                        print("this may be due to an incorrect separator between species and gene id.")
-                        print("current separator: '"+params["-s"]+"'. You can change it using option -s.")
-                        exit(1)
-                    else:
-                        print("Reconciled tree successfuly read.")
-                        break
-
-
-                if isUndated:
-                    refineReconciledTreeWithTransferBack(RT)
-
-                ConvertRTtoLossIndepVersion(RT , speciesTree = spTree, keptChildNameSuffix = ".c")
-
-
-                XMLlines = RT.getTreeRecPhyloXMLLines()
+                        else:
+                            print("Reconciled tree successfuly read.")
+                            break
 
-                for xmlline in XMLlines:
-                    OUT.write( indentLevel * indentChar + xmlline + "\n" )
 
+                    if isUndated:
+                        refineReconciledTreeWithTransferBack(RT)
 
-            elif l.startswith("S:"):
-                ## found a species tree!
-                treeLine = l[2:].strip()
-                print (treeLine)
+                    ConvertRTtoLossIndepVersion(RT , speciesTree = spTreeIndex, keptChildNameSuffix = ".c")
 
-                spTree = Tree( treeLine , format = 1 )
 
-                spTree = completeTreeNames( spTree , True)
+                    writer.write_tree(RT)
 
-                OUT.write( indentLevel * indentChar + "<spTree>" + "\n")
 
-                indentLevel += 1
-                lines = myBasicTreeXMLLines(spTree)
-                for xmlline in lines:
-                        OUT.write( indentLevel * indentChar + xmlline + "\n" )
+                elif l.startswith("S:"):
+                    ## found a species tree!
+                    treeLine = l[2:].strip()
+                    print (treeLine)
 
-                indentLevel -= 1
-                OUT.write( indentLevel * indentChar + "</spTree>" + "\n")
+                    spTree = Tree( treeLine , format = 1 )
 
+                    spTree = completeTreeNames( spTree , True)
 
-            elif l.startswith("#ALE"): ## trying to recognise "#ALE****_undated " prefix
-                if l.partition("_")[2].startswith("undated "):
-                    isUndated = True
+                    spTreeIndex = SpeciesTreeIndex( spTree )
 
-        l = IN.readline()
+                    writer.write_species_tree(spTree)
 
-    IN.close()
 
+                elif l.startswith("#ALE"): ## trying to recognise "#ALE****_undated " prefix
+                    if l.partition("_")[2].startswith("undated "):
+                        isUndated = True
 
-    OUT.write( "</recPhylo>" + "\n" )
+            l = IN.readline()
 
-    OUT.close()
+        IN.close()
 
     print ("reconciled tree converted and written.")
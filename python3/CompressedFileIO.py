@@ -0,0 +1,120 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        18-Oct-2026
+##  Last modified:  18-Oct-2026
+##
+##  Decribes functions to open plain, gzip, bz2 or xz files transparently :
+##          the compression of an input file is detected from its first bytes,
+##          the compression of an output file is chosen from its extension.
+##          Data is streamed through the (de)compressor, without temporary file.
+##
+##  requires : gzip, bz2, lzma ( in standard library )
+##
+##  developped for python3.0
+##
+#########################################
+
+import gzip
+import bz2
+import lzma
+
+
+COMPRESSION_MAGIC = [ ( b"\x1f\x8b" , "gzip" ),
+                      ( b"BZh" , "bz2" ),
+                      ( b"\xfd7zXZ\x00" , "xz" ) ]
+
+COMPRESSION_EXTENSIONS = { ".gz" : "gzip",
+                           ".gzip" : "gzip",
+                           ".bz2" : "bz2",
+                           ".xz" : "xz",
+                           ".lzma" : "xz" }
+
+## compression levels accepted by each compression library
+COMPRESSION_LEVELS = { "gzip" : range(0, 10),
+                       "bz2" : range(1, 10),
+                       "xz" : range(0, 10) }
+
+
+def getCompressionFromExtension(fileName):
+    """
+    Takes:
+        - fileName (str) : name of a file
+
+    Returns:
+        (str) : "gzip", "bz2" or "xz" according to the extension of the file name
+            or
+        None : if the extension does not correspond to a known compression
+    """
+    for ext, compression in COMPRESSION_EXTENSIONS.items():
+        if fileName.lower().endswith(ext):
+            return compression
+    return None
+
+
+def getCompression(fileName):
+    """
+    Takes:
+        - fileName (str) : name of an existing file
+
+    Returns:
+        (str) : "gzip", "bz2" or "xz" according to the first bytes of the file
+            or
+        None : if the file is not compressed in one of these formats
+    """
+    IN = open(fileName, "rb")
+    head = IN.read(6)
+    IN.close()
+
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def openFile(fileName, mode = "r", compressLevel = None):
+    """
+    Opens a file, compressed or not, as the builtin open would.
+
+    Takes:
+        - fileName (str) : name of the file
+        - mode (str) [default = "r"] : "r", "rb", "w", "wb", "a" or "ab"
+                                       (when reading, the compression is detected from the first bytes of the file ;
+                                        when writing, it is chosen from the extension of the file name)
+        - compressLevel (int) [default = None] : compression level when writing a compressed file
+                                                 (0 to 9 for gzip and xz, 1 to 9 for bz2 ; by default the level of the compression library)
+
+    Returns:
+        (file object) : the opened file
+    """
+
+    if mode.startswith("r"):
+        compression = getCompression(fileName)
+    else:
+        compression = getCompressionFromExtension(fileName)
+
+    if compression is None:
+        return open(fileName, mode)
+
+    if not compressLevel is None and not mode.startswith("r") and not compressLevel in COMPRESSION_LEVELS[compression]:
+        levels = COMPRESSION_LEVELS[compression]
+        raise Exception("recPhyloXML exception. Invalid compression level " + str(compressLevel) + " for " + compression + " : expected an integer between " + str(levels[0]) + " and " + str(levels[-1]) + ".")
+
+    if not "b" in mode:
+        mode += "t"
+
+    if compression == "gzip":
+        if compressLevel is None or mode.startswith("r"):
+            return gzip.open(fileName, mode)
+        return gzip.open(fileName, mode, compresslevel = compressLevel)
+
+    if compression == "bz2":
+        if compressLevel is None or mode.startswith("r"):
+            return bz2.open(fileName, mode)
+        return bz2.open(fileName, mode, compresslevel = compressLevel)
+
+    if compressLevel is None or mode.startswith("r"):
+        return lzma.open(fileName, mode)
+    return lzma.open(fileName, mode, preset = compressLevel)
@@ -0,0 +1,158 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        18-Oct-2026
+##  Last modified:  18-Oct-2026
+##
+##  Decribes functions writing the rows of an event table (see ReconciledTreeBase.iter_event_rows)
+##          to a tab-separated file, or to a .npy file holding a structured numpy array.
+##  The rows are consumed as they come : the memory used does not depend on the number of rows.
+##
+##  example :
+##      writeEventRowsTSV( RTL.iter_event_rows() , "events.tsv.gz" )
+##
+##  requires : ReconciledTreeBase.py
+##             CompressedFileIO.py
+##             numpy ( https://numpy.org/ , for writeEventRowsNpy only )
+##
+##  developped for python3.0
+##
+#########################################
+
+from ReconciledTreeBase import EVENT_ROW_FIELDS
+from CompressedFileIO import openFile
+
+import tempfile
+
+
+## value of the integer fields of the .npy event tables which are None in the rows
+NO_VALUE = -1
+
+## number of rows converted to a numpy array at once by writeEventRowsNpy
+EVENT_ROWS_CHUNK_SIZE = 2**16
+
+## fields of the rows holding integers ; the others hold strings
+EVENT_ROW_INT_FIELDS = { "tree_id" : "int64" , "event_index" : "int32" , "time_slice" : "int32" }
+
+
+def writeEventRowsTSV(rows, fileobj, compressLevel = None, header = True):
+    """
+    Takes:
+        - rows (iterable) : rows of an event table (tuples of the fields of EVENT_ROW_FIELDS)
+        - fileobj (str or file object) : name of the file to write (compressed if its name ends with .gz, .bz2 or .xz)
+                                         or a handle opened in text mode
+        - compressLevel (int) [default = None] : compression level when fileobj is the name of a compressed file
+        - header (bool) [default = True] : if True, the first line gives the names of the fields
+
+    Returns:
+        (int) : the number of rows written (None fields are written as empty strings)
+    """
+    OUT = fileobj
+    if isinstance(fileobj, str):
+        OUT = openFile(fileobj, "w", compressLevel)
+
+    if header:
+        OUT.write( "\t".join(EVENT_ROW_FIELDS) + "\n" )
+
+    nbRows = 0
+    for row in rows:
+        OUT.write( "\t".join( "" if v is None else str(v) for v in row ) + "\n" )
+        nbRows += 1
+
+    if isinstance(fileobj, str):
+        OUT.close()
+    else:
+        OUT.flush()
+
+    return nbRows
+
+
+def getEventRowsDtype(widths):
+    """
+    Takes:
+        - widths (dict) : field -> maximum length of the strings of the field, for the fields which hold strings
+
+    Returns:
+        (numpy.dtype) : structured dtype of the rows of an event table
+    """
+    import numpy as np
+
+    return np.dtype( [ ( f , EVENT_ROW_INT_FIELDS[f] if f in EVENT_ROW_INT_FIELDS else "U" + str( max( 1 , widths[f] ) ) ) for f in EVENT_ROW_FIELDS ] )
+
+
+def getEventRowsChunk(chunk, widths):
+    """
+    *modifies widths in place*
+
+    Takes:
+        - chunk (list) : rows of an event table
+        - widths (dict) : field -> maximum length of the strings of the field ; updated with the strings of the chunk
+
+    Returns:
+        (numpy.ndarray) : the rows as a structured array (None strings are empty strings, None integers are NO_VALUE)
+    """
+    import numpy as np
+
+    columns = []
+    for j, f in enumerate(EVENT_ROW_FIELDS):
+        if f in EVENT_ROW_INT_FIELDS:
+            columns.append( [ NO_VALUE if row[j] is None else row[j] for row in chunk ] )
+        else:
+            column = [ "" if row[j] is None else str(row[j]) for row in chunk ]
+            widths[f] = max( [ widths[f] ] + [ len(s) for s in column ] )
+            columns.append(column)
+
+    array = np.empty( len(chunk) , dtype = getEventRowsDtype(widths) )
+    for f, column in zip(EVENT_ROW_FIELDS, columns):
+        array[f] = column
+    return array
+
+
+def writeEventRowsNpy(rows, fileName, chunkSize = EVENT_ROWS_CHUNK_SIZE):
+    """
+    Writes the rows of an event table as a 1-dimensional structured numpy array (see getEventRowsDtype), readable with numpy.load.
+    The rows are converted by chunks, kept in a temporary file until the width of the string fields is known :
+    the memory used is bounded by the size of a chunk.
+
+    Takes:
+        - rows (iterable) : rows of an event table (tuples of the fields of EVENT_ROW_FIELDS)
+        - fileName (str) : name of the .npy file to write
+        - chunkSize (int) [default = EVENT_ROWS_CHUNK_SIZE] : number of rows converted at once
+
+    Returns:
+        (int) : the number of rows written (None strings are written as empty strings, None integers as NO_VALUE)
+    """
+    import numpy as np
+
+    widths = { f : 0 for f in EVENT_ROW_FIELDS if not f in EVENT_ROW_INT_FIELDS }
+    nbRows = 0
+    nbChunks = 0
+
+    with tempfile.TemporaryFile() as TMP:
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunkSize:
+                np.save( TMP , getEventRowsChunk(chunk, widths) )
+                nbRows += len(chunk)
+                nbChunks += 1
+                chunk = []
+
+        if len(chunk) > 0 or nbChunks == 0:
+            np.save( TMP , getEventRowsChunk(chunk, widths) )
+            nbRows += len(chunk)
+            nbChunks += 1
+
+        ## the chunks are widened to the final dtype as they are copied after the header
+        dtype = getEventRowsDtype(widths)
+
+        TMP.seek(0)
+        with open(fileName, "wb") as OUT:
+            np.lib.format.write_array_header_1_0( OUT , { "descr" : np.lib.format.dtype_to_descr(dtype) , "fortran_order" : False , "shape" : ( nbRows , ) } )
+            for i in range(nbChunks):
+                OUT.write( np.load(TMP).astype(dtype).tobytes() )
+
+    return nbRows
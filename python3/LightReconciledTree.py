@@ -0,0 +1,297 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        18-Oct-2026
+##  Last modified:  18-Oct-2026
+##
+##  Decribes 2 classes : LightTree and LightReconciledTree
+##          which are lightweight, ete3-free, replacements for ete3.Tree and ReconciledTree :
+##          their nodes only hold their children, parent, name, features (and events),
+##          and they implement the subset of the ete3.TreeNode interface used by the scripts of this repository.
+##          They can be converted to ete3 trees on demand (toEte3).
+##
+##  requires : RecEvent.py
+##             ReconciledTreeBase.py
+##             ete3 ( http://etetoolkit.org/ ) : only for toEte3
+##
+##  developped for python3.0
+##
+#########################################
+
+from collections import deque
+
+from ReconciledTreeBase import ReconciledTreeBase
+
+
+class LightTree:
+    """
+    A node of a tree, with the subset of the ete3.TreeNode interface used in this repository.
+
+    Atributes:
+        - self.children : (list) the children of the node
+        - self.up       : the parent of the node (None for the root)
+        - self.name     : the name of the node
+        - self.features : (dict) other features of the node ; they can also be read as attributes of the node, as with ete3
+    """
+    __slots__ = ("children", "up", "name", "features")
+
+    def __init__(self, name = ""):
+        self.children = []
+        self.up = None
+        self.name = name
+        self.features = {}
+
+    def __getattr__(self, name):
+        """ features are reachable as attributes, as with ete3 """
+        if name == "features" or name.startswith("__"):
+            raise AttributeError(name)
+        try:
+            return self.features[name]
+        except KeyError:
+            raise AttributeError("'" + self.__class__.__name__ + "' object has no attribute '" + name + "'")
+
+    def getAttributes(self):
+        """
+        Returns:
+            (dict) : the attributes of the node, except its children and parent
+        """
+        return { "name" : self.name , "features" : self.features }
+
+    def setAttributes(self, attributes):
+        """
+        Takes:
+            - attributes (dict) : attributes returned by getAttributes
+        """
+        self.name = attributes["name"]
+        self.features = attributes["features"]
+
+
+    def add_feature(self, name, value):
+        self.features[name] = value
+
+    def add_features(self, **features):
+        self.features.update(features)
+
+    def del_feature(self, name):
+        self.features.pop(name, None)
+
+
+    def get_children(self):
+        return list(self.children)
+
+    def add_child(self, child = None, name = None):
+        """
+        Takes:
+            - child (LightTree) [default = None] : the node to add (by default a new node is created)
+            - name (str) [default = None] : if not None, the name given to the child
+
+        Returns:
+            (LightTree) : the child
+        """
+        if child is None:
+            child = self.__class__()
+        if not name is None:
+            child.name = name
+        child.up = self
+        self.children.append(child)
+        return child
+
+    def remove_child(self, child):
+        self.children.remove(child)
+        child.up = None
+        return child
+
+    def is_leaf(self):
+        return len(self.children) == 0
+
+    def is_root(self):
+        return self.up is None
+
+    def get_tree_root(self):
+        node = self
+        while not node.up is None:
+            node = node.up
+        return node
+
+    def get_sisters(self):
+        if self.up is None:
+            return []
+        return [ ch for ch in self.up.children if not ch is self ]
+
+
+    def traverse(self, strategy = "levelorder"):
+        """
+        *generator*
+
+        Takes:
+            - strategy (str) [default = "levelorder"] : "levelorder", "preorder" or "postorder" (as in ete3)
+
+        Yields:
+            (LightTree) : the nodes of the subtree rooted at this node
+        """
+        if strategy == "levelorder":
+            queue = deque([ self ])
+            while len(queue) > 0:
+                node = queue.popleft()
+                yield node
+                queue.extend(node.children)
+
+        elif strategy == "preorder":
+            stack = [ self ]
+            while len(stack) > 0:
+                node = stack.pop()
+                yield node
+                stack.extend( reversed(node.children) )
+
+        elif strategy == "postorder":
+            stack = [ ( self , False ) ]
+            while len(stack) > 0:
+                node , childrenDone = stack.pop()
+                if childrenDone or len(node.children) == 0:
+                    yield node
+                    continue
+                stack.append( ( node , True ) )
+                for ch in reversed(node.children):
+                    stack.append( ( ch , False ) )
+
+        else:
+            raise Exception("recPhyloXML exception. Unknown traversal strategy " + str(strategy) + ".")
+
+    def iter_descendants(self, strategy = "levelorder"):
+        for node in self.traverse(strategy):
+            if not node is self:
+                yield node
+
+    def get_descendants(self, strategy = "levelorder"):
+        return list(self.iter_descendants(strategy))
+
+    def iter_leaves(self):
+        for node in self.traverse("preorder"):
+            if len(node.children) == 0:
+                yield node
+
+    def get_leaves(self):
+        return list(self.iter_leaves())
+
+    def get_leaf_names(self):
+        return [ n.name for n in self.iter_leaves() ]
+
+    def search_nodes(self, **conditions):
+        """
+        Returns:
+            (list) : the nodes of the subtree whose features (or name) have the given values
+        """
+        return [ n for n in self.traverse() if all( getattr(n, k, None) == v for k, v in conditions.items() ) ]
+
+
+    def toEte3(self):
+        """
+        Returns:
+            (ete3.Tree) : a copy of the (sub-)tree rooted at this node, as an ete3 tree
+        """
+        import ete3
+        return self.convertTree( ete3.Tree )
+
+    def newEte3Node(self, nodeClass):
+        """ see toEte3 """
+        node = nodeClass()
+        node.name = self.name
+        if len(self.features) > 0:
+            node.add_features( **self.features )
+        return node
+
+    def convertTree(self, nodeClass):
+        """
+        Takes:
+            - nodeClass (class) : class of the nodes of the copy
+
+        Returns:
+            a copy of the (sub-)tree rooted at this node, whose nodes are built by newEte3Node
+        """
+        root = self.newEte3Node(nodeClass)
+
+        stack = [ ( self , root ) ]
+        while len(stack) > 0:
+            node , copy = stack.pop()
+            for ch in node.children:
+                chCopy = ch.newEte3Node(nodeClass)
+                copy.add_child(chCopy)
+                stack.append( ( ch , chCopy ) )
+
+        return root
+
+    @classmethod
+    def fromEte3(cls, tree):
+        """
+        Takes:
+            - tree (ete3.TreeNode) : a tree (NB: its dist and support are kept as features)
+
+        Returns:
+            (LightTree) : a copy of the tree, with nodes of this class
+        """
+        root = cls.newFromEte3Node(tree)
+
+        stack = [ ( tree , root ) ]
+        while len(stack) > 0:
+            node , copy = stack.pop()
+            for ch in node.children:
+                chCopy = cls.newFromEte3Node(ch)
+                copy.add_child(chCopy)
+                stack.append( ( ch , chCopy ) )
+
+        return root
+
+    @classmethod
+    def newFromEte3Node(cls, node):
+        """ see fromEte3 """
+        copy = cls()
+        copy.name = node.name
+        for f in node.features:
+            if f != "name":
+                copy.features[f] = getattr(node, f)
+        return copy
+
+
+class LightReconciledTree(ReconciledTreeBase, LightTree):
+    """
+    A node of a reconciled gene tree, without ete3 (see ReconciledTree for the ete3-based version).
+
+    Atributes:
+        - self.eventRecs : (list) the reconciliation events of the node (RecEvent)
+        (and those of LightTree)
+    """
+    __slots__ = ("eventRecs",)
+
+    def __init__(self, name = ""):
+        LightTree.__init__(self, name)
+        self.eventRecs = []
+
+    def getAttributes(self):
+        attributes = LightTree.getAttributes(self)
+        attributes["eventRecs"] = self.eventRecs
+        return attributes
+
+    def setAttributes(self, attributes):
+        LightTree.setAttributes(self, attributes)
+        self.eventRecs = attributes["eventRecs"]
+
+    def toEte3(self):
+        """
+        Returns:
+            (ReconciledTree) : a copy of the (sub-)tree rooted at this node, as an ete3-based ReconciledTree (the events are shared)
+        """
+        from ReconciledTree import ReconciledTree
+        return self.convertTree( ReconciledTree )
+
+    def newEte3Node(self, nodeClass):
+        node = LightTree.newEte3Node(self, nodeClass)
+        node.eventRecs = list(self.eventRecs)
+        return node
+
+    @classmethod
+    def newFromEte3Node(cls, node):
+        copy = super().newFromEte3Node(node)
+        copy.eventRecs = list(node.eventRecs)
+        return copy
@@ -0,0 +1,346 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        24-Feb-2017
+##  Last modified:  18-Oct-2026
+##
+##  Decribes functions to transform a reconciled tree in
+##  NHX format into a tree in the recPhyloXML format
+##
+##  requires : ete3 ( http://etetoolkit.org/ )
+##             ReconciledTree , and ete3-based representation of a reconciled tree
+##             SpeciesTreeIndex
+##             RecPhyloXMLWriter
+##             CompressedFileIO
+##
+##  developped for python3.0
+##
+#########################################
+
+
+from ete3 import Tree, TreeNode
+from ReconciledTree import RecEvent, ReconciledTree
+from SpeciesTreeIndex import SpeciesTreeIndex, getSpeciesTreeIndex
+from RecPhyloXMLWriter import RecPhyloXMLWriter
+from CompressedFileIO import openFile
+
+
+def NHXtreeToBasicRecTree(nhxTree , spTree = None):
+    """
+    *RECURSIVE*
+
+    From a tree read in a NHX format file to a ReconciledTree without any intermediary events (SpeciationLoss events)
+
+    Takes:
+        - nhxTree (ete3.TreeNode) : tree read from a NHX formatted line
+        - spTree (ete3.Tree or SpeciesTreeIndex or None) [default = None] : if different from None,
+                                            internal node's events associated to species whose name is in the species tree will be kept as such
+                                                        if equal to None,
+                                            only leaves get to keep their associated species (and species of other events will have to be re-associated later)
+
+    Returns:
+        (ReconciledTree)
+
+    """
+
+    if not spTree is None:
+        spTree = getSpeciesTreeIndex(spTree) ## indexed once, at the root of the recursion
+
+    RT = ReconciledTree()
+
+    eventCode = None
+    species = None
+
+    ## only terminal events in a DL context are considered here : leaf, speciation or duplication
+
+    if nhxTree.is_leaf():
+        eventCode = "C"
+        species = nhxTree.S
+        ## we only get the species for the leaves
+        ##( as they are the only one where we   are sure the species is one that is present in the species tree)
+
+    elif nhxTree.D == "Y":
+        eventCode = "D"
+    else:
+        eventCode = "S"
+
+    if not spTree is None:
+        if nhxTree.S in spTree and not nhxTree.S in spTree.ambiguousIds: ## exactly one node of the species tree has this name
+            species = nhxTree.S
+
+
+    ##additional info:
+    for f in nhxTree.features:
+        RT.add_feature( f , getattr(nhxTree, f) )
+
+    evt = RecEvent(eventCode , species)
+    RT.addEvent(evt)
+
+    for c in nhxTree.children:
+        RT.add_child( NHXtreeToBasicRecTree(c , spTree) )
+    return RT
+
+
+def completeTreeNames(tree):
+    """
+    Takes:
+        - tree (ete3.Tree)
+
+    Returns:
+        (ete3.Tree) : the tree, but where the nodes without a name now have one that correspond
+                    to their post-order
+
+    """
+
+    for i,n in enumerate(tree.traverse('postorder')):
+        if n.name == "":
+            n.name = str(i)
+    return tree
+
+def annotateIncompleteRecRTree(recTree , spTree):
+    """
+    Takes:
+        - recTree (ReconciledTree)
+        - spTree (ete3.Tree or SpeciesTreeIndex)
+
+    Returns:
+        (ReconciledTree) : recTree, where the events without species have been assigned one and SpeciationLoss events have been added
+    """
+    ### post order traverse
+    ## -> setup species using LCA of children
+    ## -> add SL using dist from parent to CH
+
+    ## for quicker access
+    spTreeIndex = getSpeciesTreeIndex(spTree)
+
+    NODETODO = [n for n in recTree.traverse("postorder")]
+    for n in NODETODO:
+
+        if n.is_leaf():
+            continue
+
+        childrenSpecies = []
+        for c in n.children:
+            spIndex = spTreeIndex.idToIndex.get( c.getEvents()[-1].species , None)
+
+            if spIndex is None: ##overkill
+                print("ERROR : species",c.getEvents()[-1].species,"unknown...")
+                exit(1)
+            childrenSpecies.append( spIndex )
+
+        if n.getEvents()[-1].species is None:
+            ## we have to assign a species
+            ## we assign the LCA (this is a little 'by default' and presume parsimony)
+
+            lca = childrenSpecies[0]
+            for spIndex in childrenSpecies[1:]:
+                lca = spTreeIndex.getLCAIndex( lca , spIndex )
+
+            n.getEvents()[-1].species = spTreeIndex.ids[lca]
+
+
+        currentSpIndex = spTreeIndex.idToIndex.get( n.getEvents()[-1].species , None)
+
+        if currentSpIndex is None:
+            print("ERROR : species",n.getEvents()[-1].species,"unknown...")
+            exit(1)
+
+
+        ChSpMustBeEqual = ( n.getEvents()[-1].eventCode != "S" ) ##unless this is a speciation, the next event shall have the same species
+
+
+        ## now we want to add SL events
+        for i,c in enumerate(n.children):
+
+            childrenSpIndex = childrenSpecies[i]
+
+            if childrenSpIndex == currentSpIndex:
+                continue ## already ok
+
+            if not currentSpIndex <= childrenSpIndex <= spTreeIndex.lastDescendants[currentSpIndex]:
+                print("ERROR : species",spTreeIndex.ids[childrenSpIndex],"is not a descendant of species",spTreeIndex.ids[currentSpIndex],"...")
+                exit(1)
+
+            while spTreeIndex.parents[childrenSpIndex] != currentSpIndex:
+                addSpeciationAndLoss(c , childrenSpIndex , spTreeIndex)
+
+                childrenSpIndex = spTreeIndex.parents[childrenSpIndex]
+
+            ## last SL in case the parent is not a speciation
+            if ChSpMustBeEqual:
+                addSpeciationAndLoss(c , childrenSpIndex , spTreeIndex)
+
+    return recTree
+
+
+def addSpeciationAndLoss(node , keptSpeciesIndex , spTreeIndex):
+    """
+    *modifies node in place*
+
+    Takes:
+        - node (ReconciledTree): node where a SpeciationLoss must take place
+        - keptSpeciesIndex (int): index, in spTreeIndex, of the node of the species tree where the lineage survived (ie. the sister species of the one where the loss occured)
+        - spTreeIndex (SpeciesTreeIndex): index of the species tree
+    """
+    parentSpeciesIndex = spTreeIndex.parents[keptSpeciesIndex]
+    lossSpeciesIndex = spTreeIndex.sisters[keptSpeciesIndex]
+
+    if lossSpeciesIndex == -1:
+        raise Exception("tree format error: expected a binary tree")
+
+    lossNode = ReconciledTree()
+    lossNode.addEvent( RecEvent("loss" , spTreeIndex.ids[lossSpeciesIndex]) )
+    lossNode.name="LOSS"
+
+    # 2. create the kept child
+
+    keptNode = ReconciledTree()
+
+    ##transfering the events of node to keptNode
+    while len(node.eventRecs) >  0:
+        keptNode.addEvent( node.popEvent(0), append=False )
+
+    # 3. link children to kept child
+    while len(node.children) > 0:
+        c = node.children[0]
+        c.detach()
+        keptNode.add_child(c)
+
+
+    # 4. branching loss and kept to original node
+
+    node.add_child(lossNode)
+    node.add_child(keptNode)
+
+    # 5. editing the event
+    e = RecEvent( "S" , spTreeIndex.ids[parentSpeciesIndex] )
+    node.addEvent( e,append = False) ##will insert the evt in first position
+
+    return
+
+
+import sys
+
+if __name__ == "__main__":
+
+    help =  """
+                Given a file containing reconciled trees in NHX format (and containing no transfers),
+                and their species tree in newick format
+                this script writes the trees in recPhyloXML format.
+
+                usage : python NHXtoRecPhyloXML.py -g geneFileIn -s speciesFileIn [-o fileOut --include.species --compress.level level --compact]
+                            -g geneFileIn       : name of the file containing NHX reconciliations (may be compressed with gzip, bz2 or xz)
+                            -s speciesFileIn    : name of the species tree file
+                            -o fileOut          : (optional) name of the output file (default is geneFileIn + ".xml" )
+                                                  it is compressed if its name ends with .gz, .bz2 or .xz
+                            --include.species   : (optional) whether the species tree should be included in the XML file (using the <spTree> tag)
+                            --compress.level level : (optional) compression level of the output file (1-9, by default the one of the compression library)
+                            --compact           : (optional) write the xml without indentation, each tree on a single line
+               """
+
+
+    OK = True
+
+    nextKEY = None
+    params = {
+                            "-g"    : None ,#name of the file containing NHX reconciliations
+                            "-s"    : None ,#name of the species tree file
+                            "-o"    : None ,#(optional) name of the output file (default is geneFileIn + ".xml" )
+                            "--include.species"   : False ,#(optional) whether the species tree should be included in the XML file (using the <spTree> tag)
+                            "--compress.level" : None ,#(optional) compression level of the output file
+                            "--compact" : False #(optional) write the xml without indentation
+            }
+
+    flagArgs = ["--include.species", "--compact"]
+
+    for i in range(1,len(sys.argv)):
+
+        if not nextKEY is None:
+            params[nextKEY] = sys.argv[i]
+            print ("argument ",nextKEY,":", sys.argv[i])
+            nextKEY = None
+            continue
+
+        if sys.argv[i] in params.keys():
+
+            if sys.argv[i] in flagArgs:
+                params[sys.argv[i]] = True
+                print (sys.argv[i],"flag activated")
+            else:
+                nextKEY = sys.argv[i]
+            continue
+        else:
+            print ("unknown argument", sys.argv[i])
+
+    if params["-g"] is None:
+        OK = False
+        print ("error: gene input file not given.")
+    if params["-s"] is None:
+        OK = False
+        print ("error: species input file not given.")
+
+    if OK:
+
+        if not params["--compress.level"] is None:
+            try:
+                params["--compress.level"] = int(params["--compress.level"])
+                if not 1 <= params["--compress.level"] <= 9:
+                    print ("error: --compress.level must be an integer between 1 and 9.")
+                    OK = False
+            except:
+                print ("error: --compress.level must be an integer between 1 and 9.")
+                OK = False
+
+    if not OK:
+        print (help)
+        exit(1)
+
+
+
+    defaultOutputSuffix = ".xml"
+    if params["-o"] is None:
+        params["-o"] = params["-g"] + defaultOutputSuffix
+
+
+    print ("reading input species tree.")
+
+    spTree = Tree( params["-s"] )
+
+    spTree = completeTreeNames( spTree )
+
+    spTreeIndex = SpeciesTreeIndex( spTree ) ## built once for all the gene trees
+
+
+    ## each tree is written as soon as it is converted ; the closing tag is only written if the conversion succeeded
+    with RecPhyloXMLWriter(params["-o"], params["--compress.level"], None if params["--compact"] else "  ") as writer:
+
+        if params["--include.species"]:
+
+            writer.write_species_tree(spTree)
+
+        print ("reading input reconciled trees.")
+
+        IN = openFile(params["-g"],"r")
+
+        l = IN.readline()
+
+        while l != "":
+
+            if l != "\n":##special ignore white lines
+
+                NHXTree = Tree(l)
+
+                RT = NHXtreeToBasicRecTree(NHXTree , spTreeIndex)
+
+                RT = annotateIncompleteRecRTree(RT,spTreeIndex)
+
+                RT = completeTreeNames(RT)
+
+                writer.write_tree(RT)
+
+
+            l = IN.readline()
+
+        IN.close()
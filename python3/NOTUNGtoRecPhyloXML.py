@@ -4,7 +4,7 @@
 #########################################
 ##  Author:         Wandrille Duchemin  
 ##  Created:        22-Mar-2017         
-##  Last modified:  08-Jan-2021        
+##  Last modified:  18-Oct-2026        
 ##
 ##  Decribes functions to transform a reconciled tree in 
 ##  NOTUNG format into a tree in the recPhyloXML format
@@ -19,24 +19,24 @@
 
 import ete3 
 from ReconciledTree import RecEvent, ReconciledTree
+from CompressedFileIO import openFile
 
-def myBasicTreeXMLLinesAux(tree):
+def myBasicTreeXMLLinesAux(tree, indentChar = "  "):
     """
     Takes:
         - tree (ete3.TreeNode)
+        - indentChar (str) [default = "  "] : indentation of one level
 
     Returns:
         (list): list of xml lines
     """
 
-    indentChar = "  "
-
     lines = ["<clade>"]
 
     lines.append( indentChar + "<name>" + tree.name + "</name>" )
 
     for c in tree.children:
-        tmp = myBasicTreeXMLLinesAux(c)
+        tmp = myBasicTreeXMLLinesAux(c, indentChar)
         for l in tmp:
             lines.append( indentChar + l )
 
@@ -44,17 +44,17 @@ def myBasicTreeXMLLinesAux(tree):
 
     return lines
 
-def myBasicTreeXMLLines(tree):
+def myBasicTreeXMLLines(tree, indentChar = "  "):
     """
     Takes:
         - tree (ete3.TreeNode)
+        - indentChar (str) [default = "  "] : indentation of one level
 
     Returns:
         (list): list of xml lines
     """
     lines = ["<phylogeny>"]
-    indentChar = "  "
-    tmp = myBasicTreeXMLLinesAux(tree)
+    tmp = myBasicTreeXMLLinesAux(tree, indentChar)
     for l in tmp:
             lines.append( indentChar + l )
 
@@ -301,11 +301,14 @@ if __name__ == "__main__":
                 Given a file containing a reconciled tree in NOTUNG format, 
                 this script writes the tree in recPhyloXML format.
 
-                usage : python NOTUNGtoRecPhyloXML.py -g geneFileIn [-o fileOut ]
-                            -g geneFileIn       : name of the file containing NOTUNG reconciliations
+                usage : python NOTUNGtoRecPhyloXML.py -g geneFileIn [-o fileOut --compress.level level --compact]
+                            -g geneFileIn       : name of the file containing NOTUNG reconciliations (may be compressed with gzip, bz2 or xz)
                             -o fileOut          : (optional) name of the output file (default is geneFileIn + ".xml" )
+                                                  it is compressed if its name ends with .gz, .bz2 or .xz
+                            --compress.level level : (optional) compression level of the output file (1-9, by default the one of the compression library)
 
                             --include.species   : (optional) whether the species tree should be included in the XML file (using the <spTree> tag)
+                            --compact           : (optional) write the xml without indentation nor line breaks
                """
 
 
@@ -315,10 +318,12 @@ if __name__ == "__main__":
     params = {
                             "-g"    : None ,#name of the file containing NHX reconciliations                        
                             "-o"    : None ,#(optional) name of the output file (default is geneFileIn + ".xml" )
-                            "--include.species" : False #(optional) whether the species tree should be included in the XML file (using the <spTree> tag)
+                            "--include.species" : False, #(optional) whether the species tree should be included in the XML file (using the <spTree> tag)
+                            "--compress.level" : None, #(optional) compression level of the output file
+                            "--compact" : False #(optional) write the xml without indentation nor line breaks
             }
 
-    flagArgs = ["--include.species"]
+    flagArgs = ["--include.species", "--compact"]
 
     for i in range(1,len(sys.argv)):
 
@@ -344,6 +349,16 @@ if __name__ == "__main__":
         OK = False
         print( "error: gene input file not given." )
 
+    if not params["--compress.level"] is None:
+        try:
+            params["--compress.level"] = int(params["--compress.level"])
+            if not 1 <= params["--compress.level"] <= 9:
+                print( "error: --compress.level must be an integer between 1 and 9." )
+                OK = False
+        except:
+            print( "error: --compress.level must be an integer between 1 and 9." )
+            OK = False
+
 
 
     if not OK:
@@ -360,7 +375,7 @@ if __name__ == "__main__":
     #print "reading input gene tree."
 
 
-    IN = open(params["-g"],"r")
+    IN = openFile(params["-g"],"r")
 
     geneLine = IN.readline()
 
@@ -376,40 +391,48 @@ if __name__ == "__main__":
     speciesTree = ete3.Tree(speciesLine , format = 1)
 
 
-    OUT = open(params["-o"],"w")
+    OUT = openFile(params["-o"],"w", params["--compress.level"])
 
     indentLevel = 0
     indentChar = "  "
+    lineEnd = "\n"
+
+    if params["--compact"]:
+        indentChar = ""
+        lineEnd = ""
 
     if params["--include.species"]:
 
-        OUT.write( "<recPhylo>" + "\n" )
+        OUT.write( "<recPhylo>" + lineEnd )
     
         indentLevel += 1
 
-        OUT.write( indentLevel * indentChar + "<spTree>" + "\n")
+        OUT.write( indentLevel * indentChar + "<spTree>" + lineEnd)
 
         indentLevel += 1
         
-        lines = myBasicTreeXMLLines(speciesTree)
+        lines = myBasicTreeXMLLines(speciesTree, indentChar)
 
         for xmlline in lines:
-                OUT.write( indentLevel * indentChar + xmlline + "\n" )             
+                OUT.write( indentLevel * indentChar + xmlline + lineEnd )             
 
         indentLevel -= 1
-        OUT.write( indentLevel * indentChar + "</spTree>" + "\n")
+        OUT.write( indentLevel * indentChar + "</spTree>" + lineEnd)
 
 
-    XMLlines = RT.getTreeRecPhyloXMLLines()
+    XMLlines = RT.getTreeRecPhyloXMLLines(indent = indentChar)
     for xmlline in XMLlines:
-        OUT.write( indentLevel * indentChar + xmlline + "\n" ) 
+        OUT.write( indentLevel * indentChar + xmlline + lineEnd ) 
 
 
 
 
 
     if params["--include.species"]:
-        OUT.write( "</recPhylo>" + "\n" )
+        OUT.write( "</recPhylo>" + lineEnd )
+
+    if params["--compact"]:
+        OUT.write( "\n" )
 
     OUT.close()
 
@@ -0,0 +1,189 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Bastien Boussau , Wandrille Duchemin
+##  Created:        13-Jan-2017
+##  Last modified:  18-Oct-2026
+##
+##  Decribes the RecEvent class (with its EventKind)
+##  which represents a reconciliation event of a node of a reconciled gene tree.
+##  (split from ReconciledTree.py, so that it can be used without ete3)
+##
+##  requires : nothing outside of the standard library
+##
+##  developped for python3.0
+##
+#########################################
+
+
+import sys
+
+from enum import IntEnum
+from types import MappingProxyType
+
+
+EVENTTAGCORRESPONDANCE = {    "D" : "duplication",
+                        "S" : "speciation",
+                        "C" : "leaf",
+                        "L":"loss",
+
+                        "Bo": "bifurcationOut",
+                        "bro": "branchingOut",
+                        "Tb": "transferBack",
+
+                        "SL": "speciationLoss",
+                        "broL": "branchingOutLoss"
+                        }
+
+class EventKind(IntEnum):
+    """ kind of a reconciliation event ; OTHER stands for any event code which is not in EVENTTAGCORRESPONDANCE """
+    OTHER = 0
+    DUPLICATION = 1
+    SPECIATION = 2
+    LEAF = 3
+    LOSS = 4
+    BIFURCATION_OUT = 5
+    BRANCHING_OUT = 6
+    TRANSFER_BACK = 7
+    SPECIATION_LOSS = 8
+    BRANCHING_OUT_LOSS = 9
+
+## the kinds as module constants, as reaching the attributes of an Enum class is slow (they are used in the hot loops)
+( KIND_OTHER , KIND_DUPLICATION , KIND_SPECIATION , KIND_LEAF , KIND_LOSS , KIND_BIFURCATION_OUT ,
+  KIND_BRANCHING_OUT , KIND_TRANSFER_BACK , KIND_SPECIATION_LOSS , KIND_BRANCHING_OUT_LOSS ) = list(EventKind)
+
+## short event code of each EventKind (indexed by the kind)
+EVENTKIND_CODES = [ None , "D" , "S" , "C" , "L" , "Bo" , "bro" , "Tb" , "SL" , "broL" ]
+
+## EventKind of each short event code and recPhyloXML event tag
+EVENTCODE_TO_KIND = { EVENTKIND_CODES[k] : k for k in EventKind if k != KIND_OTHER }
+EVENTCODE_TO_KIND.update( { EVENTTAGCORRESPONDANCE[code] : k for code, k in list(EVENTCODE_TO_KIND.items()) } )
+
+
+## immutable empty mapping, shared by all the events without additionnal information (see RecEvent)
+EMPTY_ADDITIONNALINFO = MappingProxyType({})
+
+class RecEvent:
+    """
+    Atributes:
+        - self.kind (EventKind) : kind of the event
+        - self.rawCode (str) : the event code, if kind is EventKind.OTHER (None otherwise)
+        - self.species : identifier of the species the event takes place in (interned when it is a str)
+        - self.timeSlice (int or None) : time slice of the event
+        - self.additionnalInfo (dict) : other properties of the event
+    """
+    __slots__ = ("kind", "rawCode", "species", "timeSlice", "additionnalInfo")
+
+    def __init__(self, eventCode , species , ts = None , additionnalInfo = {}):
+        """
+        Takes:
+            - eventCode (str) : a code indicating the recEvent event, either a short code (eg. "D") or a recPhyloXML tag (eg. "duplication")
+            - species (~) : a identifier for the specie the event takes place in
+            - ts (int or None) [default= None] : the time slice the events happens at, if applicable
+            - additionnalInfo (dict) [default= {}] : keys are expected to be some property tag and values the associated information
+                                                     (NB: it is copied, unless it is EMPTY_ADDITIONNALINFO, which is shared and can not be modified)
+        """
+        kind = EVENTCODE_TO_KIND.get(eventCode, KIND_OTHER) ## inlined eventCode setter
+        self.kind = kind
+        self.rawCode = eventCode if kind == KIND_OTHER else None
+        if isinstance(species, str):
+            species = sys.intern(species)
+        self.species = species
+        self.timeSlice = ts
+        if additionnalInfo is EMPTY_ADDITIONNALINFO:
+            self.additionnalInfo = additionnalInfo
+        else:
+            self.additionnalInfo = additionnalInfo.copy()
+
+    @property
+    def eventCode(self):
+        """ (str) : the short code of the event (eg. "D"), or its original code if it is of kind EventKind.OTHER """
+        if self.kind == KIND_OTHER:
+            return self.rawCode
+        return EVENTKIND_CODES[self.kind]
+
+    @eventCode.setter
+    def eventCode(self, eventCode):
+        self.kind = EVENTCODE_TO_KIND.get(eventCode, KIND_OTHER)
+        self.rawCode = eventCode if self.kind == KIND_OTHER else None
+
+    def __getstate__(self):
+        """ EMPTY_ADDITIONNALINFO can not be pickled : it is replaced by None """
+        additionnalInfo = self.additionnalInfo
+        if additionnalInfo is EMPTY_ADDITIONNALINFO:
+            additionnalInfo = None
+        return ( int(self.kind) , self.rawCode , self.species , self.timeSlice , additionnalInfo )
+
+    def __setstate__(self, state):
+        kind , self.rawCode , species , self.timeSlice , additionnalInfo = state
+        self.kind = EventKind(kind)
+        if isinstance(species, str):
+            species = sys.intern(species)
+        self.species = species
+        if additionnalInfo is None:
+            additionnalInfo = EMPTY_ADDITIONNALINFO
+        self.additionnalInfo = additionnalInfo
+
+    def __str__(self):
+        L = [ str(self.eventCode), "spe=" + str(self.species) ]
+        if not self.timeSlice is None:
+            L.append("ts=" + str(self.timeSlice))
+        for k,v in self.additionnalInfo.items():
+            L.append(str(k) + "=" + str(v) )
+        return " ".join(L)
+
+    def nwkstr(self):
+        """ tmp simplistic version """
+        s = str(self.species)
+        s += "."
+
+        s += str(self.eventCode)
+        return s
+
+
+    def makeRecXMLstr(self , speciesNames):
+
+        kind = self.kind
+
+        if kind == KIND_OTHER:
+            if self.rawCode == "N":
+                return ""
+            eventName = self.rawCode
+        else:
+            eventName = EVENTTAGCORRESPONDANCE[ EVENTKIND_CODES[kind] ]
+
+        spe = str(self.species)
+        if spe in speciesNames.keys():
+            spe = speciesNames[spe]
+
+        S = "<" + str(eventName)
+
+        if kind != KIND_BIFURCATION_OUT:
+            S += " "
+            if kind == KIND_TRANSFER_BACK:
+                S += "destinationSpecies="
+            else:
+                S += "speciesLocation="
+            S += '"' + str(spe) + '"'
+
+            if not self.timeSlice is None:
+                S += " ts=" + '"' + str(self.timeSlice) + '"'
+
+        propertyName = "confidence"
+#        if self.additionnalInfo.has_key(propertyName):
+        if propertyName in self.additionnalInfo:
+            S += " " + propertyName + "=" + '"' + self.additionnalInfo[propertyName] + '"'
+
+        if kind == KIND_LEAF:
+            propertyName = "geneName"
+#            if self.additionnalInfo.has_key(propertyName):
+            if propertyName in self.additionnalInfo:
+                S += " " + propertyName + "=" + '"' + self.additionnalInfo[propertyName] + '"'
+
+
+        S += ">"
+        S += "</" + eventName + ">"
+
+        #print self.eventCode , "->", S
+        return S
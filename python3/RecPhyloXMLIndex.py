@@ -0,0 +1,632 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        18-Oct-2026
+##  Last modified:  18-Oct-2026
+##
+##  Decribes 3 classes : RecPhyloXMLIndex, LazyReconciledTreeList and LazyTreeView (the recTrees of a LazyReconciledTreeList)
+##          which give random access to the reconciled gene trees of a recPhyloXML file
+##          through an index of byte offsets (which can be saved in a sidecar .rpxi file)
+##
+##  The index is built by a single scan of the raw bytes of the file
+##  (no xml parsing), looking for the recGeneTree and spTree tags.
+##  The comments, CDATA sections and processing instructions are skipped by the scan, as a parser would.
+##
+##  .rpxi format (little-endian) :
+##      header : magic "RPXI" , version (uint16) , 2 padding bytes ,
+##               size (uint64) and modification time (float64) of the indexed file ,
+##               number of trees (uint64) , start and end offsets of the spTree (int64, -1 if absent) ,
+##               size of the names block plus one (uint64, 0 if no names were indexed)
+##      body   : start and end offsets of each recGeneTree (uint64 pairs)
+##               names block : the utf-8 gene family names, separated by "\0"
+##
+##  requires : ReconciledTreeBase.py
+##             ReconciledTreeIO.py
+##             CompressedFileIO.py
+##
+##  developped for python3.0
+##
+#########################################
+
+from ReconciledTreeBase import ReconciledTreeList
+from ReconciledTreeIO import recPhyloXML_parser, parseSpans, parseSpansWithSettings
+from CompressedFileIO import getCompression
+
+import sys
+import os
+import re
+import mmap
+import struct
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+
+
+INDEX_EXTENSION = ".rpxi"
+INDEX_MAGIC = b"RPXI"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sH2xQdQqqQ")
+
+TAG_NAME_TERMINATORS = (b" ", b">", b"/", b"\t", b"\n", b"\r")
+TAG_PREFIX_PATTERN = re.compile(rb"<(/?)[\w.-]+:$")
+FAMILYNAME_PATTERN = re.compile(rb"<(?:[\w.-]+:)?name>([^<]*)</")
+CLADE_PATTERN = re.compile(rb"<(?:[\w.-]+:)?clade[\s/>]")
+
+## regions of raw xml whose content is not markup : (opening , closing) delimiters of comments, CDATA sections and processing instructions
+SKIPPED_REGIONS = ( ( b"<!--" , b"-->" ) , ( b"<![CDATA[" , b"]]>" ) , ( b"<?" , b"?>" ) )
+
+
+class RecPhyloXMLIndex:
+    """
+    Byte offsets of the spTree and recGeneTree elements of a recPhyloXML file.
+
+    Atributes:
+        - self.fileName      : name of the indexed file
+        - self.fileSize      : size of the indexed file when it was indexed
+        - self.fileMtime     : modification time of the indexed file when it was indexed
+        - self.spTreeSpan    : (start, end) offsets of the spTree element, or None if there is none
+        - self.treeSpans     : list of (start, end) offsets of each recGeneTree element (end is excluded)
+        - self.familyNames   : list of gene family names (the name of the phylogeny of each recGeneTree, "" if absent)
+                               or None if the names were not indexed
+    """
+    def __init__(self, fileName, fileSize , fileMtime , spTreeSpan = None , treeSpans = [] , familyNames = None):
+        """
+        Takes:
+            - fileName (str) : name of the indexed file
+            - fileSize (int) : size of the indexed file
+            - fileMtime (float) : modification time of the indexed file
+            - spTreeSpan (tuple) [default = None] : (start, end) offsets of the spTree element
+            - treeSpans (list) [default = [] ] : list of (start, end) offsets of each recGeneTree element
+            - familyNames (list) [default = None] : list of gene family names
+        """
+        self.fileName = fileName
+        self.fileSize = fileSize
+        self.fileMtime = fileMtime
+        self.spTreeSpan = spTreeSpan
+        self.treeSpans = treeSpans[:]
+        self.familyNames = familyNames
+
+    def __len__(self):
+        """
+        Returns:
+            (int) : number of recGeneTree in the indexed file
+        """
+        return len(self.treeSpans)
+
+    def isUpToDate(self):
+        """
+        Returns:
+            (bool) : True if the indexed file still has the size and modification time it had when it was indexed, False otherwise
+        """
+        if not os.path.isfile(self.fileName):
+            return False
+        stat = os.stat(self.fileName)
+        return stat.st_size == self.fileSize and stat.st_mtime == self.fileMtime
+
+    def write(self, indexFileName):
+        """
+        Writes the index in the .rpxi format.
+
+        Takes:
+            - indexFileName (str) : name of the file to write
+        """
+        spStart, spEnd = (-1, -1) if self.spTreeSpan is None else self.spTreeSpan
+
+        offsets = array("Q")
+        for start, end in self.treeSpans:
+            offsets.append(start)
+            offsets.append(end)
+        if sys.byteorder == "big":
+            offsets.byteswap()
+
+        names = b""
+        if not self.familyNames is None:
+            names = "\0".join(self.familyNames).encode("utf-8")
+
+        OUT = open(indexFileName, "wb")
+        OUT.write( INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.fileSize, self.fileMtime,
+                                     len(self.treeSpans), spStart, spEnd, len(names) + (not self.familyNames is None)) )
+        OUT.write( offsets.tobytes() )
+        OUT.write( names )
+        OUT.close()
+
+
+def readRecPhyloXMLIndex(indexFileName, fileName):
+    """
+    Takes:
+        - indexFileName (str) : name of a .rpxi file
+        - fileName (str) : name of the indexed file
+
+    Returns:
+        (RecPhyloXMLIndex) : the index
+    """
+    IN = open(indexFileName, "rb")
+    header = IN.read(INDEX_HEADER.size)
+
+    if len(header) != INDEX_HEADER.size:
+        IN.close()
+        raise Exception("recPhyloXML exception. " + indexFileName + " is not a valid index file (truncated header).")
+
+    magic, version, fileSize, fileMtime, nbTrees, spStart, spEnd, namesSize = INDEX_HEADER.unpack(header)
+
+    if magic != INDEX_MAGIC or version != INDEX_VERSION:
+        IN.close()
+        raise Exception("recPhyloXML exception. " + indexFileName + " is not a valid index file (version " + str(INDEX_VERSION) + " expected).")
+
+    offsets = array("Q")
+    offsets.frombytes( IN.read( 2 * nbTrees * offsets.itemsize ) )
+    if sys.byteorder == "big":
+        offsets.byteswap()
+
+    familyNames = None
+    if namesSize > 0:
+        familyNames = []
+        if nbTrees > 0:
+            familyNames = IN.read(namesSize - 1).decode("utf-8").split("\0")
+
+    IN.close()
+
+    spTreeSpan = None
+    if spStart >= 0:
+        spTreeSpan = (spStart, spEnd)
+
+    treeSpans = list( zip( offsets[0::2] , offsets[1::2] ) )
+
+    return RecPhyloXMLIndex(fileName, fileSize, fileMtime, spTreeSpan, treeSpans, familyNames)
+
+
+def iterSkippedRegions(data):
+    """
+    *generator*
+
+    Finds the comments, CDATA sections and processing instructions of raw xml bytes (see SKIPPED_REGIONS),
+    in a single pass : the next occurrence of each opening delimiter is only searched again once it has been passed.
+
+    Takes:
+        - data (bytes or mmap.mmap) : raw xml
+
+    Yields:
+        (tuple) : (int) offset of the start of the region , (int) offset just after its end (the end of the data for an unterminated region)
+    """
+    nextStarts = [ data.find(opening) for opening, closing in SKIPPED_REGIONS ]
+
+    while True:
+        candidates = [ ( start , i ) for i, start in enumerate(nextStarts) if start != -1 ]
+        if len(candidates) == 0:
+            return
+
+        start , i = min(candidates)
+        opening , closing = SKIPPED_REGIONS[i]
+
+        end = data.find(closing, start + len(opening))
+        end = len(data) if end == -1 else end + len(closing)
+
+        yield start , end
+
+        for j, nextStart in enumerate(nextStarts):
+            if nextStart != -1 and nextStart < end: ## within the region : not a delimiter
+                nextStarts[j] = data.find(SKIPPED_REGIONS[j][0], end)
+
+
+def scanTags(data, tagName, skippedRegions = None):
+    """
+    *generator*
+
+    Finds the opening and closing tags of a given name in raw xml bytes, whatever their namespace prefix.
+    (the search relies on the fast bytes.find rather than on a regular expression)
+    Tag names within comments, CDATA sections and processing instructions are ignored.
+
+    Takes:
+        - data (bytes or mmap.mmap) : raw xml
+        - tagName (bytes) : local name of the tag
+        - skippedRegions (list) [default = None] : the regions given by iterSkippedRegions(data) (by default they are searched again)
+
+    Yields:
+        (tuple) : (bool) True for a closing tag, False for an opening one , (int) offset of the "<" of the tag , (int) offset just after the ">" of the tag
+    """
+    n = len(tagName)
+    pos = data.find(tagName)
+
+    if skippedRegions is None:
+        skippedRegions = iterSkippedRegions(data)
+
+    regions = iter(skippedRegions)
+    region = next(regions, None)
+
+    while pos != -1:
+
+        while not region is None and region[1] <= pos:
+            region = next(regions, None)
+
+        if not region is None and region[0] <= pos:
+            pos = data.find(tagName, region[1]) ## the name is in a comment, a CDATA section or a processing instruction
+            continue
+
+        if data[pos + n : pos + n + 1] in TAG_NAME_TERMINATORS:
+
+            tagStart = -1
+            isClosing = False
+
+            if data[pos - 1 : pos] == b"<":
+                tagStart = pos - 1
+            elif data[pos - 2 : pos] == b"</":
+                tagStart = pos - 2
+                isClosing = True
+            else: ## maybe a namespace prefix
+                lt = data.rfind(b"<", max(0, pos - 256), pos)
+                if lt != -1:
+                    m = TAG_PREFIX_PATTERN.match( data[lt:pos] )
+                    if not m is None:
+                        tagStart = lt
+                        isClosing = (m.group(1) == b"/")
+
+            if tagStart != -1:
+                tagEnd = data.find(b">", pos + n) + 1
+                if isClosing or data[tagEnd - 2 : tagEnd - 1] != b"/": ## empty elements are ignored
+                    yield isClosing , tagStart , tagEnd
+
+        pos = data.find(tagName, pos + n)
+
+
+def scanElementSpans(data, tagName, skippedRegions = None):
+    """
+    Takes:
+        - data (bytes or mmap.mmap) : raw xml
+        - tagName (bytes) : local name of the elements to look for (these elements must not be nested in one another)
+        - skippedRegions (list) [default = None] : the regions given by iterSkippedRegions(data) (by default they are searched again)
+
+    Returns:
+        (list) : (start, end) offsets of each element with this tag (end is excluded)
+    """
+    spans = []
+    start = None
+
+    for isClosing, tagStart, tagEnd in scanTags(data, tagName, skippedRegions):
+
+        if not isClosing:
+            start = tagStart
+            continue
+
+        if start is None:
+            raise Exception("recPhyloXML exception. Problem while indexing : closing " + tagName.decode() + " tag at offset " + str(tagStart) + " without opening tag.")
+
+        spans.append( (start, tagEnd) )
+        start = None
+
+    return spans
+
+
+def buildRecPhyloXMLIndex(fileName, withFamilyNames = False):
+    """
+    Scans the bytes of a recPhyloXML file for the recGeneTree and spTree tags.
+
+    Takes:
+        - fileName (str) : name of a recPhyloXML file
+        - withFamilyNames (bool) [default = False] : if True, the gene family names (name of the phylogeny of each recGeneTree) are also indexed
+
+    Returns:
+        (RecPhyloXMLIndex) : the index
+    """
+    stat = os.stat(fileName)
+
+    if stat.st_size > 0 and not getCompression(fileName) is None:
+        raise Exception("recPhyloXML exception. " + fileName + " is compressed : it cannot be indexed for random access (decompress it first).")
+
+    if stat.st_size == 0:
+        return RecPhyloXMLIndex(fileName, stat.st_size, stat.st_mtime, familyNames = [] if withFamilyNames else None)
+
+    IN = open(fileName, "rb")
+    data = mmap.mmap(IN.fileno(), 0, access = mmap.ACCESS_READ)
+
+    skippedRegions = list( iterSkippedRegions(data) ) ## searched once for both tags
+
+    spTreeSpan = None
+    spTreeSpans = scanElementSpans(data, b"spTree", skippedRegions)
+    if len(spTreeSpans) > 0:
+        spTreeSpan = spTreeSpans[0]
+
+    treeSpans = scanElementSpans(data, b"recGeneTree", skippedRegions)
+
+    familyNames = None
+    if withFamilyNames:
+        familyNames = []
+        for start, end in treeSpans:
+            name = ""
+            firstClade = CLADE_PATTERN.search(data, start, end)
+            nameMatch = FAMILYNAME_PATTERN.search(data, start, end if firstClade is None else firstClade.start())
+            if not nameMatch is None:
+                name = nameMatch.group(1).decode("utf-8").strip()
+            familyNames.append(name)
+
+    data.close()
+    IN.close()
+
+    return RecPhyloXMLIndex(fileName, stat.st_size, stat.st_mtime, spTreeSpan, treeSpans, familyNames)
+
+
+def getRecPhyloXMLIndex(fileName, indexFileName = None , writeIndex = True , withFamilyNames = False):
+    """
+    Reads the index of a recPhyloXML file if it exists and is up to date, otherwise builds it.
+
+    Takes:
+        - fileName (str) : name of a recPhyloXML file
+        - indexFileName (str) [default = None] : name of the index file (by default fileName + ".rpxi")
+        - writeIndex (bool) [default = True] : if True, a newly built index is written to indexFileName
+        - withFamilyNames (bool) [default = False] : if True, the gene family names are indexed
+
+    Returns:
+        (RecPhyloXMLIndex) : the index
+    """
+    if indexFileName is None:
+        indexFileName = fileName + INDEX_EXTENSION
+
+    if os.path.isfile(indexFileName):
+        index = readRecPhyloXMLIndex(indexFileName, fileName)
+        if index.isUpToDate() and ( index.familyNames is not None or not withFamilyNames ):
+            return index
+
+    index = buildRecPhyloXMLIndex(fileName, withFamilyNames)
+
+    if writeIndex:
+        index.write(indexFileName)
+
+    return index
+
+
+class LazyTreeView(Sequence):
+    """
+    Read-only view of the reconciled trees of a LazyReconciledTreeList (its recTrees attribute) :
+    the trees are obtained one at a time through the list, so that iterating over the view respects its maxResident limit.
+
+    Atributes:
+        - self.trees : (LazyReconciledTreeList) the viewed list
+    """
+    def __init__(self, trees):
+        self.trees = trees
+
+    def __len__(self):
+        return len(self.trees)
+
+    def __getitem__(self, i):
+        """
+        Takes:
+            - i (int or slice) : index of the desired reconciled tree(s)
+
+        Returns:
+            (ReconciledTree) : the tree at this index
+                or
+            (list) : the trees of the slice (these trees only are parsed)
+        """
+        if isinstance(i, slice):
+            return [ self.trees[j] for j in range(len(self.trees))[i] ]
+        return self.trees[i]
+
+    def __iter__(self):
+        return iter(self.trees)
+
+
+class LazyReconciledTreeList(ReconciledTreeList):
+    """
+    A ReconciledTreeList whose reconciled trees stay on disk as raw xml byte spans :
+    a tree is read and parsed only when it is accessed, and the most recently accessed trees are kept in memory.
+
+    NB: modifications made to a tree are lost once it is evicted from memory.
+
+    Atributes:
+        - self.spTree       : the species tree of the file (or None if there is none). It is parsed when the object is created.
+        - self.index        : the RecPhyloXMLIndex giving the byte spans of the trees
+        - self.parser       : the recPhyloXML_parser used to parse the trees
+        - self.maxResident  : maximum number of parsed trees kept in memory (None for no limit)
+    """
+    def __init__(self, index , parser = None , obsoleteTagsBehaviour = 1 , maxResident = 128 , spTree = None):
+        """
+        Takes:
+            - index (RecPhyloXMLIndex) : index of a recPhyloXML file
+            - parser (recPhyloXML_parser) [default = None] : the parser to use (by default a new one is created)
+            - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+            - maxResident (int) [default = 128] : maximum number of parsed trees kept in memory, the least recently used being evicted first
+                                                  (0 : none are kept ; None : all are kept)
+            - spTree (ete3.Tree) [default = None] : the species tree, if it has already been parsed (otherwise it is parsed from the file)
+        """
+        if parser is None:
+            parser = recPhyloXML_parser()
+
+        self.index = index
+        self.parser = parser
+        self.obsoleteTagsBehaviour = obsoleteTagsBehaviour
+        self.maxResident = maxResident
+        self.resident = OrderedDict()
+
+        if spTree is None and not index.spTreeSpan is None:
+            spTree = self.parseSpan( index.spTreeSpan )
+
+        ReconciledTreeList.__init__(self, spTree)
+
+    def parseSpan(self, span):
+        """
+        Takes:
+            - span (tuple) : (start, end) offsets of an element in the indexed file
+
+        Returns:
+            (ReconciledTree or ete3.Tree) : the tree in that element
+        """
+        return parseSpans(self.parser, self.index.fileName, [ span ], self.obsoleteTagsBehaviour)[0]
+
+    def __getitem__(self, i):
+        """
+        returns a reconciled tree from the object, parsing it if it is not in memory.
+
+        Takes:
+            - i (int or slice) : index of the desired reconciled tree
+
+        Returns:
+            (ReconciledTree) : the reconciled tree at the desired index
+                or
+            (LazyReconciledTreeList) : if i is a slice ; the trees it contains are not parsed
+            OR IndexError if the index is invalid (ie. too high)
+        """
+        nbTrees = len(self.index.treeSpans)
+
+        if isinstance(i, slice):
+            familyNames = None
+            if not self.index.familyNames is None:
+                familyNames = self.index.familyNames[i]
+            subIndex = RecPhyloXMLIndex(self.index.fileName, self.index.fileSize, self.index.fileMtime,
+                                        self.index.spTreeSpan, self.index.treeSpans[i], familyNames)
+            return LazyReconciledTreeList(subIndex, self.parser, self.obsoleteTagsBehaviour, self.maxResident, self.spTree)
+
+        if i >= nbTrees or i < -nbTrees:
+            raise IndexError('Index out of range. There are no reconciled tree with index ' + str(i) + '.')
+
+        if i < 0:
+            i += nbTrees
+
+        RT = self.resident.get(i, None)
+
+        if not RT is None:
+            self.resident.move_to_end(i)
+            return RT
+
+        RT = self.parseSpan( self.index.treeSpans[i] )
+
+        if self.maxResident is None or self.maxResident > 0:
+            self.resident[i] = RT
+            if not self.maxResident is None and len(self.resident) > self.maxResident:
+                self.resident.popitem(last = False)
+
+        return RT
+
+    def __len__(self):
+        """
+        Returns:
+            (int) : number of ReconciledTree in the file
+        """
+        return len(self.index.treeSpans)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def recTrees(self):
+        """ a LazyTreeView of the reconciled trees of the file : they are parsed when they are accessed, not all at once """
+        return LazyTreeView(self)
+
+    @recTrees.setter
+    def recTrees(self, value):
+        if len(value) > 0:
+            raise Exception("a LazyReconciledTreeList is read-only.")
+
+    def append(self, RT):
+        raise Exception("a LazyReconciledTreeList is read-only.")
+
+    def getTrees(self, positions):
+        """
+        Takes:
+            - positions (list) : indexes of the desired reconciled trees
+
+        Returns:
+            (ReconciledTreeList) : the reconciled trees at these indexes, with the species tree of the file
+        """
+        RTL = ReconciledTreeList( self.spTree )
+        for i in positions:
+            RTL.append( self[i] )
+        return RTL
+
+    def getFamilyNames(self):
+        """
+        Returns:
+            (list) : the gene family names of the trees, or None if they were not indexed
+        """
+        return self.index.familyNames
+
+    def getSharedTrees(self):
+        """
+        Returns:
+            None : the trees are not in memory, the workers parse them from the file (see getTreeShards)
+        """
+        return None
+
+    def hasParallelShards(self):
+        """
+        Returns:
+            True : the shards are byte spans of the file, which are cheap to send to worker processes
+        """
+        return True
+
+    def getTreeShards(self, shardSize):
+        """
+        *generator*
+        Cuts the reconciled trees in consecutive shards, to be sent to worker processes :
+        the shards are byte spans of the file, so that the trees are parsed by the workers.
+
+        Takes:
+            - shardSize (int) : number of trees per shard
+
+        Yields:
+            (tuple) : (function) loadTrees , (tuple) arguments : loadTrees(*arguments) gives the list of the trees of the shard
+        """
+        settings = self.parser.getSettings()
+        spans = self.index.treeSpans
+        for start in range(0, len(spans), shardSize):
+            yield parseSpansWithSettings , ( settings , self.index.fileName , spans[start:start+shardSize] , self.obsoleteTagsBehaviour )
+
+
+if __name__ == "__main__":
+
+    help =  """
+                This script builds the .rpxi index of a recPhyloXML file, which gives random access to its reconciled gene trees.
+
+                usage : python RecPhyloXMLIndex.py -i inputRecPhyloXML [-o indexFile --with.names]
+
+                            -i inputRecPhyloXML         : input recPhyloXML file
+
+                            -o indexFile                : (optional) index file to write (by default inputRecPhyloXML.rpxi)
+                            --with.names                : (optional) also index the name of each gene family
+
+               """
+
+    nextKEY = None
+    params = {
+                "-i" : None, #: input recPhyloXML file
+                "-o" : None, #: (optional) index file to write
+                "--with.names" : False #: (optional) also index the name of each gene family
+            }
+
+    flagArgs = ["--with.names"]
+
+    for i in range(1,len(sys.argv)):
+
+        if not nextKEY is None:
+            params[nextKEY] = sys.argv[i]
+            nextKEY = None
+            continue
+
+        if sys.argv[i] in params.keys():
+
+            if sys.argv[i] in flagArgs:
+                params[sys.argv[i]] = True
+            else:
+                nextKEY = sys.argv[i]
+            continue
+
+    if params["-i"] is None:
+        print("error: input file name not given.")
+        print(help)
+        exit(1)
+
+    elif not os.path.isfile(params["-i"]):
+        print("error: " + params["-i"] + " is not an existing file.")
+        exit(1)
+
+    if params["-o"] is None:
+        params["-o"] = params["-i"] + INDEX_EXTENSION
+
+    index = buildRecPhyloXMLIndex(params["-i"], params["--with.names"])
+    index.write(params["-o"])
+
+    print("indexed", len(index), "reconciled trees in", params["-o"])
@@ -0,0 +1,345 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        18-Oct-2026
+##  Last modified:  18-Oct-2026
+##
+##  Decribes the RecPhyloXMLWriter class : a context manager writing a recPhyloXML document
+##          one tree at a time to a file, so that the whole document is never held in memory
+##
+##  example :
+##      with RecPhyloXMLWriter("out.xml.gz") as writer:
+##          writer.write_species_tree(spTree)
+##          for RT in trees:
+##              writer.write_tree(RT)
+##
+##  The trees can also be serialized by shards in a pool of worker processes (see write_trees) :
+##  the shards are written in the order of the trees, and the number of shards in flight is bounded.
+##  Where processes can be forked, the trees of a list are inherited by the workers instead of being sent to them.
+##
+##  requires : ReconciledTreeBase.py
+##             CompressedFileIO.py
+##             ReconciledTreeIO.py ( for the parallel serialization )
+##
+##  developped for python3.0
+##
+#########################################
+
+from ReconciledTreeBase import ReconciledTreeBase , ReconciledTreeList , RECPHYLOTAG , SPTREETAG , appendBasicTreeXMLLines , joinXMLLines
+from CompressedFileIO import openFile
+
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+
+
+## maximum number of trees in a shard of the parallel serialization
+MAX_SERIALIZATION_SHARD_SIZE = 256
+
+
+def getTreesRecPhyloXMLText(trees, indent = "  ", speciesNames = {}, topoOnly = False):
+    """
+    Takes:
+        - trees (iterable) : reconciled gene trees
+        - indent (str or None) [default = "  "] : indentation of one level (None : compact output)
+        - speciesNames (dict) [default = {}] : see RecEvent.makeRecXMLstr
+        - topoOnly (bool) [default = False] : if True, only the topology and names of the trees are written
+
+    Returns:
+        (str) : the recGeneTree elements of the trees, as children of the recPhylo root (each line ends with '\n')
+    """
+    indentChar = "" if indent is None else indent
+
+    chunks = []
+    for RT in trees:
+        lines = []
+        RT.appendTreeRecPhyloXMLLines(lines, speciesNames, topoOnly, 1, indentChar)
+        if indent is None:
+            joinXMLLines(lines)
+        lines.append("") ## for the last '\n'
+        chunks.append( "\n".join(lines) )
+
+    return "".join(chunks)
+
+
+## state of the worker processes of the parallel serialization (see initSerializationWorker)
+SERIALIZATION_WORKER = {}
+
+
+def initSerializationWorker(sharedTrees):
+    """
+    Initializer of the worker processes of RecPhyloXMLWriter.write_trees.
+
+    Takes:
+        - sharedTrees (list or None) : the trees to serialize, when the workers are forked (they inherit the list instead of receiving a copy of it)
+    """
+    SERIALIZATION_WORKER["trees"] = sharedTrees
+
+
+def getSharedTrees(start, end):
+    """
+    Takes:
+        - start (int) , end (int) : positions of the trees in the list given to initSerializationWorker
+
+    Returns:
+        (list) : the trees between these positions
+    """
+    return SERIALIZATION_WORKER["trees"][start:end]
+
+
+def serializeTreesWorker(loadTrees, arguments, indent, speciesNames, topoOnly):
+    """
+    Function executed by the worker processes of RecPhyloXMLWriter.write_trees.
+
+    Takes:
+        - loadTrees (function) , arguments (tuple) : loadTrees(*arguments) gives the trees of the shard
+        - indent , speciesNames , topoOnly : see getTreesRecPhyloXMLText
+
+    Returns:
+        (tuple) : (str) the xml text of the trees of the shard , (int) number of trees in the shard
+    """
+    trees = loadTrees(*arguments)
+    return ( getTreesRecPhyloXMLText(trees, indent, speciesNames, topoOnly) , len(trees) )
+
+
+def getSerializationShards(trees, shardSize, sharedTrees = None):
+    """
+    *generator*
+    Cuts an iterable of trees in consecutive shards, to be sent to worker processes.
+
+    Takes:
+        - trees (iterable) : reconciled gene trees ; those of a ReconciledTreeList (or of a LazyReconciledTreeList) are cut by its getTreeShards method
+                             the elements which are not reconciled trees are yielded on their own, between the shards
+        - shardSize (int) : number of trees per shard
+        - sharedTrees (list) [default = None] : if not None, the trees, as inherited by forked worker processes : only the positions of the shards are sent
+
+    Yields:
+        (tuple) : (function) loadTrees , (tuple) arguments : loadTrees(*arguments) gives the list of the trees of the shard
+            or
+        (tuple) : None , a species tree
+    """
+    if not sharedTrees is None:
+        for start in range(0, len(sharedTrees), shardSize):
+            yield getSharedTrees , ( start , start + shardSize )
+        return
+
+    if hasattr(trees, "getTreeShards"):
+        for shard in trees.getTreeShards(shardSize):
+            yield shard
+        return
+
+    from ReconciledTreeIO import flattenTree, unflattenTrees
+
+    states = []
+    for RT in trees:
+        if isinstance(RT, ReconciledTreeBase):
+            states.append( flattenTree(RT) )
+            if len(states) >= shardSize:
+                yield unflattenTrees , ( states , )
+                states = []
+        else:
+            if len(states) > 0:
+                yield unflattenTrees , ( states , )
+                states = []
+            yield None , RT
+
+    if len(states) > 0:
+        yield unflattenTrees , ( states , )
+
+
+class RecPhyloXMLWriter:
+    """
+    Writes a recPhyloXML document incrementally :
+    the <recPhylo> root is opened on entry (or by open()) and closed on exit (or by close()),
+    and each species or gene tree is written as soon as it is given.
+
+    Atributes:
+        - self.OUT        : (file object) the handle the document is written to
+        - self.ownsFile   : (bool) True if the handle was opened by the writer (it is then closed with the document)
+        - self.indent     : (str or None) indentation of one level (None : compact output)
+        - self.isOpen     : (bool) True when the <recPhylo> root has been opened and not closed yet
+        - self.nbTrees    : (int) number of gene trees written so far
+    """
+
+    def __init__(self, fileobj, compressLevel = None, indent = "  "):
+        """
+        Takes:
+            - fileobj (str or file object) : name of the file to write (compressed if its name ends with .gz, .bz2 or .xz)
+                                             or a handle opened in text mode
+            - compressLevel (int) [default = None] : compression level when fileobj is the name of a compressed file
+            - indent (str or None) [default = "  "] : indentation of one level
+                                                      None : compact output, without indentation, where the species tree and each reconciled tree are written on a single line
+        """
+        self.ownsFile = isinstance(fileobj, str)
+        if self.ownsFile:
+            self.OUT = openFile(fileobj, "w", compressLevel)
+        else:
+            self.OUT = fileobj
+
+        self.indent = indent
+        self.isOpen = False
+        self.nbTrees = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ## on error, the closing tag is not written : the truncated document does not pass for a complete one
+        self.close( writeClosingTag = exc_type is None )
+        return False
+
+    def open(self):
+        """ writes the opening <recPhylo> tag """
+        if self.isOpen:
+            raise Exception("recPhyloXML exception. The " + RECPHYLOTAG + " element is already opened.")
+        self.OUT.write( "<" + RECPHYLOTAG + ">" + "\n" )
+        self.isOpen = True
+
+    def getIndentChar(self):
+        """
+        Returns:
+            (str) : indentation of one level ("" for the compact output)
+        """
+        if self.indent is None:
+            return ""
+        return self.indent
+
+    def writeLines(self, lines):
+        """
+        Takes:
+            - lines (list) : xml lines (without '\n') of an element child of the root, already indented
+        """
+        if not self.isOpen:
+            raise Exception("recPhyloXML exception. The " + RECPHYLOTAG + " element must be opened before writing in it.")
+
+        if self.indent is None:
+            joinXMLLines(lines)
+        lines.append("") ## for the last '\n'
+        self.OUT.write( "\n".join(lines) )
+
+    def write_species_tree(self, spTree):
+        """
+        Takes:
+            - spTree (ete3.Tree) : the species tree (or a LightTree)
+        """
+        indent = self.getIndentChar()
+        lines = [ indent + "<" + SPTREETAG + ">" ]
+        appendBasicTreeXMLLines(spTree, lines, 2, indent)
+        lines.append( indent + "</" + SPTREETAG + ">" )
+        self.writeLines(lines)
+
+    def writeText(self, text):
+        """
+        Takes:
+            - text (str) : xml text of elements children of the root, already indented (and ending with '\n')
+        """
+        if not self.isOpen:
+            raise Exception("recPhyloXML exception. The " + RECPHYLOTAG + " element must be opened before writing in it.")
+
+        self.OUT.write(text)
+
+    def write_tree(self, RT, speciesNames = {}, topoOnly = False):
+        """
+        Takes:
+            - RT (ReconciledTree or LightReconciledTree) : a reconciled gene tree
+            - speciesNames (dict) [default = {}] : see RecEvent.makeRecXMLstr
+            - topoOnly (bool) [default = False] : if True, only the topology and names of the tree are written
+        """
+        self.writeText( getTreesRecPhyloXMLText([ RT ], self.indent, speciesNames, topoOnly) )
+        self.nbTrees += 1
+
+    def write_trees(self, trees, workers = 1, shardSize = None, window = None, speciesNames = {}, topoOnly = False):
+        """
+        Takes:
+            - trees (iterable) : reconciled gene trees (for instance a ReconciledTreeList or recPhyloXML_parser.iterparse(fileName))
+                                 the elements which are not reconciled trees are written as species trees
+            - workers (int) [default = 1] : number of worker processes serializing the trees (None : the number of processors of the machine)
+                                            with more than 1 worker, the trees are serialized by shards in a pool of processes
+                                            and the text of the shards is written in the order of the trees
+            - shardSize (int) [default = None] : number of trees per shard (by default a quarter of the trees per worker, up to MAX_SERIALIZATION_SHARD_SIZE)
+            - window (int) [default = None] : maximum number of shards being serialized or waiting to be written (by default 2 per worker)
+                                              it bounds the memory used by the parallel serialization
+            - speciesNames (dict) [default = {}] : see RecEvent.makeRecXMLstr
+            - topoOnly (bool) [default = False] : if True, only the topology and names of the trees are written
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers == 1:
+            for RT in trees:
+                if isinstance(RT, ReconciledTreeBase):
+                    self.write_tree(RT, speciesNames, topoOnly)
+                else:
+                    self.write_species_tree(RT)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        ## a list of trees in memory is inherited by forked workers, rather than pickled shard by shard
+        sharedTrees = None
+        context = None
+        if "fork" in multiprocessing.get_all_start_methods():
+            if type(trees) is ReconciledTreeList:
+                sharedTrees = trees.recTrees
+            elif isinstance(trees, list) and all( isinstance(RT, ReconciledTreeBase) for RT in trees ):
+                sharedTrees = trees
+            if not sharedTrees is None:
+                context = multiprocessing.get_context("fork")
+
+        if shardSize is None:
+            shardSize = MAX_SERIALIZATION_SHARD_SIZE
+            if hasattr(trees, "__len__"):
+                shardSize = max( 1 , min( MAX_SERIALIZATION_SHARD_SIZE , -( -len(trees) // ( 4 * workers ) ) ) )
+
+        if window is None:
+            window = 2 * workers
+
+        with ProcessPoolExecutor(max_workers = workers , mp_context = context , initializer = initSerializationWorker , initargs = ( sharedTrees , )) as executor:
+
+            inFlight = deque() ## futures of the shards, or the species trees to write between them
+
+            for loadTrees , arguments in getSerializationShards(trees, shardSize, sharedTrees):
+
+                while len(inFlight) >= window:
+                    self.writeShard( inFlight.popleft() )
+
+                if loadTrees is None:
+                    inFlight.append(arguments)
+                else:
+                    inFlight.append( executor.submit( serializeTreesWorker , loadTrees , arguments , self.indent , speciesNames , topoOnly ) )
+
+            while len(inFlight) > 0:
+                self.writeShard( inFlight.popleft() )
+
+    def writeShard(self, shard):
+        """
+        Takes:
+            - shard (Future or tree) : the future of a shard submitted to serializeTreesWorker, or a species tree
+        """
+        if isinstance(shard, Future):
+            text , nbTrees = shard.result()
+            self.writeText(text)
+            self.nbTrees += nbTrees
+        else:
+            self.write_species_tree(shard)
+
+    def close(self, writeClosingTag = True):
+        """
+        writes the closing </recPhylo> tag, and closes the handle if the writer opened it (flushes it otherwise)
+
+        Takes:
+            - writeClosingTag (bool) [default = True] : if False, the handle is closed without writing the closing tag
+        """
+        if self.isOpen:
+            if writeClosingTag:
+                self.OUT.write( "</" + RECPHYLOTAG + ">" + "\n" )
+            self.isOpen = False
+
+        if self.ownsFile:
+            self.OUT.close()
+        else:
+            self.OUT.flush()
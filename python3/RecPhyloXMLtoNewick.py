@@ -0,0 +1,103 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        21-Nov-2018
+##  Last modified:  18-Oct-2026
+##
+##
+##  This script is used to write the topology of the reconciled trees of a recPhyloXML file in newick format
+##  Only the names of the nodes are read (the events and other features of the gene trees are not built)
+##
+##  requires : ReconciledTreeIO
+##             LightReconciledTree
+##             CompressedFileIO
+##  (ete3 is not needed : the trees are read with the lightweight tree backend)
+##
+##
+##  developped for python3.0
+##
+#########################################
+
+from LightReconciledTree import LightReconciledTree
+from ReconciledTreeIO import recPhyloXML_parser
+from CompressedFileIO import openFile
+
+
+import sys
+import os
+
+
+
+if __name__ == "__main__":
+
+    help =  """
+                This script is used to write the topology of the reconciled gene trees of a recPhyloXML file in newick format (one tree per line).
+
+                usage : python RecPhyloXMLtoNewick.py -i inputRecPhyloXML  [-o outputNewick]
+
+                            -i inputRecPhyloXML         : input recPhyloXML file (may be compressed with gzip, bz2 or xz)
+                            -o outputNewick             : (optional) file to write in (by default stdout will be used)
+                                                          it is compressed if its name ends with .gz, .bz2 or .xz
+               """
+
+
+    nextKEY = None
+    params = {
+                "-i" : None, #: input recPhyloXML file
+                "-o" : None, #: (optional) file to write in (by default stdout will be used)
+            }
+
+    flagArgs = []
+
+    additionalArguments = []
+
+    for i in range(1,len(sys.argv)):
+
+        if not nextKEY is None:
+            params[nextKEY] = sys.argv[i]
+            print("argument ",nextKEY,":", sys.argv[i], file=sys.stderr)
+            nextKEY = None
+            continue
+
+        if sys.argv[i] in params.keys():
+
+            if sys.argv[i] in flagArgs:
+                params[sys.argv[i]] = True
+                print(sys.argv[i],"flag activated", file=sys.stderr)
+            else:
+                nextKEY = sys.argv[i]
+            continue
+        else:
+            additionalArguments.append(sys.argv[i])
+
+
+    if params["-i"] is None:
+        print("error: input file name not given.")
+        print(help)
+        exit(1)
+
+    elif not os.path.isfile(params["-i"]):
+            print("error: " + params["-i"] + " is not an existing file.")
+            exit(1)
+
+
+    ## loading the data
+
+    parser = recPhyloXML_parser( fields = {"topology"} , treeBackend = "light" ) ## only the names are needed for topoOnly output
+
+    ### now ouput
+
+    OUT = sys.stdout
+
+    if not params["-o"] is None:
+        OUT = openFile( params["-o"] , "w" )
+
+
+    for RT in parser.iterparse(params["-i"]):
+        if isinstance(RT, LightReconciledTree):
+            OUT.write( RT.getTreeNewick(topoOnly = True) + "\n" )
+
+    OUT.close()
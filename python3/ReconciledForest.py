@@ -0,0 +1,756 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        18-Oct-2026
+##  Last modified:  18-Oct-2026
+##
+##  Decribes one class : ReconciledForest
+##          which stores a set of reconciled gene trees as columns of numpy arrays
+##          (one entry per node or per event) rather than as one python object per node,
+##          so that corpus-wide computations such as event summaries are vectorized.
+##
+##  Nodes are numbered in preorder, tree after tree ; events are numbered in the order of the nodes,
+##  and in the order of the eventsRec of each node.
+##
+##  A forest can be saved to a directory of .npy columns (see ReconciledForest.save) and opened again
+##  with ReconciledForest.load, which memory-maps the columns : opening a forest does not depend on its size,
+##  and processes opening the same forest share the pages of its files.
+##
+##  requires : RecEvent.py
+##             ReconciledTreeBase.py
+##             SpeciesTreeIndex.py
+##             LightReconciledTree.py
+##             numpy ( https://numpy.org/ )
+##             ReconciledTree.py ( and ete3 , only to rebuild the trees of an "ete3" forest with getTree and toReconciledTreeList )
+##
+##  developped for python3.0
+##
+#########################################
+
+from RecEvent import RecEvent , EventKind , KIND_OTHER , EVENTKIND_CODES , EMPTY_ADDITIONNALINFO
+from ReconciledTreeBase import ReconciledTreeList , ReconciledTreeBase , eventsCountMatrixToSummary
+from SpeciesTreeIndex import SpeciesTreeIndex
+
+from LightReconciledTree import LightTree , LightReconciledTree
+
+import os
+import json
+import numpy as np
+
+
+NO_TIMESLICE = -1 ## value of eventTimeSlice for events without time slice
+NO_SPECIES = -1 ## value of eventSpecies for events without species
+NO_STRING = -1 ## index of a None string in a StringColumn
+
+## on-disk format of a forest (see ReconciledForest.save)
+FOREST_FORMAT = "ReconciledForest"
+FOREST_FORMAT_VERSION = 1
+FOREST_METADATA_FILE = "forest.json"
+
+## numeric columns of a forest, with their dtype
+FOREST_COLUMNS = { "treeOffsets" : np.int64 ,
+                   "nodeTree" : np.int32 ,
+                   "parent" : np.int32 ,
+                   "firstChild" : np.int32 ,
+                   "nextSibling" : np.int32 ,
+                   "eventOffsets" : np.int64 ,
+                   "eventKind" : np.int8 ,
+                   "eventSpecies" : np.int32 ,
+                   "eventTimeSlice" : np.int32 }
+
+## types of the features of the species tree nodes which are saved with a forest
+SAVED_FEATURE_TYPES = (str, int, float, bool)
+
+
+class StringColumn:
+    """
+    A read-only sequence of strings (or None) stored in numpy arrays : a table of distinct utf-8 strings,
+    and the index in this table of each element of the sequence.
+    The strings are decoded when they are accessed, so that a column backed by memory-mapped arrays is opened in constant time.
+
+    Atributes:
+        - self.data    : (uint8 array) the utf-8 bytes of the strings of the table, one after the other
+        - self.offsets : (int64 array, nbStrings + 1) the string j of the table is data[offsets[j]:offsets[j+1]]
+        - self.indexes : (int32 array) index in the table of each element of the sequence (NO_STRING for None)
+    """
+
+    def __init__(self, data, offsets, indexes):
+        self.data = data
+        self.offsets = offsets
+        self.indexes = indexes
+
+    def getString(self, j):
+        """
+        Takes:
+            - j (int) : index of a string in the table
+
+        Returns:
+            (str) : the string (None if j is NO_STRING)
+        """
+        if j == NO_STRING:
+            return None
+        return self.data[ int(self.offsets[j]) : int(self.offsets[j + 1]) ].tobytes().decode("utf-8")
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, i):
+        return self.getString( int(self.indexes[i]) )
+
+    def __iter__(self):
+        for j in self.indexes.tolist():
+            yield self.getString(j)
+
+
+class StringTableBuilder:
+    """
+    Builds the table of distinct strings of StringColumn instances sharing the same table.
+
+    Atributes:
+        - self.index   : (dict) string -> index in the table
+        - self.strings : (list) the utf-8 encoding of the strings of the table
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def getIndexes(self, strings):
+        """
+        Takes:
+            - strings (iterable) : strings (or None) ; those which are not in the table yet are added to it
+
+        Returns:
+            (int32 array) : the index in the table of each string (NO_STRING for None)
+        """
+        index = self.index
+        indexes = []
+        for s in strings:
+            if s is None:
+                indexes.append(NO_STRING)
+                continue
+            j = index.get(s)
+            if j is None:
+                j = len(self.strings)
+                index[s] = j
+                self.strings.append( str(s).encode("utf-8") )
+            indexes.append(j)
+        return np.array(indexes, dtype = np.int32)
+
+    def getArrays(self):
+        """
+        Returns:
+            (tuple) : (uint8 array) data , (int64 array) offsets of the table (see StringColumn)
+        """
+        offsets = np.zeros( len(self.strings) + 1 , dtype = np.int64 )
+        np.cumsum( [ len(s) for s in self.strings ] , out = offsets[1:] )
+        data = np.frombuffer( b"".join(self.strings) , dtype = np.uint8 )
+        return data , offsets
+
+
+def getSavedFeatures(node):
+    """
+    Takes:
+        - node (ete3.TreeNode or LightTree) : a node of a species tree
+
+    Returns:
+        (dict) : the features of the node, other than its name, whose value is a string, a number or a boolean
+    """
+    if isinstance(node, LightTree):
+        features = node.features
+    else:
+        features = { f : getattr(node, f, None) for f in node.features if f != "name" }
+    return { f : v for f, v in features.items() if isinstance(v, SAVED_FEATURE_TYPES) }
+
+
+class ReconciledForest:
+    """
+    A set of reconciled gene trees stored as numpy arrays.
+
+    Atributes:
+        - self.spTree          : the species tree these trees are reconciled with (or None if no species tree is specified)
+        - self.treeBackend     : (str) class of the nodes of the trees rebuilt by getTree : "ete3" (ReconciledTree) or "light" (LightReconciledTree)
+        - self.treeOffsets     : (int64 array, nbTrees + 1) the nodes of tree t are the nodes treeOffsets[t] to treeOffsets[t+1] - 1
+        - self.nodeTree        : (int32 array, nbNodes) index of the tree of each node
+        - self.parent          : (int32 array, nbNodes) index of the parent of each node (-1 for a root)
+        - self.firstChild      : (int32 array, nbNodes) index of the first child of each node (-1 for a leaf)
+        - self.nextSibling     : (int32 array, nbNodes) index of the next sibling of each node (-1 for the last child)
+        - self.nodeNames       : (list, nbNodes) name of each node (a StringColumn for a loaded forest)
+        - self.eventOffsets    : (int64 array, nbNodes + 1) the events of node n are the events eventOffsets[n] to eventOffsets[n+1] - 1
+        - self.eventKind       : (int8 array, nbEvents) EventKind of each event
+        - self.eventSpecies    : (int32 array, nbEvents) index of the species of each event in speciesIds (NO_SPECIES if it has none)
+        - self.eventTimeSlice  : (int32 array, nbEvents) time slice of each event (NO_TIMESLICE if it has none)
+        - self.speciesIds      : (list) the species identifiers met in the events
+        - self.eventCodes      : (dict) event index -> original event code, for the events of kind EventKind.OTHER
+        - self.eventInfo       : (dict) event index -> additionnal information, for the events which have some
+
+    NB: the features of the nodes (other than their name) are not kept.
+    """
+
+    def __init__(self, spTree = None, treeBackend = "ete3"):
+        """
+        Creates an empty forest ; see fromTrees and fromReconciledTreeList to fill one.
+
+        Takes:
+            - spTree (ete3.Tree) [ default = None ] : facultative species tree
+            - treeBackend (str) [default = "ete3"] : class of the nodes of the trees rebuilt by getTree : "ete3" (ReconciledTree) or "light" (LightReconciledTree)
+        """
+        if not treeBackend in ["ete3", "light"]:
+            raise Exception("recPhyloXML exception. Unknown tree backend " + str(treeBackend) + " (expected one of ete3, light).")
+
+        self.spTree = spTree
+        self.treeBackend = treeBackend
+        self.speciesIds = []
+        self.eventCodes = {}
+        self.eventInfo = {}
+        self.nodeNames = []
+        self.setArrays( [0] , [] , [] , [] , [] , [0] , [] , [] , [] )
+
+
+    def setArrays(self, treeOffsets, nodeTree, parent, firstChild, nextSibling, eventOffsets, eventKind, eventSpecies, eventTimeSlice):
+        """ sets the columns of the forest from sequences of integers (see the attributes of the class) """
+        self.treeOffsets = np.array(treeOffsets, dtype = np.int64)
+        self.nodeTree = np.array(nodeTree, dtype = np.int32)
+        self.parent = np.array(parent, dtype = np.int32)
+        self.firstChild = np.array(firstChild, dtype = np.int32)
+        self.nextSibling = np.array(nextSibling, dtype = np.int32)
+        self.eventOffsets = np.array(eventOffsets, dtype = np.int64)
+        self.eventKind = np.array(eventKind, dtype = np.int8)
+        self.eventSpecies = np.array(eventSpecies, dtype = np.int32)
+        self.eventTimeSlice = np.array(eventTimeSlice, dtype = np.int32)
+
+
+    @staticmethod
+    def fromTrees(trees , spTree = None , treeBackend = None):
+        """
+        Takes:
+            - trees (iterable) : ReconciledTree (or LightReconciledTree) instances ; any other object met is taken as the species tree
+                                 (so that the output of recPhyloXML_parser.iterparse can be given directly)
+            - spTree (ete3.Tree) [ default = None ] : facultative species tree
+            - treeBackend (str) [default = None] : class of the nodes of the trees rebuilt by getTree : "ete3" or "light"
+                                                   (None : the class of the first tree)
+
+        Returns:
+            (ReconciledForest) : the forest of the trees, in the same order
+        """
+        forest = ReconciledForest(spTree , "ete3" if treeBackend is None else treeBackend)
+
+        speciesIndex = {}
+
+        treeOffsets = [0]
+        nodeTree = []
+        parent = []
+        firstChild = []
+        nextSibling = []
+        lastChild = []
+        eventOffsets = [0]
+        eventKind = []
+        eventSpecies = []
+        eventTimeSlice = []
+
+        for RT in trees:
+
+            if not isinstance(RT, ReconciledTreeBase):
+                forest.spTree = RT
+                continue
+
+            treeIndex = len(treeOffsets) - 1
+
+            if treeIndex == 0 and treeBackend is None:
+                forest.treeBackend = "light" if isinstance(RT, LightReconciledTree) else "ete3"
+
+            stack = [ ( RT , -1 ) ]
+
+            while len(stack) > 0:
+                node , parentIndex = stack.pop()
+
+                index = len(parent)
+
+                nodeTree.append(treeIndex)
+                parent.append(parentIndex)
+                firstChild.append(-1)
+                nextSibling.append(-1)
+                lastChild.append(-1)
+                forest.nodeNames.append(node.name)
+
+                if parentIndex >= 0: ## the children of a node are met in order in a preorder traversal
+                    if firstChild[parentIndex] == -1:
+                        firstChild[parentIndex] = index
+                    else:
+                        nextSibling[ lastChild[parentIndex] ] = index
+                    lastChild[parentIndex] = index
+
+                for e in node.eventRecs:
+                    eventIndex = len(eventKind)
+
+                    eventKind.append( e.kind )
+                    if e.kind == KIND_OTHER:
+                        forest.eventCodes[eventIndex] = e.rawCode
+
+                    if e.species is None:
+                        eventSpecies.append( NO_SPECIES )
+                    else:
+                        sp = speciesIndex.get(e.species)
+                        if sp is None:
+                            sp = len(forest.speciesIds)
+                            speciesIndex[e.species] = sp
+                            forest.speciesIds.append(e.species)
+                        eventSpecies.append( sp )
+
+                    eventTimeSlice.append( NO_TIMESLICE if e.timeSlice is None else e.timeSlice )
+
+                    if len(e.additionnalInfo) > 0:
+                        forest.eventInfo[eventIndex] = dict(e.additionnalInfo)
+
+                eventOffsets.append( len(eventKind) )
+
+                for ch in reversed(node.children):
+                    stack.append( ( ch , index ) )
+
+            treeOffsets.append( len(parent) )
+
+        forest.setArrays( treeOffsets , nodeTree , parent , firstChild , nextSibling , eventOffsets , eventKind , eventSpecies , eventTimeSlice )
+
+        return forest
+
+
+    @staticmethod
+    def fromReconciledTreeList(RTL):
+        """
+        Takes:
+            - RTL (ReconciledTreeList) : a set of reconciled trees
+
+        Returns:
+            (ReconciledForest) : the forest of the trees of RTL, with its species tree (and the class of its trees, see fromTrees)
+        """
+        return ReconciledForest.fromTrees( RTL , RTL.spTree )
+
+
+    def save(self, directory):
+        """
+        Writes the forest to a directory, as one .npy file per column (see FOREST_COLUMNS) and :
+            - strings.npy , stringOffsets.npy : the table of the distinct strings of the forest (node names, species ids, names of the species tree)
+            - nodeName.npy , speciesIds.npy : index in the string table of the name of each node, and of each species id
+            - spTreeParent.npy , spTreeName.npy : index of the parent and of the name of each node of the species tree, in pre-order
+            - forest.json : format version, event codes and additionnal information of the events,
+                            features of the nodes of the species tree (those whose value is a string, a number or a boolean)
+        forest.json is written last, so that a directory where the writing was interrupted cannot be loaded.
+
+        Takes:
+            - directory (str) : name of the directory (created if needed ; the files of a previous forest are replaced)
+        """
+        os.makedirs(directory, exist_ok = True)
+
+        metadataFile = os.path.join(directory, FOREST_METADATA_FILE)
+        if os.path.isfile(metadataFile):
+            os.remove(metadataFile)
+
+        for name, dtype in FOREST_COLUMNS.items():
+            np.save( os.path.join(directory, name + ".npy") , np.asarray( getattr(self, name) , dtype = dtype ) )
+
+        table = StringTableBuilder()
+        np.save( os.path.join(directory, "nodeName.npy") , table.getIndexes(self.nodeNames) )
+        np.save( os.path.join(directory, "speciesIds.npy") , table.getIndexes(self.speciesIds) )
+
+        spTreeFeatures = {}
+        spTreeParent = []
+        spTreeNames = []
+        if self.hasSpTree():
+            stack = [ ( self.spTree , -1 ) ]
+            while len(stack) > 0:
+                node , parentIndex = stack.pop()
+                index = len(spTreeParent)
+                spTreeParent.append(parentIndex)
+                spTreeNames.append(node.name)
+                features = getSavedFeatures(node)
+                if len(features) > 0:
+                    spTreeFeatures[index] = features
+                for ch in reversed(node.children):
+                    stack.append( ( ch , index ) )
+
+        np.save( os.path.join(directory, "spTreeParent.npy") , np.array(spTreeParent, dtype = np.int32) )
+        np.save( os.path.join(directory, "spTreeName.npy") , table.getIndexes(spTreeNames) )
+
+        data , offsets = table.getArrays()
+        np.save( os.path.join(directory, "strings.npy") , data )
+        np.save( os.path.join(directory, "stringOffsets.npy") , offsets )
+
+        metadata = { "format" : FOREST_FORMAT ,
+                     "version" : FOREST_FORMAT_VERSION ,
+                     "hasSpTree" : self.hasSpTree() ,
+                     "eventCodes" : self.eventCodes ,
+                     "eventInfo" : self.eventInfo ,
+                     "spTreeFeatures" : spTreeFeatures }
+
+        OUT = open(metadataFile, "w")
+        json.dump(metadata, OUT)
+        OUT.close()
+
+
+    @staticmethod
+    def load(directory, mmapMode = "r", treeBackend = "ete3"):
+        """
+        Opens a forest written by ReconciledForest.save.
+        The columns are memory-mapped (numpy.memmap) : they are read from the disk when they are accessed,
+        and the node names are decoded one at a time (see StringColumn).
+
+        Takes:
+            - directory (str) : name of the directory of the forest
+            - mmapMode (str or None) [default = "r"] : mode of the memory maps of the columns (see numpy.load)
+                                                       "r" : read-only ; "c" : copy-on-write ; None : the columns are read in memory
+            - treeBackend (str) [default = "ete3"] : class of the nodes of the species tree and of the trees rebuilt by getTree :
+                                                     "ete3" (ete3.Tree and ReconciledTree) or "light" (LightTree and LightReconciledTree)
+
+        Returns:
+            (ReconciledForest)
+        """
+        forest = ReconciledForest(treeBackend = treeBackend)
+
+        metadataFile = os.path.join(directory, FOREST_METADATA_FILE)
+        if not os.path.isfile(metadataFile):
+            raise Exception("recPhyloXML exception. " + directory + " does not contain a saved forest (no " + FOREST_METADATA_FILE + " file).")
+
+        IN = open(metadataFile, "r")
+        metadata = json.load(IN)
+        IN.close()
+
+        if metadata.get("format") != FOREST_FORMAT or metadata.get("version") != FOREST_FORMAT_VERSION:
+            raise Exception("recPhyloXML exception. Unsupported forest format in " + directory + " : " + str(metadata.get("format")) + " version " + str(metadata.get("version")) + ".")
+
+        def loadColumn(name, dtype):
+            column = np.load( os.path.join(directory, name + ".npy") , mmap_mode = mmapMode )
+            if column.dtype != dtype or column.ndim != 1:
+                raise Exception("recPhyloXML exception. Column " + name + " of the forest in " + directory + " should be a 1-dimensional array of " + np.dtype(dtype).name + ".")
+            return column
+
+        for name, dtype in FOREST_COLUMNS.items():
+            setattr( forest , name , loadColumn(name, dtype) )
+
+        data = loadColumn("strings", np.uint8)
+        offsets = loadColumn("stringOffsets", np.int64)
+
+        forest.nodeNames = StringColumn( data , offsets , loadColumn("nodeName", np.int32) )
+        forest.speciesIds = list( StringColumn( data , offsets , loadColumn("speciesIds", np.int32) ) )
+
+        forest.eventCodes = { int(e) : code for e, code in metadata["eventCodes"].items() }
+        forest.eventInfo = { int(e) : info for e, info in metadata["eventInfo"].items() }
+
+        if metadata["hasSpTree"]:
+            spTreeParent = np.load( os.path.join(directory, "spTreeParent.npy") ).tolist()
+            spTreeNames = StringColumn( data , offsets , np.load( os.path.join(directory, "spTreeName.npy") ) )
+            spTreeFeatures = metadata["spTreeFeatures"]
+
+            nodes = []
+            for i, name in enumerate(spTreeNames):
+                node = LightTree(name)
+                node.features.update( spTreeFeatures.get( str(i) , {} ) )
+                if spTreeParent[i] >= 0:
+                    nodes[ spTreeParent[i] ].add_child(node) ## pre-order : the children are added in order
+                nodes.append(node)
+
+            forest.spTree = nodes[0]
+            if treeBackend == "ete3":
+                forest.spTree = forest.spTree.toEte3()
+
+        return forest
+
+
+    def __len__(self):
+        """
+        Returns:
+            (int) : number of trees in the forest
+        """
+        return len(self.treeOffsets) - 1
+
+    def nbNodes(self):
+        """
+        Returns:
+            (int) : number of nodes in the forest
+        """
+        return len(self.parent)
+
+    def nbEvents(self):
+        """
+        Returns:
+            (int) : number of events in the forest
+        """
+        return len(self.eventKind)
+
+    def hasSpTree(self):
+        """
+        Returns:
+            (bool) : True if there this instance has a species tree (ie. self.spTree is not None), False otherwise
+        """
+        return not self.spTree is None
+
+
+    def getEvent(self, eventIndex):
+        """
+        Takes:
+            - eventIndex (int) : index of an event
+
+        Returns:
+            (RecEvent) : the event
+        """
+        kind = int(self.eventKind[eventIndex])
+
+        code = self.eventCodes[eventIndex] if kind == EventKind.OTHER else EVENTKIND_CODES[kind]
+
+        sp = int(self.eventSpecies[eventIndex])
+        species = None if sp == NO_SPECIES else self.speciesIds[sp]
+
+        ts = int(self.eventTimeSlice[eventIndex])
+        if ts == NO_TIMESLICE:
+            ts = None
+
+        return RecEvent( code , species , ts , self.eventInfo.get(eventIndex, EMPTY_ADDITIONNALINFO) )
+
+
+    def getTree(self, i):
+        """
+        Takes:
+            - i (int) : index of a tree
+
+        Returns:
+            (ReconciledTree or LightReconciledTree) : the tree, as instances of the class of self.treeBackend
+        """
+        if i < 0:
+            i += len(self)
+
+        if i < 0 or i >= len(self):
+            raise IndexError('Index out of range. There are no reconciled tree with index ' + str(i) + '.')
+
+        if self.treeBackend == "ete3":
+            from ReconciledTree import ReconciledTree as nodeClass ## ete3 is only needed here
+        else:
+            nodeClass = LightReconciledTree
+
+        start = int(self.treeOffsets[i])
+        end = int(self.treeOffsets[i + 1])
+
+        nodes = []
+
+        for n in range(start, end):
+            node = nodeClass()
+            node.name = self.nodeNames[n]
+
+            for e in range( int(self.eventOffsets[n]) , int(self.eventOffsets[n + 1]) ):
+                node.addEvent( self.getEvent(e) )
+
+            nodes.append(node)
+
+            p = int(self.parent[n])
+            if p >= 0:
+                nodes[p - start].add_child(node) ## preorder : the children are added in order
+
+        return nodes[0]
+
+
+    def toReconciledTreeList(self):
+        """
+        Returns:
+            (ReconciledTreeList) : the trees of the forest, with its species tree
+        """
+        RTL = ReconciledTreeList(self.spTree)
+        for i in range(len(self)):
+            RTL.append( self.getTree(i) )
+        return RTL
+
+
+    def getEventNodes(self):
+        """
+        Returns:
+            (int32 array, nbEvents) : index of the node of each event
+        """
+        return np.repeat( np.arange(self.nbNodes(), dtype = np.int32) , np.diff(self.eventOffsets) )
+
+
+    def countEvents(self):
+        """
+        Returns:
+            (dict) : keys are event codes, values are the number of times these events occur in the forest
+        """
+        counts = np.bincount( self.eventKind , minlength = len(EVENTKIND_CODES) )
+
+        devent = {}
+        for kind in EventKind:
+            if kind != EventKind.OTHER and counts[kind] > 0:
+                devent[ EVENTKIND_CODES[kind] ] = int(counts[kind])
+
+        for code in self.eventCodes.values():
+            devent[code] = devent.get(code, 0) + 1
+
+        return devent
+
+
+    def getLostSpeciesIndexes(self , speciesIdFeature = "name"):
+        """
+        Computes the species where the losses of the forest occured (see ReconciledTree.getLostSpecies).
+
+        Takes:
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Returns:
+            (tuple) : (int64 array) index of the loss, speciationLoss and branchingOutLoss events ,
+                      (int32 array) index of the lost species in the returned species ids ,
+                      (list) species ids : speciesIds, extended with the lost species which are not in it
+        """
+        kind = self.eventKind
+        speciesIds = self.speciesIds
+
+        lossEvents = np.flatnonzero( ( kind == EventKind.LOSS ) | ( kind == EventKind.SPECIATION_LOSS ) | ( kind == EventKind.BRANCHING_OUT_LOSS ) )
+
+        lostSpecies = self.eventSpecies[lossEvents].copy() ## loss and branchingOutLoss : the species of the event
+
+        isSL = kind[lossEvents] == EventKind.SPECIATION_LOSS
+
+        if np.any(isSL):
+            SLevents = lossEvents[isSL]
+
+            ## the species of a speciationLoss is the one of the speciation : the lost species is the sister of the species of the next event of the node
+            eventNodes = self.getEventNodes()
+            if np.any( SLevents + 1 >= self.eventOffsets[ eventNodes[SLevents] + 1 ] ):
+                raise Exception("recPhyloXML exception. A speciationLoss event is the last event of its node.")
+
+            nextSpecies = self.eventSpecies[ SLevents + 1 ]
+            if np.any( nextSpecies == NO_SPECIES ):
+                raise Exception("recPhyloXML exception. The event following a speciationLoss event has no species.")
+
+            sisters , speciesIds = self.getSisterSpeciesIndexes(speciesIdFeature)
+            lostSpecies[isSL] = sisters[ nextSpecies ]
+
+            noSister = nextSpecies[ sisters[ nextSpecies ] == NO_SPECIES ]
+            if len(noSister) > 0: ## same exception as SpeciesTreeIndex.getSister
+                raise Exception("recPhyloXML exception. Species " + str(self.speciesIds[ noSister[0] ]) + " has no sister in the species tree.")
+
+        return lossEvents , lostSpecies , speciesIds
+
+
+    def getSisterSpeciesIndexes(self , speciesIdFeature = "name"):
+        """
+        Takes:
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Returns:
+            (tuple) : (int32 array) for each species of speciesIds, index of its sister in the returned species ids (NO_SPECIES if the species has no sister)
+                      (list) species ids : a copy of speciesIds, extended with the sisters which are not in it (speciesIds is left unchanged)
+        """
+        if not self.hasSpTree():
+            raise Exception("recPhyloXML exception. Can't get sister species when no species tree has been assigned.")
+
+        speciesIds = list(self.speciesIds)
+        speciesIndex = { sp : i for i, sp in enumerate(speciesIds) }
+        spTreeIndex = SpeciesTreeIndex(self.spTree, speciesIdFeature)
+
+        sisters = []
+        for sp in self.speciesIds:
+            sisterIndex = spTreeIndex.sisters[ spTreeIndex.getIndex(sp) ]
+            if sisterIndex == -1:
+                sisters.append( NO_SPECIES )
+                continue
+
+            sisterId = spTreeIndex.ids[sisterIndex]
+
+            if not sisterId in speciesIndex:
+                speciesIndex[sisterId] = len(speciesIds)
+                speciesIds.append(sisterId)
+            sisters.append( speciesIndex[sisterId] )
+
+        return np.array(sisters, dtype = np.int32) , speciesIds
+
+
+    def getEventsSummary(self , includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name" , indexBySpecies=False):
+        """
+        Vectorized equivalent of ReconciledTreeList.getEventsSummary
+        !!only works if there is a species tree assigned to the object!!
+
+        Takes:
+             - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag) in the counts.
+             - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag) in the counts.
+             - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+             - indexBySpecies (str) [default = False] : if True, the returned dictionnary will have species as keys and event counts as values.
+
+        Returns:
+            (dict):
+                    keys are events type among : "duplication" , "loss" , "transferReception" , "transferDeparture"
+                    values are  lists of species id (in the order of the events)
+
+                   OR, if indexBySpecies=True:
+                       keys are species id
+                       values are dict with keys among "duplication" , "loss" , "transferReception" , "transferDeparture"
+                                            and values as counts of the events in each species
+        """
+        if not self.hasSpTree():
+            raise Exception("recPhyloXML exception. Can't get an events summary when no species tree has been assigned.")
+
+        if indexBySpecies:
+            speciesIds , eventTypes , matrix = self.getEventsCountMatrix(includeTransferReception , includeTransferDeparture , speciesIdFeature)
+            return eventsCountMatrixToSummary(self.spTree , speciesIds , eventTypes , matrix , speciesIdFeature)
+
+        speciesIds , speciesColumns = self.getEventsSpeciesColumns(includeTransferReception , includeTransferDeparture , speciesIdFeature)
+        ids = speciesIds + [ None ] ## NO_SPECIES (-1) gives None
+        return { e : [ ids[sp] for sp in column.tolist() ] for e, column in speciesColumns.items() }
+
+
+    def getEventsSpeciesColumns(self , includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name"):
+        """
+        Takes:
+             - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag).
+             - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag).
+             - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Returns:
+            (tuple) : (list) species ids : speciesIds, extended with the lost species which are not in it
+                      (dict) keys are events type among : "duplication" , "loss" , "transferReception" , "transferDeparture"
+                             values are int32 arrays of the index in the species ids of the species of each event of this type
+        """
+        lossEvents , lostSpecies , speciesIds = self.getLostSpeciesIndexes(speciesIdFeature)
+
+        speciesColumns = { "duplication" : self.eventSpecies[ self.eventKind == EventKind.DUPLICATION ],
+                           "loss" : lostSpecies }
+
+        if includeTransferReception:
+            speciesColumns["transferReception"] = self.eventSpecies[ self.eventKind == EventKind.TRANSFER_BACK ]
+
+        if includeTransferDeparture: ## a branchingOutLoss is reported as a loss only
+            speciesColumns["transferDeparture"] = self.eventSpecies[ self.eventKind == EventKind.BRANCHING_OUT ]
+
+        return speciesIds , speciesColumns
+
+
+    def getEventsCountMatrix(self , includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name"):
+        """
+        Vectorized equivalent of ReconciledTreeList.getEventsCountMatrix
+        !!only works if there is a species tree assigned to the object!!
+
+        Takes:
+             - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag) in the counts.
+             - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag) in the counts.
+             - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Returns:
+            (tuple) : (list) the species ids (rows of the matrix), in the pre-order of the species tree
+                      (list) the event types (columns of the matrix), among "duplication" , "loss" , "transferReception" , "transferDeparture"
+                      (int64 array, nbSpecies x nbEventTypes) the matrix of event counts
+        """
+        if not self.hasSpTree():
+            raise Exception("recPhyloXML exception. Can't get an events summary when no species tree has been assigned.")
+
+        speciesIds , speciesColumns = self.getEventsSpeciesColumns(includeTransferReception , includeTransferDeparture , speciesIdFeature)
+
+        spTreeIndex = SpeciesTreeIndex(self.spTree, speciesIdFeature)
+        rows = np.array( [ spTreeIndex.idToIndex[sp] for sp in speciesIds ] , dtype = np.int64 ) ## index in speciesIds -> row of the matrix
+
+        eventTypes = list(speciesColumns.keys())
+        nbRows = len(spTreeIndex.ids)
+
+        matrix = np.zeros( ( nbRows , len(eventTypes) ) , dtype = np.int64 )
+        for j, e in enumerate(eventTypes):
+            column = speciesColumns[e]
+            if np.any( column == NO_SPECIES ):
+                raise Exception("recPhyloXML exception. A " + e + " event has no species.")
+            matrix[:,j] = np.bincount( rows[column] , minlength = nbRows )
+
+        return spTreeIndex.ids , eventTypes , matrix
@@ -0,0 +1,1219 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Bastien Boussau , Wandrille Duchemin
+##  Created:        13-Jan-2017
+##  Last modified:  18-Oct-2026
+##
+##  Decribes the parts of the reconciled trees which do not depend on ete3 :
+##          ReconciledTreeBase, the methods shared by the ete3-based ReconciledTree (ReconciledTree.py)
+##                              and the lightweight LightReconciledTree (LightReconciledTree.py)
+##          ReconciledTreeList, a container for several reconciled trees and a facultative species tree
+##  (split from ReconciledTree.py)
+##
+##  requires : RecEvent.py
+##             SpeciesTreeIndex.py
+##
+##  developped for python3.0
+##
+#########################################
+
+
+from RecEvent import KIND_DUPLICATION , KIND_LOSS , KIND_TRANSFER_BACK , KIND_BRANCHING_OUT , KIND_SPECIATION_LOSS , KIND_BRANCHING_OUT_LOSS
+from RecEvent import KIND_OTHER , EVENTKIND_CODES , EVENTTAGCORRESPONDANCE
+from SpeciesTreeIndex import SpeciesTreeIndex, getSpeciesTreeIndex
+
+import os
+import multiprocessing
+from collections import deque
+
+
+RECPHYLOTAG = "recPhylo"
+RECTREETAG = "recGeneTree"
+SPTREETAG = "spTree"
+
+## names of the features listing, in document order, the features holding the xml text of elements
+## which are not part of the recPhyloXML format (see the extraElements option of recPhyloXML_parser)
+EXTRA_ELEMENT_TAGS_FEATURE = "extraElementTags"
+PHYLOGENY_EXTRA_ELEMENT_TAGS_FEATURE = "phylogenyExtraElementTags"
+
+## event types of the events summaries, in the order of their keys (or columns)
+EVENTS_SUMMARY_TYPES = [ "duplication" , "loss" , "transferReception" , "transferDeparture" ]
+
+## fields of the rows of the event tables (see ReconciledTreeBase.iter_event_rows)
+EVENT_ROW_FIELDS = ( "tree_id" , "node_name" , "event_index" , "event_kind" , "species" , "time_slice" , "lost_species" )
+
+## recPhyloXML tag of each EventKind (indexed by the kind ; None for EventKind.OTHER)
+EVENTKIND_TAGS = [ None ] + [ EVENTTAGCORRESPONDANCE[code] for code in EVENTKIND_CODES[1:] ]
+
+
+def getEventsSummaryTypes(includeTransferReception = True , includeTransferDeparture = False):
+    """
+    Takes:
+         - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag)
+         - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag)
+
+    Returns:
+        (list) : the event types of an events summary
+    """
+    types = EVENTS_SUMMARY_TYPES[:2]
+    if includeTransferReception:
+        types.append("transferReception")
+    if includeTransferDeparture:
+        types.append("transferDeparture")
+    return types
+
+
+def eventsCountMatrixToSummary(spTree , speciesIds , eventTypes , matrix , speciesIdFeature = "name"):
+    """
+    Takes:
+        - spTree (ete3.Tree) : a species tree
+        - speciesIds (list) : species ids of the rows of the matrix
+        - eventTypes (list) : event types of the columns of the matrix
+        - matrix : the count matrix (see ReconciledTreeList.getEventsCountMatrix)
+        - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+    Returns:
+        (dict) : the events summary indexed by species (see ReconciledTreeList.getEventsSummary) :
+                    keys are species id, in the order of a traversal of the species tree
+                    values are dict with the event types as keys and the counts of the events in each species as values
+    """
+    rows = {}
+    for i, sp in enumerate(speciesIds):
+        rows.setdefault(sp, i)
+
+    EventsSummary = {}
+
+    for n in spTree.traverse():
+        sp = getattr(n,speciesIdFeature)
+        row = matrix[ rows[sp] ]
+        EventsSummary[sp] = { e : int(row[j]) for j, e in enumerate(eventTypes) }
+
+    return EventsSummary
+
+
+def getTreesEventsSummary(trees , spTreeIndex , includeTransferReception = True , includeTransferDeparture = False):
+    """
+    Takes:
+        - trees (iterable) : reconciled trees
+        - spTreeIndex (SpeciesTreeIndex) : index of their species tree
+        - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag).
+        - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag).
+
+    Returns:
+        (dict) : the events summary of the trees (see ReconciledTreeList.getEventsSummary)
+    """
+    EventsSummary = { e : [] for e in getEventsSummaryTypes(includeTransferReception , includeTransferDeparture) }
+
+    for RT in trees:
+        for e , sp in RT.iterEventsSummary(spTreeIndex , includeTransferReception , includeTransferDeparture , spTreeIndex.speciesIdFeature):
+            EventsSummary[e].append(sp)
+
+    return EventsSummary
+
+
+def getTreesEventsCountMatrix(trees , spTreeIndex , includeTransferReception = True , includeTransferDeparture = False):
+    """
+    Takes:
+        - trees (iterable) : reconciled trees
+        - spTreeIndex (SpeciesTreeIndex) : index of their species tree
+        - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag).
+        - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag).
+
+    Returns:
+        (list) : the count matrix of the events of the trees (see ReconciledTreeList.getEventsCountMatrix)
+    """
+    eventTypes = getEventsSummaryTypes(includeTransferReception , includeTransferDeparture)
+    columns = { e : j for j, e in enumerate(eventTypes) }
+
+    matrix = [ [ 0 ] * len(eventTypes) for sp in spTreeIndex.ids ]
+
+    rows = spTreeIndex.idToIndex
+    for RT in trees:
+        for e , sp in RT.iterEventsSummary(spTreeIndex , includeTransferReception , includeTransferDeparture , spTreeIndex.speciesIdFeature):
+            matrix[ rows[sp] ][ columns[e] ] += 1
+
+    return matrix
+
+
+def addEventsCountMatrix(matrix , other):
+    """
+    *modifies matrix in place*
+
+    Takes:
+        - matrix (list) : a count matrix (see ReconciledTreeList.getEventsCountMatrix)
+        - other (list) : a count matrix with the same rows and columns, whose counts are added to matrix
+    """
+    for row , otherRow in zip(matrix, other):
+        for j, c in enumerate(otherRow):
+            row[j] += c
+
+
+## maximum number of trees sent at once to a worker process by the parallel events summaries
+MAX_SUMMARY_SHARD_SIZE = 1000
+
+## state of the worker processes of the parallel events summaries (see initEventsSummaryWorker)
+EVENTS_SUMMARY_WORKER = {}
+
+
+def initEventsSummaryWorker(spTreeState , speciesIdFeature , sharedTrees = None):
+    """
+    Initializer of the worker processes of ReconciledTreeList.mapEventsSummaryShards and recPhyloXML_parser.parse_eventsSummary_parallel :
+    the species tree is sent once to each worker, which indexes it.
+
+    Takes:
+        - spTreeState (tuple) : the species tree, flattened by ReconciledTreeIO.flattenTree
+        - speciesIdFeature (str) : the feature to use as Id in the species tree
+        - sharedTrees (list or None) [default = None] : the trees to summarize, when the workers are forked (they inherit the list instead of receiving a copy of it)
+    """
+    from ReconciledTreeIO import unflattenTree
+
+    EVENTS_SUMMARY_WORKER["spTreeIndex"] = SpeciesTreeIndex( unflattenTree(spTreeState) , speciesIdFeature )
+    EVENTS_SUMMARY_WORKER["trees"] = sharedTrees
+
+
+def getSharedSummaryTrees(start , end):
+    """
+    Takes:
+        - start (int) , end (int) : positions of the trees in the list given to initEventsSummaryWorker
+
+    Returns:
+        (list) : the trees between these positions
+    """
+    return EVENTS_SUMMARY_WORKER["trees"][start:end]
+
+
+def eventsSummaryWorker(loadTrees , arguments , includeTransferReception , includeTransferDeparture , asMatrix):
+    """
+    Function executed by the worker processes of ReconciledTreeList.mapEventsSummaryShards.
+
+    Takes:
+        - loadTrees (function) , arguments (tuple) : loadTrees(*arguments) gives the trees of the shard
+        - includeTransferReception (bool) : whether or not to includes events of  TransferReception (transferBack tag).
+        - includeTransferDeparture (bool) : whether or not to includes events of  TransferDeparture (branchingOut tag).
+        - asMatrix (bool) : if True, the events are counted, otherwise their species are listed
+
+    Returns:
+        (list) : the count matrix of the shard (see getTreesEventsCountMatrix)
+            or
+        (dict) : the events summary of the shard (see getTreesEventsSummary)
+    """
+    trees = loadTrees(*arguments)
+    spTreeIndex = EVENTS_SUMMARY_WORKER["spTreeIndex"]
+
+    if asMatrix:
+        return getTreesEventsCountMatrix(trees , spTreeIndex , includeTransferReception , includeTransferDeparture)
+
+    return getTreesEventsSummary(trees , spTreeIndex , includeTransferReception , includeTransferDeparture)
+
+
+def eventsCountMatrixWorker(trees , includeTransferReception , includeTransferDeparture):
+    """
+    Function executed by the worker processes of recPhyloXML_parser.parse_eventsSummary with several workers
+    (the species tree is given by initEventsSummaryWorker).
+
+    Takes:
+        - trees (list) : reconciled trees
+        - includeTransferReception (bool) : whether or not to includes events of  TransferReception (transferBack tag).
+        - includeTransferDeparture (bool) : whether or not to includes events of  TransferDeparture (branchingOut tag).
+
+    Returns:
+        (list) : the count matrix of the trees (see getTreesEventsCountMatrix)
+    """
+    return getTreesEventsCountMatrix(trees , EVENTS_SUMMARY_WORKER["spTreeIndex"] , includeTransferReception , includeTransferDeparture)
+
+
+class EventsCountCache:
+    """
+    Running per-species event counts of the trees of a ReconciledTreeList (see ReconciledTreeList.getEventsCountMatrix).
+    The counts of each tree are kept, so that a modified tree can be recounted.
+
+    Atributes:
+        - self.spTree       : the species tree the counts refer to
+        - self.spTreeIndex  : its SpeciesTreeIndex (the rows of the matrix are its ids)
+        - self.includeTransferReception , self.includeTransferDeparture : (bool) options of the counts
+        - self.eventTypes   : (list) the counted event types (the columns of the matrix)
+        - self.matrix       : (list) the count matrix : one list of event counts per species
+        - self.treeCounts   : (list) for each counted tree, (dict) : ( row , column ) -> number of events
+    """
+
+    def __init__(self, spTree , includeTransferReception = True , includeTransferDeparture = False , speciesIdFeature = "name"):
+        """
+        Takes:
+            - spTree (ete3.Tree) : the species tree
+            - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag) in the counts.
+            - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag) in the counts.
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+        """
+        self.spTree = spTree
+        self.spTreeIndex = SpeciesTreeIndex(spTree , speciesIdFeature)
+        self.includeTransferReception = includeTransferReception
+        self.includeTransferDeparture = includeTransferDeparture
+        self.eventTypes = getEventsSummaryTypes(includeTransferReception , includeTransferDeparture)
+        self.columns = { e : j for j, e in enumerate(self.eventTypes) }
+        self.matrix = [ [ 0 ] * len(self.eventTypes) for sp in self.spTreeIndex.ids ]
+        self.treeCounts = []
+
+    def nbTrees(self):
+        """
+        Returns:
+            (int) : number of counted trees
+        """
+        return len(self.treeCounts)
+
+    def countTree(self, RT):
+        """
+        Takes:
+            - RT (ReconciledTree) : a reconciled tree
+
+        Returns:
+            (dict) : ( row , column ) -> number of events of the tree
+        """
+        counts = {}
+        rows = self.spTreeIndex.idToIndex
+        columns = self.columns
+        for e , sp in RT.iterEventsSummary(self.spTreeIndex , self.includeTransferReception , self.includeTransferDeparture , self.spTreeIndex.speciesIdFeature):
+            cell = ( rows[sp] , columns[e] )
+            counts[cell] = counts.get(cell, 0) + 1
+        return counts
+
+    def addCounts(self, counts, sign = 1):
+        """
+        Takes:
+            - counts (dict) : ( row , column ) -> number of events
+            - sign (int) [default = 1] : 1 to add the counts to the matrix, -1 to remove them
+        """
+        matrix = self.matrix
+        for ( i , j ) , n in counts.items():
+            matrix[i][j] += sign * n
+
+    def addTree(self, RT):
+        """
+        Takes:
+            - RT (ReconciledTree) : the next tree of the list
+        """
+        counts = self.countTree(RT)
+        self.addCounts(counts)
+        self.treeCounts.append(counts)
+
+    def refreshTree(self, i, RT):
+        """
+        Takes:
+            - i (int) : index of a counted tree
+            - RT (ReconciledTree) : the tree at that index, whose events may have been modified
+        """
+        self.addCounts( self.treeCounts[i] , -1 )
+        counts = self.countTree(RT)
+        self.addCounts(counts)
+        self.treeCounts[i] = counts
+
+
+def extraElementsXMLLines(tree, tagsFeature = EXTRA_ELEMENT_TAGS_FEATURE):
+    """
+    Takes:
+        - tree (ete3.TreeNode)
+        - tagsFeature (str) [default = EXTRA_ELEMENT_TAGS_FEATURE] : name of the feature listing the features to write
+
+    Returns:
+        (list): the preserved xml text of the extra elements of the node, as they were read
+    """
+    return [ getattr(tree, tag) for tag in getattr(tree, tagsFeature, []) ]
+
+
+def joinXMLLines(lines, start = 0):
+    """
+    *modifies lines in place*
+
+    For the compact output (indent = None) : the lines of an element, written without indentation, are joined into a single line.
+
+    Takes:
+        - lines (list) : list of xml lines
+        - start (int) [default = 0] : index of the first line of the element (which is the last element of lines)
+    """
+    lines[start:] = [ "".join(lines[start:]) ]
+
+
+def getIndents(indents, depth, indentChar = "  "):
+    """
+    *modifies indents in place*
+
+    Takes:
+        - indents (list) : indents[i] is the indentation of level i (at least the one of level 0)
+        - depth (int) : deepest level needed
+        - indentChar (str) [default = "  "] : indentation of one level
+
+    Returns:
+        (list) : indents, extended up to level depth
+    """
+    while len(indents) <= depth:
+        indents.append( indents[-1] + indentChar )
+    return indents
+
+
+## helper function to get XML lines for a simple XML tree. typically used for the species tree here
+def appendBasicTreeCladeXMLLines(tree, lines, offset = 0, indentChar = "  "):
+    """
+    *modifies lines in place*
+
+    Iterative : each line is built once, with its indentation computed from its depth.
+
+    Takes:
+        - tree (ete3.TreeNode)
+        - lines (list) : list the xml lines are appended to
+        - offset (int) [default = 0] : indentation level of the root clade
+        - indentChar (str) [default = "  "] : indentation of one level
+    """
+    indents = getIndents([ "" ], offset + 1, indentChar)
+
+    stack = [ ( tree , offset ) ] ## a (None, depth) element closes a clade
+    while len(stack) > 0:
+        node , depth = stack.pop()
+
+        if node is None:
+            lines.append( indents[depth] + "</clade>" )
+            continue
+
+        if depth + 1 >= len(indents):
+            getIndents(indents, depth + 1, indentChar)
+        indent = indents[depth + 1]
+
+        lines.append( indents[depth] + "<clade>" )
+        lines.append( indent + "<name>" + node.name + "</name>" )
+
+        for l in extraElementsXMLLines(node):
+            lines.append( indent + l )
+
+        stack.append( ( None , depth ) )
+        for c in reversed(node.children):
+            stack.append( ( c , depth + 1 ) )
+
+def appendBasicTreeXMLLines(tree, lines, offset = 0, indentChar = "  "):
+    """
+    *modifies lines in place*
+
+    Takes:
+        - tree (ete3.TreeNode)
+        - lines (list) : list the xml lines are appended to
+        - offset (int) [default = 0] : indentation level of the phylogeny element
+        - indentChar (str) [default = "  "] : indentation of one level
+    """
+    indent = indentChar * offset
+    lines.append( indent + "<phylogeny>" )
+    for l in extraElementsXMLLines(tree, PHYLOGENY_EXTRA_ELEMENT_TAGS_FEATURE):
+        lines.append( indent + indentChar + l )
+    appendBasicTreeCladeXMLLines(tree, lines, offset + 1, indentChar)
+    lines.append( indent + "</phylogeny>" )
+
+def myBasicTreeXMLLinesAux(tree, indent = "  "):
+    """
+    Takes:
+        - tree (ete3.TreeNode)
+        - indent (str or None) [default = "  "] : indentation of one level
+                                                  None : compact output, the clade is written on a single line, without indentation
+
+    Returns:
+        (list): list of xml lines
+    """
+    lines = []
+    appendBasicTreeCladeXMLLines(tree, lines, 0, "" if indent is None else indent)
+    if indent is None:
+        joinXMLLines(lines)
+    return lines
+
+def myBasicTreeXMLLines(tree, indent = "  "):
+    """
+    Takes:
+        - tree (ete3.TreeNode)
+        - indent (str or None) [default = "  "] : indentation of one level
+                                                  None : compact output, the phylogeny is written on a single line, without indentation
+
+    Returns:
+        (list): list of xml lines
+    """
+    lines = []
+    appendBasicTreeXMLLines(tree, lines, 0, "" if indent is None else indent)
+    if indent is None:
+        joinXMLLines(lines)
+    return lines
+
+
+class ReconciledTreeBase:
+    """
+    Reconciliation methods of a node of a reconciled gene tree.
+    The class using them provides the ete3.TreeNode interface (children, get_children, ...) and an eventRecs list.
+    """
+
+    __slots__ = ()
+
+    def setName(self, name):
+        """ NB : name can be any object with a __str__() fc (like an int for instance) """
+        self.name = name
+
+    def getEvents(self):
+        return self.eventRecs
+
+    def getEvent(self,i):
+        return self.eventRecs[i]
+
+    def popEvent(self , i):
+        return self.eventRecs.pop(i)
+
+
+    def addEvent(self , e,append = True):
+        """
+            Takes:
+                - e (RecEvent) : the reconciliation event to add
+                - append (bool) [default=True] : if True adds the event at the end of the list else, adds it at the beginning
+        """
+        if append:
+            self.eventRecs.append(e)
+        else:
+            self.eventRecs.insert(0,e)
+        return
+
+    def getTreeStrAux(self):
+
+        L = []
+        L.append("name : " + str(self.name) )
+        L.append("events :")
+        for e in self.eventRecs:
+            L.append("  " + str(e))
+        ChL = []
+        for c in self.get_children():
+            ChL += ["  " + s for s in c.getTreeStrAux()]
+        if len(ChL)>0:
+            L.append("children :")
+            L += ChL
+        return L
+
+
+
+    def getTreeStr(self):
+        return "\n".join(self.getTreeStrAux())
+
+    def getTreeNewickAux(self, sep="|", topoOnly = False):
+        s = ""
+
+        ChL = []
+        for c in self.get_children():
+            ChL.append(c.getTreeNewickAux(sep,topoOnly))
+        if len(ChL)>0:
+            s += "("
+            s += ",".join(ChL)
+            s += ")"
+
+        s += str(self.name)
+        if not topoOnly:
+            s += sep
+            s += sep.join( [e.nwkstr() for e in self.eventRecs] )
+
+        return s
+
+    def getTreeNewick(self, sep="|" , topoOnly = False):
+        return self.getTreeNewickAux(sep, topoOnly) + ";"
+
+    def appendCladeRecPhyloXMLLines(self , lines , speciesNames ={}, topoOnly = False , offset = 0 , indentChar = "  "):
+        """
+        *modifies lines in place*
+
+        Iterative : each line is built once, with its indentation computed from its depth
+        (so that the serialization is linear in the size of the tree, whatever its depth).
+
+        Takes:
+            - lines (list) : list the xml lines of the clade of this node are appended to
+            - speciesNames (dict) [default = {}] : see RecEvent.makeRecXMLstr
+            - topoOnly (bool) [default = False] : if True, only the topology and names of the tree are written
+            - offset (int) [default = 0] : indentation level of the clade of this node
+            - indentChar (str) [default = "  "] : indentation of one level
+        """
+        indents = getIndents([ "" ], offset + 2, indentChar)
+
+        stack = [ ( self , offset ) ] ## a (None, depth) element closes a clade
+        while len(stack) > 0:
+            node , depth = stack.pop()
+
+            if node is None:
+                lines.append( indents[depth] + "</clade>" )
+                continue
+
+            if depth + 2 >= len(indents):
+                getIndents(indents, depth + 2, indentChar)
+            indent = indents[depth + 1]
+
+            lines.append( indents[depth] + "<clade>" )
+            lines.append( indent + "<name>" + str(node.name) + "</name>" )
+            if not topoOnly:
+                lines.append( indent + "<eventsRec>" )
+                eventIndent = indents[depth + 2]
+                for e in node.eventRecs:
+                    s = e.makeRecXMLstr(speciesNames)
+                    if s == "":
+                        continue
+                    lines.append( eventIndent + s )
+                lines.append( indent + "</eventsRec>" )
+                for s in extraElementsXMLLines(node):
+                    lines.append( indent + s )
+
+            stack.append( ( None , depth ) )
+            for c in reversed(node.children):
+                stack.append( ( c , depth + 1 ) )
+
+    def getTreeRecPhyloXMLAux(self , speciesNames ={}, topoOnly = False , indent = "  "):
+        L = []
+        self.appendCladeRecPhyloXMLLines(L , speciesNames , topoOnly , 0 , "" if indent is None else indent)
+        if indent is None:
+            joinXMLLines(L)
+        return L
+
+    def getTreeRecPhyloXML(self , speciesNames ={}, topoOnly = False , indent = "  "):
+        """
+        Takes:
+            - speciesNames (dict) [default = {}] : see RecEvent.makeRecXMLstr
+            - topoOnly (bool) [default = False] : if True, only the topology and names of the tree are written
+            - indent (str or None) [default = "  "] : indentation of one level
+                                                      None : compact output, without indentation nor line breaks
+
+        Returns:
+            (str) : the recGeneTree element of this tree
+        """
+        Lines = self.getTreeRecPhyloXMLLines( speciesNames, topoOnly, indent)
+        return "\n".join(Lines)
+
+    def appendTreeRecPhyloXMLLines(self , lines , speciesNames ={}, topoOnly = False , offset = 0 , indentChar = "  "):
+        """
+        *modifies lines in place*
+
+        Takes:
+            - lines (list) : list the xml lines of the recGeneTree element are appended to
+            - speciesNames (dict) [default = {}] : see RecEvent.makeRecXMLstr
+            - topoOnly (bool) [default = False] : if True, only the topology and names of the tree are written
+            - offset (int) [default = 0] : indentation level of the recGeneTree element
+            - indentChar (str) [default = "  "] : indentation of one level
+        """
+        indent = indentChar * offset
+        lines.append( indent + "<recGeneTree>" )
+        lines.append( indent + indentChar + "<phylogeny rooted=\"true\">" )
+        if not topoOnly:
+            phylogenyIndent = indent + indentChar * 2
+            for s in extraElementsXMLLines(self, PHYLOGENY_EXTRA_ELEMENT_TAGS_FEATURE):
+                lines.append( phylogenyIndent + s )
+        self.appendCladeRecPhyloXMLLines( lines , speciesNames , topoOnly , offset + 2 , indentChar )
+        lines.append( indent + indentChar + "</phylogeny>" )
+        lines.append( indent + "</recGeneTree>" )
+
+    def getTreeRecPhyloXMLLines(self , speciesNames ={}, topoOnly = False , indent = "  "):
+        """
+        Takes:
+            - speciesNames (dict) [default = {}] : see RecEvent.makeRecXMLstr
+            - topoOnly (bool) [default = False] : if True, only the topology and names of the tree are written
+            - indent (str or None) [default = "  "] : indentation of one level
+                                                      None : compact output, the tree is written on a single line, without indentation
+
+        Returns:
+            (list) : list of lines of the recGeneTree element of this tree
+        """
+        Lines = []
+        self.appendTreeRecPhyloXMLLines( Lines , speciesNames , topoOnly , 0 , "" if indent is None else indent )
+        if indent is None:
+            joinXMLLines(Lines)
+        return Lines
+
+    def countEvents(self):
+        """
+
+        Returns:
+            (dict) : keys are recPhyloXML event tags, values are the number of times these events occur in the tree
+        """
+        devent = {}
+        for e in self.eventRecs:
+            code  = e.eventCode
+#            if not devent.has_key(code):
+            if not code in devent:
+                devent[code] = 0
+            devent[code] += 1
+
+        for c in self.get_children():
+            tmp = c.countEvents()
+            for k in tmp.keys():
+#                if not devent.has_key(k):
+                if not k in devent:
+                    devent[k] = 0
+                devent[k] += tmp[k]
+
+        return devent
+
+    def iterEventsSummary(self , speciesTree, includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name"):
+        """
+        *generator*
+        Iterative, single pass, version of getEventsSummary : the events are visited in the order of a pre-order traversal of the nodes.
+
+        Takes:
+             - speciesTree (ete3.Tree or SpeciesTreeIndex) : the species tree used for the reconciliation, necessary to assign a species to loss events.
+                                                             (giving its SpeciesTreeIndex avoids indexing it again at each call)
+             - includeTransferReception [default = True]  : Whether or not to includes events of  TransferReception (transferBack tag).
+             - includeTransferDeparture [default = False] : Whether or not to includes events of  TransferDeparture (branchingOut tag).
+             - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Yields:
+            (tuple) : (str) event type among : "duplication" , "loss" , "transferReception" , "transferDeparture"
+                      and the species id of the event
+        """
+
+        speciesTree = getSpeciesTreeIndex(speciesTree, speciesIdFeature)
+
+        stack = [ self ]
+        while len(stack) > 0:
+            node = stack.pop()
+
+            events = node.eventRecs
+            for i,e in enumerate(events):
+
+                kind = e.kind
+
+                if kind == KIND_SPECIATION_LOSS:
+                    ## the lost species is the sister of the species of the next event (see getLostSpecies)
+                    yield "loss" , speciesTree.getSister( events[i+1].species )
+
+                elif kind == KIND_BRANCHING_OUT_LOSS:
+                    yield "loss" , e.species
+
+                elif kind == KIND_DUPLICATION:
+                    yield "duplication" , e.species
+
+                elif kind == KIND_LOSS:
+                    yield "loss" , e.species
+
+
+                if includeTransferReception and kind == KIND_TRANSFER_BACK :
+                    yield "transferReception" , e.species
+
+                elif includeTransferDeparture and kind == KIND_BRANCHING_OUT : ## a branchingOutLoss is reported as a loss only
+                    yield "transferDeparture" , e.species
+
+            stack.extend( reversed(node.children) )
+
+    def getEventsSummary(self , speciesTree, includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name"):
+        """
+        Takes:
+             - speciesTree (ete3.Tree or SpeciesTreeIndex) : the species tree used for the reconciliation, necessary to assign a species to loss events.
+                                                             (giving its SpeciesTreeIndex avoids indexing it again at each call)
+             - includeTransferReception [default = True]  : Whether or not to includes events of  TransferReception (transferBack tag) in the counts.
+             - includeTransferDeparture [default = False] : Whether or not to includes events of  TransferDeparture (branchingOut tag) in the counts.
+             - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Returns:
+            (dict):
+                    keys are events type among : "duplication" , "loss" , "transferReception" , "transferDeparture"
+                    values are  lists of species id
+
+        """
+
+        EventsSummary = { e : [] for e in getEventsSummaryTypes(includeTransferReception , includeTransferDeparture) }
+
+        for e , sp in self.iterEventsSummary(speciesTree , includeTransferReception , includeTransferDeparture , speciesIdFeature):
+            EventsSummary[e].append(sp)
+
+        return EventsSummary
+
+
+
+    def iter_event_rows(self , speciesTree = None , treeId = 0 , speciesIdFeature = "name"):
+        """
+        *generator*
+        Flat table of the events of the tree : one row per event, the nodes being visited in pre-order.
+
+        Takes:
+            - speciesTree (ete3.Tree or SpeciesTreeIndex or None) [default = None] : the species tree used for the reconciliation,
+                                                                          necessary to get the lost species of speciationLoss events (None without it)
+            - treeId (int) [default = 0] : value of the tree_id field of the rows
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Yields:
+            (tuple) : the fields of EVENT_ROW_FIELDS :
+                        tree_id , node_name ,
+                        event_index (int) : index of the event in the eventsRec of its node ,
+                        event_kind (str) : recPhyloXML tag of the event (eg. "duplication") ,
+                        species , time_slice (int or None) ,
+                        lost_species : for loss, speciationLoss and branchingOutLoss events, the species where the loss occured (see getLostSpecies) ; None otherwise
+        """
+        if not speciesTree is None:
+            speciesTree = getSpeciesTreeIndex(speciesTree, speciesIdFeature)
+
+        stack = [ self ]
+        while len(stack) > 0:
+            node = stack.pop()
+
+            events = node.eventRecs
+            for i,e in enumerate(events):
+
+                kind = e.kind
+
+                lostSpecies = None
+                if kind == KIND_LOSS or kind == KIND_BRANCHING_OUT_LOSS:
+                    lostSpecies = e.species
+                elif kind == KIND_SPECIATION_LOSS and not speciesTree is None:
+                    ## the lost species is the sister of the species of the next event (see getLostSpecies)
+                    lostSpecies = speciesTree.getSister( events[i+1].species )
+
+                yield ( treeId , node.name , i ,
+                        e.rawCode if kind == KIND_OTHER else EVENTKIND_TAGS[kind] ,
+                        e.species , e.timeSlice , lostSpecies )
+
+            stack.extend( reversed(node.children) )
+
+    def sameSpeciesAsParent(self , parent = None):
+        """ returns True if the first event of the node has the same species as the last event of its parent , False otherwise (and if self is the root)
+
+            if the parent is given, is it used, otherwise we look for it in the structure
+        """
+
+        if parent is None:
+            if self.is_root():
+                return False
+            parent = self.up
+
+        lastParentSp = parent.getEvents()[-1].species
+
+        firstSp = self.getEvents()[0].species
+
+        return firstSp == lastParentSp
+
+
+    def getLostSpecies( self, evtIndex , speciesTree, speciesIdFeature = "name"):
+        """
+        given the index of an event of *Loss (speciationLoss for instance) in this nodes,
+        this function returns the id of the species where the loss occured
+        (this function is useful because speciationLoss event references the species of the speciation rather than the species of the loss)
+
+        Takes:
+            - evtIndex (int) : index of the loss event whose lost species we want to know
+            - speciesTree (ete3.Tree or SpeciesTreeIndex) : the species tree used for the reconciliation
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Returns:
+            (str) : id of the species where the loss occured
+            or
+            None : if the indicated event does not correspond to a loss
+        """
+
+
+        kind = self.getEvent(evtIndex).kind
+
+        if not kind in ( KIND_SPECIATION_LOSS , KIND_BRANCHING_OUT_LOSS ):
+            return None
+
+        if kind == KIND_BRANCHING_OUT_LOSS:
+            return self.getEvent(evtIndex).species ## in branchingOutLoss, the species of the lost lineage is the same as the one of the branchingOut
+
+        ## We know this is a speciationLoss event.
+        ## Note that speciationLoss events are NEVER the last event in eventsRec (as they are neither a bifurcation nor a leaf event).
+        ## so we should be able to safely ask for the event after the current one.
+
+        lostSpeciesSister = self.getEvent( evtIndex + 1 ).species
+
+        lostSpeciesId = getSpeciesTreeIndex(speciesTree, speciesIdFeature).getSister(lostSpeciesSister)
+
+        return lostSpeciesId
+
+
+
+class ReconciledTreeList:
+    """
+    This object represents a group of reconciled tree.
+    Usually they would be reconciled with the same species tree, which can also be added to this object.
+
+    Atributes:
+        - self.spTree   : the species tree these trees are reconciled with (or None if no species tree is specified)
+        - self.recTrees : the reconciled trees
+        - self.eventsCountCaches : (dict) running event counts of the trees (EventsCountCache), see getEventsCountMatrix
+
+    """
+    def __init__(self, spTree = None , recTrees = []):
+        """
+        Takes:
+            spTree (ete3.Tree) [ default = None ] : facultative species tree
+            recTrees (list) [ default = [] ] : list of ReconciledTree instance (see above)
+        """
+
+        self.spTree = spTree
+        self.recTrees = recTrees[:]
+        self.eventsCountCaches = {}
+
+
+    @staticmethod
+    def open_indexed(fileName , indexFileName = None , writeIndex = True , parser = None , maxResident = 128):
+        """
+        Opens a recPhyloXML file for random access to its reconciled trees :
+        only the species tree is parsed, and each reconciled tree is read from the file when it is accessed.
+        (see RecPhyloXMLIndex.py)
+
+        Takes:
+            - fileName (str) : name of a recPhyloXML file
+            - indexFileName (str) [default = None] : name of the index file (by default fileName + ".rpxi"). It is built if it does not exist or is outdated.
+            - writeIndex (bool) [default = True] : if True, a newly built index is written to indexFileName
+            - parser (recPhyloXML_parser) [default = None] : the parser to use for the trees
+            - maxResident (int) [default = 128] : maximum number of parsed trees kept in memory (None for no limit)
+
+        Returns:
+            (LazyReconciledTreeList) : a read-only ReconciledTreeList
+        """
+        from RecPhyloXMLIndex import getRecPhyloXMLIndex, LazyReconciledTreeList
+
+        index = getRecPhyloXMLIndex(fileName, indexFileName, writeIndex)
+
+        return LazyReconciledTreeList(index, parser, maxResident = maxResident)
+
+
+    def setSpTree(self, ST):
+        """
+        Simply sets a trees as the object species tree.
+
+        Takes:
+            - ST (ete3.Tree) : a species tree
+        """
+        self.spTree = ST
+        self.eventsCountCaches = {} ## the counts depend on the species tree
+
+
+
+    def append(self, RT):
+        """
+        Appends a reconciled tree to the object.
+
+        Takes:
+            - RT (ReconciledTree) : a reconciled tree
+        """
+        self.recTrees.append(RT)
+
+        ## folding the counts of the new tree in the running event counts
+        for cache in self.eventsCountCaches.values():
+            if cache.nbTrees() == len(self) - 1 and cache.spTree is self.spTree:
+                cache.addTree(RT)
+
+    def __getitem__(self, i ):
+        """
+        returns a reconciled tree from the object.
+
+        Takes:
+            - i (int) : index of the desired reconciled tree
+
+        Returns:
+            (ReconciledTree) : the reconciled tree at the desired index
+            OR IndexError if the index is invalid (ie. too high)
+        """
+
+        if i >= len(self.recTrees):
+            raise IndexError('Index out of range. There are no reconciled tree with index ' + str(i) + '.')
+
+        return self.recTrees[i]
+
+
+    def __len__(self):
+        """
+        Returns:
+            (int) : number of ReconciledTree in this instance
+        """
+
+        return len(self.recTrees)
+
+    def hasSpTree(self):
+        """
+        Returns:
+            (bool) : True if there this instance has a species tree (ie. self.spTree is not None), False otherwise
+        """
+        return not self.spTree is None
+
+    def getRecPhyloXMLLines(self , indent = "  "):
+        """
+        Takes:
+            - indent (str or None) [default = "  "] : indentation of one level
+                                                      None : compact output, without indentation, where the species tree and each reconciled tree are written on a single line
+
+        Returns:
+            (list) : list of lines of the recPhyloXML representation of this object
+                     (NB : the lines do not have a '\n' at their end.)
+        """
+        lines = []
+        lines.append("<" + RECPHYLOTAG + ">"  )
+
+        offset = 1
+        offsetChar = "" if indent is None else indent
+
+        if self.hasSpTree():
+            start = len(lines)
+            lines.append( offsetChar*offset + "<" + SPTREETAG + ">"  )
+            appendBasicTreeXMLLines(self.spTree, lines, offset + 1, offsetChar)
+            lines.append( offsetChar*offset + "</" + SPTREETAG + ">"  )
+            if indent is None:
+                joinXMLLines(lines, start)
+
+
+        for RT in self:
+            start = len(lines)
+            RT.appendTreeRecPhyloXMLLines(lines, offset = offset, indentChar = offsetChar)
+            if indent is None:
+                joinXMLLines(lines, start)
+
+
+        lines.append("</" + RECPHYLOTAG + ">" )
+
+        return lines
+
+    def writeRecPhyloXML(self, fileobj, compressLevel = None, indent = "  ", workers = 1, window = None):
+        """
+        Writes the recPhyloXML representation of this object one tree at a time (see RecPhyloXMLWriter.py),
+        without building the lines of the whole document as getRecPhyloXMLLines does
+
+        Takes:
+            - fileobj (str or file object) : name of the file to write (compressed if its name ends with .gz, .bz2 or .xz)
+                                             or a handle opened in text mode
+            - compressLevel (int) [default = None] : compression level when fileobj is the name of a compressed file
+            - indent (str or None) [default = "  "] : indentation of one level (None : compact output, see getRecPhyloXMLLines)
+            - workers (int) [default = 1] : number of worker processes serializing the trees (None : the number of processors of the machine)
+            - window (int) [default = None] : maximum number of shards of trees in flight when workers > 1 (see RecPhyloXMLWriter.write_trees)
+        """
+        from RecPhyloXMLWriter import RecPhyloXMLWriter
+
+        with RecPhyloXMLWriter(fileobj, compressLevel, indent) as writer:
+            if self.hasSpTree():
+                writer.write_species_tree(self.spTree)
+            writer.write_trees(self, workers = workers, window = window)
+
+    def iter_event_rows(self , speciesIdFeature = "name"):
+        """
+        *generator*
+        Flat table of the events of the reconciled trees (see ReconciledTreeBase.iter_event_rows) :
+        the tree_id of a row is the position of its tree in this object.
+        The lost species of speciationLoss events are only known if there is a species tree assigned to the object.
+
+        Takes:
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Yields:
+            (tuple) : the fields of EVENT_ROW_FIELDS
+        """
+        spTreeIndex = None
+        if self.hasSpTree():
+            spTreeIndex = SpeciesTreeIndex(self.spTree, speciesIdFeature)
+
+        for i, RT in enumerate(self):
+            yield from RT.iter_event_rows( spTreeIndex , i , speciesIdFeature )
+
+    def writeForest(self, directory):
+        """
+        Writes the trees of this object, with its species tree, as a ReconciledForest saved in a directory of .npy columns,
+        which ReconciledForest.load memory-maps (see ReconciledForest.py ; requires numpy).
+        NB: as in a ReconciledForest, the features of the nodes of the gene trees (other than their name) are not kept.
+
+        Takes:
+            - directory (str) : name of the directory (created if needed)
+        """
+        from ReconciledForest import ReconciledForest
+
+        ReconciledForest.fromReconciledTreeList(self).save(directory)
+
+    def getEventsSummary(self , includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name" , indexBySpecies=False , workers = 1):
+        """
+        Retrieve an event summary over all the trees in the object
+        !!only works if there is a species tree assigned to the object!!
+
+
+        Takes:
+             - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag) in the counts.
+             - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag) in the counts.
+             - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+             - indexBySpecies (str) [default = False] : if True, the returned dictionnary will have species as keys and event counts as values.
+             - workers (int) [default = 1] : number of worker processes among which the trees are sharded (None : the number of processors of the machine)
+
+        Returns:
+            (dict):
+                    keys are events type among : "duplication" , "loss" , "transferReception" , "transferDeparture"
+                    values are  lists of species id
+
+                   OR, if indexBySpecies=True:
+                       keys are species id
+                       values are dict with keys among "duplication" , "loss" , "transferReception" , "transferDeparture"
+                                            and values as counts of the events in each species
+
+        """
+
+        if not self.hasSpTree():
+            raise Exception("recPhyloXML exception. Can't get an events summary when no species tree has been assigned.")
+
+        if indexBySpecies:
+            speciesIds , eventTypes , matrix = self.getEventsCountMatrix(includeTransferReception , includeTransferDeparture , speciesIdFeature , workers)
+            return eventsCountMatrixToSummary(self.spTree , speciesIds , eventTypes , matrix , speciesIdFeature)
+
+        if workers == 1 or not self.hasParallelShards():
+            return getTreesEventsSummary(self , getSpeciesTreeIndex(self.spTree, speciesIdFeature) , includeTransferReception , includeTransferDeparture)
+
+        EventsSummary = { e : [] for e in getEventsSummaryTypes(includeTransferReception , includeTransferDeparture) }
+
+        for shardSummary in self.mapEventsSummaryShards(workers , False , includeTransferReception , includeTransferDeparture , speciesIdFeature):
+            for e , v in shardSummary.items():
+                EventsSummary[e] += v ## the shards come in the order of the trees
+
+        return EventsSummary
+
+    def getEventsCountMatrix(self , includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name" , workers = 1):
+        """
+        Counts the events of all the trees in the object per species, in a single pass over the events.
+        !!only works if there is a species tree assigned to the object!!
+
+        Takes:
+             - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag) in the counts.
+             - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag) in the counts.
+             - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+             - workers (int) [default = 1] : number of worker processes among which the trees are sharded (None : the number of processors of the machine)
+                                             the count matrices of the shards are then summed.
+                                             With 1 worker, the counts are cached and kept up to date as trees are appended :
+                                             a repeated call only counts the new trees.
+                                             (NB: after modifying the events of trees already in the object, call refreshEventsSummary)
+
+        Returns:
+            (tuple) : (list) the species ids (rows of the matrix), in the pre-order of the species tree
+                      (list) the event types (columns of the matrix), among "duplication" , "loss" , "transferReception" , "transferDeparture"
+                      (list) the matrix : one list of event counts (int) per species
+                      (NB: the events of a species id borne by several nodes of the species tree are counted in the row of the first of these nodes)
+        """
+        if not self.hasSpTree():
+            raise Exception("recPhyloXML exception. Can't get an events summary when no species tree has been assigned.")
+
+        if workers == 1 or not self.hasParallelShards():
+            cache = self.getEventsCountCache(includeTransferReception , includeTransferDeparture , speciesIdFeature)
+            return cache.spTreeIndex.ids , cache.eventTypes , [ row[:] for row in cache.matrix ]
+
+        spTreeIndex = getSpeciesTreeIndex(self.spTree, speciesIdFeature)
+
+        eventTypes = getEventsSummaryTypes(includeTransferReception , includeTransferDeparture)
+
+        matrix = [ [ 0 ] * len(eventTypes) for sp in spTreeIndex.ids ]
+
+        for shardMatrix in self.mapEventsSummaryShards(workers , True , includeTransferReception , includeTransferDeparture , speciesIdFeature):
+            addEventsCountMatrix(matrix, shardMatrix)
+
+        return spTreeIndex.ids , eventTypes , matrix
+
+    def getEventsCountCache(self , includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name"):
+        """
+        Takes:
+             - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag) in the counts.
+             - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag) in the counts.
+             - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Returns:
+            (EventsCountCache) : the running event counts of the trees of the object, with these options
+                                 (created if needed, and updated with the trees which were not counted yet)
+        """
+        key = ( bool(includeTransferReception) , bool(includeTransferDeparture) , speciesIdFeature )
+
+        cache = self.eventsCountCaches.get(key)
+
+        if cache is None or not cache.spTree is self.spTree or cache.nbTrees() > len(self):
+            cache = EventsCountCache(self.spTree , includeTransferReception , includeTransferDeparture , speciesIdFeature)
+            self.eventsCountCaches[key] = cache
+
+        for i in range( cache.nbTrees() , len(self) ):
+            cache.addTree( self[i] )
+
+        return cache
+
+    def refreshEventsSummary(self , positions = None):
+        """
+        Updates the cached event counts (see getEventsCountMatrix) after the events of some trees of the object have been modified.
+
+        Takes:
+            - positions (list) [default = None] : indexes of the modified trees (None : all the cached counts are dropped)
+        """
+        if positions is None:
+            self.eventsCountCaches = {}
+            return
+
+        for cache in self.eventsCountCaches.values():
+            for i in positions:
+                if i < cache.nbTrees():
+                    cache.refreshTree( i , self[i] )
+
+    def getSharedTrees(self):
+        """
+        Returns:
+            (list or None) : the trees that worker processes can inherit when they are forked,
+                             or None if the fork start method is not available on this platform
+        """
+        if "fork" in multiprocessing.get_all_start_methods():
+            return self.recTrees
+        return None
+
+    def hasParallelShards(self):
+        """
+        Returns:
+            (bool) : True if the trees can be summarized by worker processes without sending them a copy of every tree
+                     (otherwise flattening and pickling the trees costs more than the summary itself, and the summary is done serially)
+        """
+        return not self.getSharedTrees() is None
+
+    def getTreeShards(self , shardSize):
+        """
+        *generator*
+        Cuts the reconciled trees in consecutive shards, to be sent to worker processes.
+
+        Takes:
+            - shardSize (int) : number of trees per shard
+
+        Yields:
+            (tuple) : (function) loadTrees , (tuple) arguments : loadTrees(*arguments) gives the list of the trees of the shard
+        """
+        from ReconciledTreeIO import flattenTree, unflattenTrees
+
+        recTrees = self.recTrees
+        for start in range(0, len(recTrees), shardSize):
+            yield unflattenTrees , ( [ flattenTree(RT) for RT in recTrees[start:start+shardSize] ] , )
+
+    def mapEventsSummaryShards(self , workers , asMatrix , includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name"):
+        """
+        *generator*
+        Computes the events summaries of shards of the reconciled trees in a pool of worker processes.
+        The species tree is sent once to each worker.
+        When the workers are forked, they inherit the trees and only receive the positions of each shard.
+
+        Takes:
+             - workers (int) : number of worker processes (None : the number of processors of the machine)
+             - asMatrix (bool) : if True, the events are counted (see getEventsCountMatrix), otherwise their species are listed (see getEventsSummary)
+             - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag).
+             - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag).
+             - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Yields:
+            the count matrix (list) or the events summary (dict) of each shard, in the order of the trees
+        """
+        from ReconciledTreeIO import flattenTree
+        from concurrent.futures import ProcessPoolExecutor
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        shardSize = max( 1 , min( MAX_SUMMARY_SHARD_SIZE , -( -len(self) // ( 4 * workers ) ) ) )
+
+        sharedTrees = self.getSharedTrees()
+        if sharedTrees is None:
+            context = None
+            shards = self.getTreeShards(shardSize)
+        else:
+            context = multiprocessing.get_context("fork")
+            shards = ( ( getSharedSummaryTrees , ( start , start + shardSize ) ) for start in range(0, len(sharedTrees), shardSize) )
+
+        with ProcessPoolExecutor(max_workers = workers , mp_context = context , initializer = initEventsSummaryWorker , initargs = ( flattenTree(self.spTree) , speciesIdFeature , sharedTrees ) ) as executor:
+
+            maxInFlight = 2 * workers
+            inFlight = deque()
+
+            for loadTrees , arguments in shards:
+
+                if len(inFlight) >= maxInFlight:
+                    yield inFlight.popleft().result()
+
+                inFlight.append( executor.submit( eventsSummaryWorker , loadTrees , arguments , includeTransferReception , includeTransferDeparture , asMatrix ) )
+
+            while len(inFlight) > 0:
+                yield inFlight.popleft().result()
@@ -4,24 +4,43 @@
 #########################################
 ##  Author:         Wandrille Duchemin
 ##  Created:        19-Jul-2017
-##  Last modified:  10-Apr-2018
+##  Last modified:  18-Oct-2026
 ##
 ##  Decribes one classe : recPhyloXML_parser
 ##          which enables the reading of recPhyloXML files
-##          to populate a ete3 derived objects
+##          to populate ete3 derived objects (or their lightweight equivalents, see LightReconciledTree.py)
 ##
-##  requires : ReconciledTree.py
-##             ete3 ( http://etetoolkit.org/ )
+##  requires : RecEvent.py
+##             ReconciledTreeBase.py
+##             LightReconciledTree.py
+##             CompressedFileIO.py
+##             ReconciledTree.py and ete3 ( http://etetoolkit.org/ ) : for the default "ete3" tree backend
+##             RecPhyloXMLIndex.py ( for parse_parallel and map_parallel )
+##             ReconciledForest.py ( for parse_forest, requires numpy )
 ##             xml ( in standard library )
+##             lxml ( optional, https://lxml.de/ ) : faster parsing backend
 ##
-##  developped for python2.7
+##  developped for python3.0
 ##
 #########################################
 
-import ete3
+import os
 import xml.etree.ElementTree as ET
 
-from ReconciledTree import ReconciledTree, RecEvent, ReconciledTreeList , EVENTTAGCORRESPONDANCE
+from collections import deque
+
+try:
+    import lxml.etree as LXML_ET
+except ImportError:
+    LXML_ET = None
+
+from RecEvent import RecEvent , EVENTTAGCORRESPONDANCE , EMPTY_ADDITIONNALINFO , EVENTCODE_TO_KIND
+from RecEvent import KIND_DUPLICATION , KIND_LOSS , KIND_TRANSFER_BACK , KIND_BRANCHING_OUT , KIND_SPECIATION_LOSS , KIND_BRANCHING_OUT_LOSS
+from ReconciledTreeBase import ReconciledTreeBase, ReconciledTreeList , EXTRA_ELEMENT_TAGS_FEATURE , PHYLOGENY_EXTRA_ELEMENT_TAGS_FEATURE
+from ReconciledTreeBase import getEventsSummaryTypes , eventsCountMatrixToSummary , addEventsCountMatrix , initEventsSummaryWorker , eventsCountMatrixWorker
+from SpeciesTreeIndex import SpeciesTreeIndex, getSpeciesTreeIndex
+from LightReconciledTree import LightTree, LightReconciledTree
+from CompressedFileIO import openFile, getCompression
 
 REVERSE_EVENTTAGCORRESPONDANCE = {v:k for k,v in EVENTTAGCORRESPONDANCE.items()}
 
@@ -34,9 +53,160 @@ OBSOLETE_EVENT_TAGS = ["speciationLoss", "speciationOutLoss", "speciationOut" ]
 def OBSOLETEWARNINGTXT(tag):
     return  "The obsolete tag "+tag+" was observed and this may result in unwanted behaviour. Please use a conversion script such as convertToLossIndependentVersion.py to update your file to a newest verszion of the format."
 
+PARSING_BACKENDS = ["auto", "lxml", "stdlib"]
+
+PARSING_FIELDS = ["topology", "events", "features"]
+
+EXTRA_ELEMENTS_POLICIES = ["element", "text", "drop"]
+
+TREE_BACKENDS = ["ete3", "light"]
+
+## number of trees given at once to the function of map_parallel when a compressed file is read sequentially
+SEQUENTIAL_CHUNK_SIZE = 1000
+
 class recPhyloXML_parser:
-    def __init__(self):
-        pass
+    def __init__(self, recursiveCladeParsing = False, backend = "auto", fields = None, extraElements = "element", treeBackend = "ete3"):
+        """
+        Takes:
+            - recursiveCladeParsing (bool) [default = False] : if True, clades are parsed by the recursive engine (parse_clade_recursive)
+                                                               rather than the explicit-stack one (parse_clade_iterative)
+                                                               NB: the recursive engine fails on trees deeper than the python recursion limit
+            - backend (str) [default = "auto"] : xml library used to read the files
+                                                 "lxml"   : lxml.etree (raises an exception if lxml is not installed)
+                                                 "stdlib" : xml.etree.ElementTree
+                                                 "auto"   : lxml if it is installed, stdlib otherwise
+                                                            (the stdlib is also used for documents deeper than libxml2 accepts)
+            - fields (set) [default = None] : parts of the reconciled gene trees to build, among PARSING_FIELDS (by default all of them)
+                                              "topology" : the names of the nodes
+                                              "events"   : the reconciliation events of the nodes (eventsRec)
+                                              "features" : the attributes and other children elements of the clades and phylogenies
+                                              NB: the structure of the trees is always built, as the events are attached to its nodes.
+                                                  The species tree is always fully built.
+            - extraElements (str) [default = "element"] : what is kept of the children elements of clades and phylogenies which are not part of the recPhyloXML format
+                                                          (eg. taxonomy or sequence blocks), which are stored as features named after their tag
+                                                          "element" : the Element object itself (NB: it keeps its whole subtree in memory)
+                                                          "text"    : its xml serialization (str), which getTreeRecPhyloXMLLines writes back as is
+                                                          "drop"    : nothing
+            - treeBackend (str) [default = "ete3"] : classes of the nodes of the trees
+                                                     "ete3"  : ReconciledTree and ete3.Tree
+                                                     "light" : LightReconciledTree and LightTree (see LightReconciledTree.py ; ete3 is not imported)
+        """
+        self.recursiveCladeParsing = recursiveCladeParsing
+
+        if fields is None:
+            fields = PARSING_FIELDS
+
+        for f in fields:
+            if not f in PARSING_FIELDS:
+                raise Exception("recPhyloXML exception. Unknown field " + str(f) + " (expected some of " + ", ".join(PARSING_FIELDS) + ").")
+
+        self.fields = frozenset(fields)
+        self.keepNames = "topology" in self.fields
+        self.keepEvents = "events" in self.fields
+        self.keepFeatures = "features" in self.fields
+
+        if not extraElements in EXTRA_ELEMENTS_POLICIES:
+            raise Exception("recPhyloXML exception. Unknown policy for extra elements " + str(extraElements) + " (expected one of " + ", ".join(EXTRA_ELEMENTS_POLICIES) + ").")
+
+        self.extraElements = extraElements
+
+        if not treeBackend in TREE_BACKENDS:
+            raise Exception("recPhyloXML exception. Unknown tree backend " + str(treeBackend) + " (expected one of " + ", ".join(TREE_BACKENDS) + ").")
+
+        self.treeBackend = treeBackend
+
+        if treeBackend == "ete3":
+            import ete3
+            from ReconciledTree import ReconciledTree
+            self.recTreeClass = ReconciledTree
+            self.spTreeClass = ete3.Tree
+        else:
+            self.recTreeClass = LightReconciledTree
+            self.spTreeClass = LightTree
+
+        if not backend in PARSING_BACKENDS:
+            raise Exception("recPhyloXML exception. Unknown parsing backend " + str(backend) + " (expected one of " + ", ".join(PARSING_BACKENDS) + ").")
+
+        explicitLxml = ( backend == "lxml" )
+
+        if backend == "auto":
+            backend = "stdlib" if LXML_ET is None else "lxml"
+
+        elif backend == "lxml" and LXML_ET is None:
+            raise Exception("recPhyloXML exception. The lxml parsing backend was requested but lxml is not installed.")
+
+        self.backend = backend
+        self.lxmlFallback = ( self.backend == "lxml" and not explicitLxml )
+
+
+    def getSettings(self):
+        """
+        Returns:
+            (tuple) : the settings of the parser, from which worker processes rebuild it (see parserFromSettings)
+        """
+        return ( self.recursiveCladeParsing , self.backend , self.lxmlFallback , self.fields , self.extraElements , self.treeBackend )
+
+    def isLxmlFallbackError(self, error):
+        """
+        Takes:
+            - error (Exception) : an exception raised by lxml
+
+        Returns:
+            (bool) : True if the parser should fall back to the stdlib after this error (the document is deeper than libxml2 accepts)
+        """
+        return self.lxmlFallback and isinstance(error, LXML_ET.XMLSyntaxError) and "Excessive depth" in str(error)
+
+
+    def serializeExtraElement(self, element):
+        """
+        Takes:
+            - element (Element) : an element from xml.etree.ElementTree or lxml.etree
+
+        Returns:
+            (str) : the xml representation of the element, without its tail
+                    (NB: with the stdlib backend, namespaces are written with generated prefixes such as ns0)
+        """
+        if isinstance(element, ET.Element):
+            tail = element.tail
+            element.tail = None
+            s = ET.tostring(element, encoding = "unicode")
+            element.tail = tail
+            return s
+        return LXML_ET.tostring(element, encoding = "unicode", with_tail = False)
+
+
+    def addExtraElement(self, additionnalInfo, key, element, tagsFeature = EXTRA_ELEMENT_TAGS_FEATURE):
+        """
+        Stores an element which is not part of the recPhyloXML format according to the extraElements policy of the parser.
+
+        Takes:
+            - additionnalInfo (dict) : features of the node being built
+            - key (str) : name of the feature
+            - element (Element) : the element to store
+            - tagsFeature (str) [default = EXTRA_ELEMENT_TAGS_FEATURE] : with the "text" policy, name of the feature listing the stored keys in document order
+        """
+        if self.extraElements == "element":
+            additionnalInfo[key] = element
+
+        elif self.extraElements == "text":
+            additionnalInfo[key] = self.serializeExtraElement(element)
+            tags = additionnalInfo.setdefault(tagsFeature, [])
+            if not key in tags:
+                tags.append(key)
+
+
+    def rewind(self, fileName):
+        """
+        puts a file object back at its beginning, so that it can be read again by the stdlib fallback (does nothing for a file name)
+        raises an exception if the file object is a stream which cannot be read again (eg. a pipe)
+        """
+        if not hasattr(fileName, "seek"):
+            return
+
+        if hasattr(fileName, "seekable") and not fileName.seekable():
+            raise Exception("recPhyloXML exception. The document is too deep for lxml and the input stream can not be read again with the stdlib parser : give a file name, or use the parser with backend = \"stdlib\".")
+
+        fileName.seek(0)
 
 
     def parse(self , fileName , obsoleteTagsBehaviour = 1 ):
@@ -45,7 +215,7 @@ class recPhyloXML_parser:
         , in order to accomodate to changes in the format and eventual adaption of it to special problems.
 
         Takes:
-            - fileName (str) : name of a recPhyloXML file containing a single reconciled gene tree
+            - fileName (str or file object) : name of a recPhyloXML file (which may be compressed with gzip, bz2 or xz)
             - obsoleteTagsBehaviour (int) [default = 1]: Behaviour when an event tag that is in OBSOLETE_EVENT_TAGS is encountered
                                                          0 : ignore
                                                          1 : warning
@@ -57,9 +227,7 @@ class recPhyloXML_parser:
             (ReconciledTreeList) : a set of reconciled trees
         """
 
-        tree = ET.parse(fileName)
-
-        root = tree.getroot()
+        root = self.readXMLroot(fileName)
 
         TAGtoFUNCTION = { "recPhylo" : self.parse_recPhylo,
                           "recGeneTree" : self.parse_recGeneTree }
@@ -89,6 +257,717 @@ class recPhyloXML_parser:
         return obj
 
 
+    def readXMLroot(self , fileName ):
+        """
+        Takes:
+            - fileName (str or file object) : name of a xml file (which may be compressed with gzip, bz2 or xz)
+
+        Returns:
+            (Element) : the root element of the file
+        """
+        IN = fileName
+        if isinstance(fileName, str):
+            IN = openFile(fileName, "rb")
+
+        tree = None
+
+        try:
+            if self.backend == "lxml":
+                try:
+                    tree = LXML_ET.parse(IN, LXML_ET.XMLParser(remove_comments = True, remove_pis = True, huge_tree = True))
+                except LXML_ET.XMLSyntaxError as e:
+                    if not self.isLxmlFallbackError(e):
+                        raise
+                    self.rewind(IN)
+
+            if tree is None:
+                tree = ET.parse(IN)
+
+        finally:
+            if not IN is fileName:
+                IN.close()
+
+        return tree.getroot()
+
+
+    def iterparse(self , fileName , obsoleteTagsBehaviour = 1 ):
+        """
+        *generator*
+
+        Streaming alternative to parse : reads the file incrementally and yields each tree as soon as its element is closed.
+        Elements that have been processed are cleared so that memory usage does not depend on the number of trees in the file.
+
+        Takes:
+            - fileName (str or file object) : name of a recPhyloXML file (which may be compressed with gzip, bz2 or xz)
+            - obsoleteTagsBehaviour (int) [default = 1]: Behaviour when an event tag that is in OBSOLETE_EVENT_TAGS is encountered
+                                                         0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+
+        Yields:
+            (ete3.Tree) : the species tree, if the file contains one (it is placed before the reconciled trees in a recPhylo file)
+                or
+            (ReconciledTree) : a reconciled tree, in the order of the file
+        """
+
+        IN = fileName
+        if isinstance(fileName, str):
+            IN = openFile(fileName, "rb")
+
+        try:
+            if self.backend == "lxml":
+                yield from self.iterparse_lxml(IN, obsoleteTagsBehaviour)
+            else:
+                yield from self.iterparse_stdlib(IN, obsoleteTagsBehaviour)
+
+        finally:
+            if not IN is fileName:
+                IN.close()
+
+    def read_species_tree(self , fileName ):
+        """
+        Reads only the species tree of a recPhyloXML file : the reading of the file stops right after the end of the spTree element,
+        so when it comes first (as is usual) the time taken does not depend on the number of reconciled trees in the file.
+
+        Takes:
+            - fileName (str or file object) : name of a recPhyloXML file (which may be compressed with gzip, bz2 or xz)
+
+        Returns:
+            (ete3.Tree) : the species tree
+                or
+            None : if the file does not contain a species tree
+        """
+        IN = fileName
+        if isinstance(fileName, str):
+            IN = openFile(fileName, "rb")
+
+        try:
+            if self.backend == "lxml":
+                try:
+                    context = LXML_ET.iterparse(IN, events = ("end",), tag = ("{*}recGeneTree" , "{*}spTree"),
+                                                remove_comments = True, remove_pis = True, huge_tree = True)
+                    for event, element in context:
+                        if self.tagCorrection(element.tag) == "spTree":
+                            return self.parse_SpTree(element)
+                        element.clear() ## a reconciled tree placed before the species tree
+                    return None
+
+                except LXML_ET.XMLSyntaxError as e:
+                    if not self.isLxmlFallbackError(e):
+                        raise
+                    self.rewind(IN)
+
+            root = None
+            depth = 0
+
+            for event, element in ET.iterparse(IN, events = ("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = element
+                    depth += 1
+                    continue
+
+                depth -= 1
+
+                if depth == 1:
+                    if self.tagCorrection(element.tag) == "spTree":
+                        return self.parse_SpTree(element)
+                    root.clear()
+
+            return None
+
+        finally:
+            if not IN is fileName:
+                IN.close()
+
+
+    def iter_event_rows(self , fileName , spTree = None , speciesIdFeature = "name" , obsoleteTagsBehaviour = 1 ):
+        """
+        *generator*
+        Streams the flat table of the events of the reconciled trees of a file (see ReconciledTreeBase.iter_event_rows) :
+        the trees are read by iterparse, one at a time, and the tree_id of a row is the position of its tree among the reconciled trees of the file.
+
+        Takes:
+            - fileName (str) : name of a recPhyloXML file (which may be compressed with gzip, bz2 or xz)
+            - spTree (ete3.Tree or SpeciesTreeIndex) [default = None] : the species tree of the file ; if None it is read with read_species_tree
+                                                                         (without species tree, the lost species of speciationLoss events are None)
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+            - obsoleteTagsBehaviour (int) [default = 1]: Behaviour when an event tag that is in OBSOLETE_EVENT_TAGS is encountered
+                                                         0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+
+        Yields:
+            (tuple) : the fields of EVENT_ROW_FIELDS (see ReconciledTreeBase.py)
+        """
+        if spTree is None:
+            spTree = self.read_species_tree(fileName)
+
+        spTreeIndex = None
+        if not spTree is None:
+            spTreeIndex = getSpeciesTreeIndex(spTree, speciesIdFeature)
+
+        treeId = 0
+        for RT in self.iterparse(fileName, obsoleteTagsBehaviour):
+            if isinstance(RT, ReconciledTreeBase):
+                yield from RT.iter_event_rows( spTreeIndex , treeId , speciesIdFeature )
+                treeId += 1
+
+    def parse_eventsSummary(self , fileName , includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name" , obsoleteTagsBehaviour = 1 , workers = 1 ):
+        """
+        Streaming equivalent of parse(fileName).getEventsSummary(indexBySpecies = True) :
+        the events are counted as the eventsRec elements stream by, without building the reconciled trees,
+        and processed elements are cleared so that memory usage does not depend on the number of trees in the file.
+        The species lost in speciationLoss events are resolved at the end, through an index of the species tree.
+
+        With several workers and an uncompressed file, the chunks of the file are parsed and their events counted by the workers (see map_parallel) :
+        only the count matrices of the chunks are sent back and summed.
+
+        Takes:
+            - fileName (str or file object) : name of a recPhyloXML file (which may be compressed with gzip, bz2 or xz)
+            - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag) in the counts.
+            - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag) in the counts.
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+            - obsoleteTagsBehaviour (int) [default = 1]: Behaviour when an event tag that is in OBSOLETE_EVENT_TAGS is encountered
+                                                         0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+            - workers (int) [default = 1] : number of worker processes (None : the number of processors of the machine)
+
+        Returns:
+            (dict) : keys are species id
+                     values are dict with keys among "duplication" , "loss" , "transferReception" , "transferDeparture"
+                                 and values as counts of the events in each species
+                     (see ReconciledTreeList.getEventsSummary)
+        """
+        if workers != 1 and isinstance(fileName, str) and getCompression(fileName) is None:
+            return self.parse_eventsSummary_parallel(fileName , includeTransferReception , includeTransferDeparture , speciesIdFeature , obsoleteTagsBehaviour , workers)
+
+        IN = fileName
+        if isinstance(fileName, str):
+            IN = openFile(fileName, "rb")
+
+        try:
+            counter = None
+
+            if self.backend == "lxml":
+                try:
+                    counter = EventsSummaryCounter(includeTransferReception , includeTransferDeparture , obsoleteTagsBehaviour)
+                    spTree = self.stream_eventsSummary_lxml(IN, counter)
+                except LXML_ET.XMLSyntaxError as e:
+                    if not self.isLxmlFallbackError(e):
+                        raise
+                    self.rewind(IN)
+                    counter = None
+
+            if counter is None:
+                counter = EventsSummaryCounter(includeTransferReception , includeTransferDeparture , obsoleteTagsBehaviour)
+                spTree = self.stream_eventsSummary_stdlib(IN, counter)
+
+        finally:
+            if not IN is fileName:
+                IN.close()
+
+        if spTree is None:
+            raise Exception("recPhyloXML exception. Can't get an events summary when no species tree has been assigned.")
+
+        return counter.getEventsSummary(spTree, speciesIdFeature)
+
+    def parse_eventsSummary_parallel(self , fileName , includeTransferReception  = True , includeTransferDeparture = False , speciesIdFeature = "name" , obsoleteTagsBehaviour = 1 , workers = None ):
+        """
+        parse_eventsSummary implementation based on map_parallel ; see parse_eventsSummary
+
+        Takes:
+            - fileName (str) : name of an uncompressed recPhyloXML file
+            - includeTransferReception [default = True]  : whether or not to includes events of  TransferReception (transferBack tag) in the counts.
+            - includeTransferDeparture [default = False] : whether or not to includes events of  TransferDeparture (branchingOut tag) in the counts.
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+            - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+            - workers (int) [default = None] : number of worker processes (by default, the number of processors of the machine)
+
+        Returns:
+            (dict) : the events summary indexed by species (see parse_eventsSummary)
+        """
+        spTree = self.read_species_tree(fileName)
+
+        if spTree is None:
+            raise Exception("recPhyloXML exception. Can't get an events summary when no species tree has been assigned.")
+
+        spTreeIndex = SpeciesTreeIndex(spTree, speciesIdFeature)
+        eventTypes = getEventsSummaryTypes(includeTransferReception , includeTransferDeparture)
+
+        matrix = [ [ 0 ] * len(eventTypes) for sp in spTreeIndex.ids ]
+
+        for chunkMatrix in self.map_parallel(fileName , eventsCountMatrixWorker , ( includeTransferReception , includeTransferDeparture ) , workers , obsoleteTagsBehaviour ,
+                                             initializer = initEventsSummaryWorker , initargs = ( flattenTree(spTree) , speciesIdFeature ) ):
+            addEventsCountMatrix(matrix, chunkMatrix)
+
+        return eventsCountMatrixToSummary(spTree , spTreeIndex.ids , eventTypes , matrix , speciesIdFeature)
+
+    def stream_eventsSummary_stdlib(self , fileName , counter ):
+        """
+        parse_eventsSummary implementation based on xml.etree.ElementTree.iterparse ; see parse_eventsSummary
+
+        Takes:
+            - fileName (str or file object) : a recPhyloXML file
+            - counter (EventsSummaryCounter) : counter of the events
+
+        Returns:
+            (ete3.Tree) : the species tree of the file (None if there is none)
+        """
+        root = None
+        depth = 0
+        spTree = None
+
+        for event, element in ET.iterparse(fileName, events = ("start", "end")):
+
+            if event == "start":
+                if root is None:
+                    root = element
+                    if not self.tagCorrection(root.tag) in ( "recPhylo" , "recGeneTree" ):
+                        raise Exception("recPhyloXML exception. Problem while parsing the xml file : no recPhylo or recgeneTree tag found at the root of the file.")
+                depth += 1
+                continue
+
+            depth -= 1
+
+            tag = self.tagCorrection(element.tag)
+
+            if tag == "eventsRec":
+                counter.countEventsRec(element)
+                element.clear()
+
+            elif depth == 1:
+                if tag == "spTree":
+                    spTree = self.parse_SpTree(element)
+                root.clear() ## the current element is the only child of the root at this point
+
+        return spTree
+
+    def stream_eventsSummary_lxml(self , fileName , counter ):
+        """
+        parse_eventsSummary implementation based on lxml.etree.iterparse ; see parse_eventsSummary
+        Only the eventsRec, recGeneTree and spTree elements are reported by lxml.
+
+        Takes:
+            - fileName (str or file object) : a recPhyloXML file
+            - counter (EventsSummaryCounter) : counter of the events
+
+        Returns:
+            (ete3.Tree) : the species tree of the file (None if there is none)
+        """
+        context = LXML_ET.iterparse(fileName, events = ("end",), tag = ("{*}eventsRec" , "{*}recGeneTree" , "{*}spTree"),
+                                    remove_comments = True, remove_pis = True, huge_tree = True)
+
+        spTree = None
+
+        for event, element in context:
+
+            tag = self.tagCorrection(element.tag)
+
+            if tag == "eventsRec":
+                counter.countEventsRec(element)
+                element.clear()
+                continue
+
+            parent = element.getparent()
+
+            if parent is None or not parent.getparent() is None: ## not a child of the root
+                continue
+
+            if tag == "spTree":
+                spTree = self.parse_SpTree(element)
+
+            ## freeing the element, and whatever came before it
+            element.clear()
+            while not element.getprevious() is None:
+                del parent[0]
+            del parent[0]
+
+        if not self.tagCorrection(context.root.tag) in ( "recPhylo" , "recGeneTree" ):
+            raise Exception("recPhyloXML exception. Problem while parsing the xml file : no recPhylo or recgeneTree tag found at the root of the file.")
+
+        return spTree
+
+    def iterparse_stdlib(self , fileName , obsoleteTagsBehaviour = 1 , skip = 0 ):
+        """
+        *generator*
+
+        iterparse implementation based on xml.etree.ElementTree.iterparse ; see iterparse
+
+        Takes:
+            - skip (int) [default = 0] : number of tree elements (recGeneTree or spTree) at the beginning of the file which are skipped without being built
+                                         (used when falling back from lxml, to resume after what it has already yielded)
+        """
+
+        root = None
+        rootTag = None
+        depth = 0
+
+        for event, element in ET.iterparse(fileName, events = ("start", "end")):
+
+            if event == "start":
+                if root is None:
+                    root = element
+                    rootTag = self.tagCorrection(root.tag)
+                    if not rootTag in ( "recPhylo" , "recGeneTree" ):
+                        raise Exception("recPhyloXML exception. Problem while parsing the xml file : no recPhylo or recgeneTree tag found at the root of the file.")
+                depth += 1
+                continue
+
+            depth -= 1
+
+            if rootTag == "recGeneTree":
+                if depth == 0 and skip == 0:
+                    yield self.parse_recGeneTree(element, obsoleteTagsBehaviour)
+                continue
+
+            if depth != 1:
+                continue
+
+            obj = None
+            tag = self.tagCorrection(element.tag)
+
+            if skip > 0 and tag in ( "recGeneTree" , "spTree" ):
+                skip -= 1 ## already reported by lxml
+
+            elif tag == "recGeneTree":
+                obj = self.parse_recGeneTree(element, obsoleteTagsBehaviour)
+            elif tag == "spTree":
+                obj = self.parse_SpTree(element)
+
+            root.clear() ## the current element is the only child of the root at this point
+
+            if not obj is None:
+                yield obj
+
+    def iterparse_lxml(self , fileName , obsoleteTagsBehaviour = 1 ):
+        """
+        *generator*
+
+        iterparse implementation based on lxml.etree.iterparse ; see iterparse
+        Only the recGeneTree and spTree elements are reported by lxml (whatever their namespace), the filtering being done at the C level.
+        """
+
+        context = LXML_ET.iterparse(fileName, events = ("end",), tag = ("{*}recGeneTree" , "{*}spTree"),
+                                    remove_comments = True, remove_pis = True, huge_tree = True)
+
+        progress = { "elements" : 0 }
+
+        try:
+            yield from self.iterparse_lxmlContext(context, obsoleteTagsBehaviour, progress)
+
+        except LXML_ET.XMLSyntaxError as e:
+            if not self.isLxmlFallbackError(e):
+                raise
+            ## the stdlib restarts from the beginning : the tree elements already processed are skipped without being built
+            self.rewind(fileName)
+            yield from self.iterparse_stdlib(fileName, obsoleteTagsBehaviour, skip = progress["elements"])
+            return
+
+        if not self.tagCorrection(context.root.tag) in ( "recPhylo" , "recGeneTree" ):
+            raise Exception("recPhyloXML exception. Problem while parsing the xml file : no recPhylo or recgeneTree tag found at the root of the file.")
+
+    def iterparse_lxmlContext(self , context , obsoleteTagsBehaviour = 1 , progress = None ):
+        """
+        *generator*
+
+        Takes:
+            - context (lxml.etree.iterparse) : an iterparse context reporting the end of recGeneTree and spTree elements
+            - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+            - progress (dict) [default = None] : if not None, progress["elements"] is incremented for each tree element processed
+
+        Yields:
+            (ete3.Tree or ReconciledTree) : the trees that are children of the root, in the order of the file
+        """
+        for event, element in context:
+
+            parent = element.getparent()
+
+            if parent is None: ## the file is a single recGeneTree
+                if self.tagCorrection(element.tag) == "recGeneTree":
+                    if not progress is None:
+                        progress["elements"] += 1
+                    yield self.parse_recGeneTree(element, obsoleteTagsBehaviour)
+                continue
+
+            if not parent.getparent() is None: ## not a child of the root
+                continue
+
+            obj = None
+
+            if self.tagCorrection(element.tag) == "recGeneTree":
+                obj = self.parse_recGeneTree(element, obsoleteTagsBehaviour)
+            else:
+                obj = self.parse_SpTree(element)
+
+            ## freeing the element, and whatever came before it
+            element.clear()
+            while not element.getprevious() is None:
+                del parent[0]
+            del parent[0]
+
+            if not progress is None:
+                progress["elements"] += 1
+
+            if not obj is None:
+                yield obj
+
+
+    def parse_fragment(self , data , obsoleteTagsBehaviour = 1 ):
+        """
+        Parses a single recGeneTree or spTree element (typically extracted from a larger file).
+
+        Takes:
+            - data (bytes or str) : xml text of a recGeneTree or spTree element
+            - obsoleteTagsBehaviour (int) [default = 1]: Behaviour when an event tag that is in OBSOLETE_EVENT_TAGS is encountered
+                                                         0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+
+        Returns:
+            (ReconciledTree) : the reconciled tree if the element is a recGeneTree
+                or
+            (ete3.Tree) : the species tree if the element is a spTree
+        """
+        element = None
+
+        if self.backend == "lxml":
+            try:
+                element = LXML_ET.fromstring(data, LXML_ET.XMLParser(remove_comments = True, remove_pis = True, huge_tree = True))
+            except LXML_ET.XMLSyntaxError as e:
+                if not self.isLxmlFallbackError(e):
+                    raise
+
+        if element is None:
+            element = ET.fromstring(data)
+
+        tag = self.tagCorrection(element.tag)
+
+        if tag == "recGeneTree":
+            return self.parse_recGeneTree(element, obsoleteTagsBehaviour)
+        elif tag == "spTree":
+            return self.parse_SpTree(element)
+
+        raise Exception("recPhyloXML exception. Problem while parsing a xml fragment : recGeneTree or spTree tag expected, " + tag + " found.")
+
+
+    def parse_parallel(self , fileName , workers = None , obsoleteTagsBehaviour = 1 , iterate = False , indexFileName = None , chunkSize = 2**20 ):
+        """
+        Parses the reconciled trees of a file in a pool of processes.
+
+        The file is split on the recGeneTree boundaries given by its index (see RecPhyloXMLIndex.py ; an up-to-date .rpxi file is used if it exists,
+        otherwise the file is scanned). Each worker reads and parses a chunk of consecutive trees, and the results are gathered in the order of the file.
+        Only a bounded number of chunks are in flight at a given time.
+        NB: returning the materialized trees cannot scale : each tree is sent back flattened and rebuilt in this process,
+            which takes about as long as parsing it, so this serial step bounds parse_parallel whatever the number of workers.
+            When only a result computed from the trees is needed (eg. an events summary), use map_parallel :
+            the function is applied to the trees in the workers, and only its results are sent back.
+
+        Takes:
+            - fileName (str) : name of a recPhyloXML file
+                               (NB: a compressed file cannot be read at random offsets : it is parsed sequentially by iterparse)
+            - workers (int) [default = None] : number of worker processes (by default, the number of processors of the machine)
+            - obsoleteTagsBehaviour (int) [default = 1]: Behaviour when an event tag that is in OBSOLETE_EVENT_TAGS is encountered
+                                                         0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+            - iterate (bool) [default = False] : if True, an ordered iterator over the trees is returned instead of a ReconciledTreeList
+            - indexFileName (str) [default = None] : name of the index file (by default fileName + ".rpxi")
+            - chunkSize (int) [default = 2**20] : approximate number of bytes of xml sent to a worker at once
+
+        Returns:
+            (ReconciledTreeList) : the reconciled trees of the file, with its species tree
+                or
+            (generator) : if iterate is True ; yields the species tree (if there is one) and then each ReconciledTree in the order of the file
+        """
+        from RecPhyloXMLIndex import getRecPhyloXMLIndex
+
+        if getCompression(fileName) is None:
+            index = getRecPhyloXMLIndex(fileName, indexFileName, writeIndex = False)
+            generator = self.iterparse_parallel(index, workers, obsoleteTagsBehaviour, chunkSize)
+        else:
+            generator = self.iterparse(fileName, obsoleteTagsBehaviour)
+
+        if iterate:
+            return generator
+
+        RTL = ReconciledTreeList()
+
+        for obj in generator:
+            if isinstance(obj, ReconciledTreeBase):
+                RTL.append(obj)
+            else:
+                RTL.setSpTree(obj)
+
+        return RTL
+
+    def parse_forest(self , fileName , obsoleteTagsBehaviour = 1 ):
+        """
+        Reads a recPhyloXML file into a ReconciledForest (see ReconciledForest.py) :
+        the trees are streamed by iterparse and converted to columns one at a time, so that they are never all in memory as python objects.
+
+        Takes:
+            - fileName (str or file object) : name of a recPhyloXML file (which may be compressed with gzip, bz2 or xz)
+            - obsoleteTagsBehaviour (int) [default = 1]: Behaviour when an event tag that is in OBSOLETE_EVENT_TAGS is encountered
+                                                         0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+
+        Returns:
+            (ReconciledForest) : the reconciled trees of the file, with its species tree
+        """
+        from ReconciledForest import ReconciledForest
+
+        return ReconciledForest.fromTrees( self.iterparse(fileName, obsoleteTagsBehaviour) )
+
+    def iterparse_parallel(self , index , workers = None , obsoleteTagsBehaviour = 1 , chunkSize = 2**20 ):
+        """
+        *generator*
+
+        see parse_parallel
+
+        Takes:
+            - index (RecPhyloXMLIndex) : index of the file to parse
+            - workers (int) [default = None] : number of worker processes (by default, the number of processors of the machine)
+            - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+            - chunkSize (int) [default = 2**20] : approximate number of bytes of xml sent to a worker at once
+
+        Yields:
+            (ete3.Tree) : the species tree, if the file contains one
+                or
+            (ReconciledTree) : a reconciled tree, in the order of the file
+        """
+        if not index.spTreeSpan is None:
+            yield parseSpans(self, index.fileName, [ index.spTreeSpan ], obsoleteTagsBehaviour)[0]
+
+        for trees in self.mapSpanChunks(index, None, (), workers, obsoleteTagsBehaviour, chunkSize):
+            yield from trees
+
+    def map_parallel(self , fileName , function , arguments = () , workers = None , obsoleteTagsBehaviour = 1 , indexFileName = None , chunkSize = 2**20 , initializer = None , initargs = () ):
+        """
+        *generator*
+        Applies a function to the reconciled trees of a file, chunk by chunk, in a pool of processes :
+        the chunks are parsed and the function is applied by the workers, and only its results are sent back,
+        so that the trees are not rebuilt in this process (as they are by parse_parallel).
+        The species tree is not given to the function : it can be read with read_species_tree and sent to the workers through initializer.
+
+        Takes:
+            - fileName (str) : name of a recPhyloXML file
+                               (NB: a compressed file cannot be read at random offsets : it is parsed sequentially by iterparse, and the function applied in this process)
+            - function (function) : function(trees , *arguments) is computed for each chunk of consecutive trees (list) ; it must be picklable (defined at the top level of a module)
+                                    None : the trees of each chunk are rebuilt in this process and yielded
+            - arguments (tuple) [default = ()] : additional arguments of the function
+            - workers (int) [default = None] : number of worker processes (by default, the number of processors of the machine)
+            - obsoleteTagsBehaviour (int) [default = 1]: Behaviour when an event tag that is in OBSOLETE_EVENT_TAGS is encountered
+                                                         0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+            - indexFileName (str) [default = None] : name of the index file (by default fileName + ".rpxi")
+            - chunkSize (int) [default = 2**20] : approximate number of bytes of xml sent to a worker at once
+            - initializer (function) [default = None] : if not None, initializer(*initargs) is called once in each worker process before the chunks
+            - initargs (tuple) [default = ()] : arguments of the initializer
+
+        Yields:
+            the result of the function for each chunk, in the order of the file
+        """
+        from RecPhyloXMLIndex import getRecPhyloXMLIndex
+
+        if getCompression(fileName) is None:
+            index = getRecPhyloXMLIndex(fileName, indexFileName, writeIndex = False)
+            yield from self.mapSpanChunks(index, function, arguments, workers, obsoleteTagsBehaviour, chunkSize, initializer, initargs)
+            return
+
+        if not initializer is None:
+            initializer(*initargs)
+
+        trees = []
+        for obj in self.iterparse(fileName, obsoleteTagsBehaviour):
+            if isinstance(obj, ReconciledTreeBase):
+                trees.append(obj)
+                if len(trees) >= SEQUENTIAL_CHUNK_SIZE:
+                    yield trees if function is None else function(trees, *arguments)
+                    trees = []
+
+        if len(trees) > 0:
+            yield trees if function is None else function(trees, *arguments)
+
+    def mapSpanChunks(self , index , function , arguments = () , workers = None , obsoleteTagsBehaviour = 1 , chunkSize = 2**20 , initializer = None , initargs = () ):
+        """
+        *generator*
+
+        see map_parallel
+
+        Takes:
+            - index (RecPhyloXMLIndex) : index of the file to parse
+            - function (function) : function(trees , *arguments) is computed by the workers for each chunk of consecutive trees
+                                    None : the trees are sent back flattened, and rebuilt in this process
+            - arguments (tuple) [default = ()] : additional arguments of the function
+            - workers (int) [default = None] : number of worker processes (by default, the number of processors of the machine)
+            - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+            - chunkSize (int) [default = 2**20] : approximate number of bytes of xml sent to a worker at once
+            - initializer (function) [default = None] : if not None, initializer(*initargs) is called once in each worker process
+            - initargs (tuple) [default = ()] : arguments of the initializer
+
+        Yields:
+            for each chunk, in the order of the file : the result of the function , or the list of the trees if function is None
+        """
+        ## grouping consecutive trees in chunks
+        chunks = []
+        current = []
+        currentSize = 0
+        for span in index.treeSpans:
+            current.append(span)
+            currentSize += span[1] - span[0]
+            if currentSize >= chunkSize:
+                chunks.append(current)
+                current = []
+                currentSize = 0
+        if len(current) > 0:
+            chunks.append(current)
+
+        if workers == 1: ## no need for a pool
+            if not initializer is None:
+                initializer(*initargs)
+            for chunk in chunks:
+                trees = parseSpans(self, index.fileName, chunk, obsoleteTagsBehaviour)
+                yield trees if function is None else function(trees, *arguments)
+            return
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        from concurrent.futures import ProcessPoolExecutor ## imported here : it is slow to import and only needed by parallel parsing
+
+        def getResult(future):
+            if function is None:
+                return unflattenTrees( future.result() )
+            return future.result()
+
+        with ProcessPoolExecutor(max_workers = workers , initializer = initializer , initargs = initargs) as executor:
+
+            maxInFlight = 4 * workers
+            inFlight = deque()
+
+            for chunk in chunks:
+
+                if len(inFlight) >= maxInFlight:
+                    yield getResult( inFlight.popleft() )
+
+                inFlight.append( executor.submit( parseSpansWorker, self.getSettings(), index.fileName, chunk, obsoleteTagsBehaviour, function, arguments ) )
+
+            while len(inFlight) > 0:
+                yield getResult( inFlight.popleft() )
+
+
     def tagCorrection(self, tag):
         """
         Takes:
@@ -144,7 +1023,7 @@ class recPhyloXML_parser:
         if not self.isOfTag(element, TAG):
             raise Exception('BadTagException. The element is of tag ' + element.tag + " instead of " + TAG + "." )
 
-        children = element.getchildren()
+        children = list(element)
 
         RTL = ReconciledTreeList()
 
@@ -179,7 +1058,7 @@ class recPhyloXML_parser:
         if not self.isOfTag(element, TAG):
             raise Exception('BadTagException. The element is of tag ' + element.tag + " instead of " + TAG + "." )
 
-        children = element.getchildren()
+        children = list(element)
 
         node = None
 
@@ -211,7 +1090,7 @@ class recPhyloXML_parser:
         if not self.isOfTag(element, TAG):
             raise Exception('BadTagException. The element is of tag ' + element.tag + " instead of " + TAG + "." )
 
-        children = element.getchildren()
+        children = list(element)
 
         node = None
 
@@ -246,21 +1125,23 @@ class recPhyloXML_parser:
         if not self.isOfTag(element, TAG):
             raise Exception('BadTagException. The element is of tag ' + element.tag + " instead of " + TAG + "." )
 
-        children = element.getchildren()
+        children = list(element)
 
         node = None
 
         additionnalInfo = {}
 
+        keepFeatures = self.keepFeatures or not reconciled
+
         for ch in children:
             if self.isOfTag(ch ,  "clade"):
                 if node is None:
                     node  = self.parse_clade(ch, reconciled, obsoleteTagsBehaviour)
                 else:
                     raise Exception("BadTagException. A " + TAG + " element has more than one clade children (only one is expected).")
-            else:
+            elif keepFeatures:
                 ### treatment for other children
-                additionnalInfo[ch.tag] = ch
+                self.addExtraElement(additionnalInfo, ch.tag, ch, PHYLOGENY_EXTRA_ELEMENT_TAGS_FEATURE)
 
 
 
@@ -269,8 +1150,9 @@ class recPhyloXML_parser:
 
 
         ### treatment for keys
-        for k,v in element.items():
-            additionnalInfo[k] = v
+        if keepFeatures:
+            for k,v in element.items():
+                additionnalInfo[k] = v
 
         if len(additionnalInfo) > 0:
             node.add_features( **additionnalInfo )
@@ -279,9 +1161,66 @@ class recPhyloXML_parser:
         return node
 
     def parse_clade(self, element, reconciled = True, obsoleteTagsBehaviour = 1 ):
+        """
+        Builds the (sub-)tree rooted at a clade element, using the engine chosen at the creation of the parser
+        (see parse_clade_iterative and parse_clade_recursive).
+
+        Takes:
+            - element (Element) : element with the "clade" tag
+            - reconciled (bool) [default = True] : whether the element passed should be considered a ReconciledTree or not
+            - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+
+        Returns:
+            None : error
+                or
+            (ReconciledTree) : the reconciled tree
+        """
+        if self.recursiveCladeParsing:
+            return self.parse_clade_recursive(element, reconciled, obsoleteTagsBehaviour)
+        return self.parse_clade_iterative(element, reconciled, obsoleteTagsBehaviour)
+
+    def parse_clade_iterative(self, element, reconciled = True, obsoleteTagsBehaviour = 1 ):
+        """
+        Builds the tree top-down with an explicit stack rather than recursion,
+        so that its depth is not bounded by the python recursion limit.
+
+        Takes:
+            - element (Element) : element with the "clade" tag
+            - reconciled (bool) [default = True] : whether the element passed should be considered a ReconciledTree or not
+            - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+
+        Returns:
+            None : error
+                or
+            (ReconciledTree) : the reconciled tree
+        """
+
+        root , cladeChildren = self.parse_cladeContent(element, reconciled, obsoleteTagsBehaviour)
+
+        stack = [ ( root , cladeChildren ) ]
+
+        while len(stack) > 0:
+            node , cladeChildren = stack.pop()
+
+            for ch in cladeChildren:
+                childNode , grandChildren = self.parse_cladeContent(ch, reconciled, obsoleteTagsBehaviour)
+                node.add_child( childNode )
+
+                if len(grandChildren) > 0:
+                    stack.append( ( childNode , grandChildren ) )
+
+        return root
+
+    def parse_clade_recursive(self, element, reconciled = True, obsoleteTagsBehaviour = 1 ):
         """
         *recursive funtion*
 
+        Former clade parsing engine, kept for reference and comparison.
+
         Takes:
             - element (Element) : element with the "clade" tag
             - reconciled (bool) [default = True] : whether the element passed should be considered a ReconciledTree or not
@@ -294,12 +1233,17 @@ class recPhyloXML_parser:
                 or
             (ReconciledTree) : the reconciled tree
         """
+
         TAG = "clade"
 
         if not self.isOfTag(element, TAG):
             raise Exception('BadTagException. The element is of tag ' + element.tag + " instead of " + TAG + "." )
 
-        children = element.getchildren()
+        children = list(element)
+
+        keepNames = self.keepNames or not reconciled
+        keepEvents = self.keepEvents or not reconciled
+        keepFeatures = self.keepFeatures or not reconciled
 
         name = None
         childrenNodes = []
@@ -309,32 +1253,36 @@ class recPhyloXML_parser:
 
         for ch in children:
             if self.isOfTag(ch ,  "clade" ):
-                childrenNodes.append( self.parse_clade(ch , reconciled, obsoleteTagsBehaviour) )
+                childrenNodes.append( self.parse_clade_recursive(ch , reconciled, obsoleteTagsBehaviour) )
 
             elif self.isOfTag(ch ,  "name" ):
-                name = self.parseSimpletextElement(ch)
+                if keepNames:
+                    name = self.parseSimpletextElement(ch)
 
             elif self.isOfTag(ch ,  "eventsRec" ):
-                events = self.parse_eventsRec(ch, obsoleteTagsBehaviour)
+                if keepEvents:
+                    events = self.parse_eventsRec(ch, obsoleteTagsBehaviour)
 
-            else:
+            elif keepFeatures:
                 ### treatment for other children
-                additionnalInfo[ self.tagCorrection( ch.tag ) ] = ch
+                self.addExtraElement(additionnalInfo, self.tagCorrection( ch.tag ), ch)
 
 
         ### treatment for keys
-        for k,v in element.items():
-            if k != "rooted":
-                additionnalInfo[k] = v
+        if keepFeatures:
+            for k,v in element.items():
+                if k != "rooted":
+                    additionnalInfo[k] = v
 
         node = None
 
         if reconciled:
-            node = ReconciledTree()
+            node = self.recTreeClass()
         else:
-            node = ete3.Tree()
+            node = self.spTreeClass()
 
-        node.name = name
+        if keepNames:
+            node.name = name
 
         if reconciled:
             for e in events:
@@ -349,6 +1297,80 @@ class recPhyloXML_parser:
 
         return node
 
+    def parse_cladeContent(self, element, reconciled = True, obsoleteTagsBehaviour = 1 ):
+        """
+        Builds the node corresponding to a clade element, without its children.
+
+        Takes:
+            - element (Element) : element with the "clade" tag
+            - reconciled (bool) [default = True] : whether the element passed should be considered a ReconciledTree or not
+            - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                         1 : warning
+                                                         2 : throw exception
+
+        Returns:
+            (tuple) : (ReconciledTree or ete3.Tree) the node , (list) the clade elements which are children of the element
+        """
+        TAG = "clade"
+
+        if not self.isOfTag(element, TAG):
+            raise Exception('BadTagException. The element is of tag ' + element.tag + " instead of " + TAG + "." )
+
+        keepNames = self.keepNames or not reconciled
+        keepEvents = self.keepEvents or not reconciled
+        keepFeatures = self.keepFeatures or not reconciled
+
+        name = None
+        cladeChildren = []
+        events = []
+
+        additionnalInfo = {}
+
+        for ch in element:
+            tag = ch.tag.rpartition("}")[2] ## inlined tagCorrection : this is the hot loop of the parser
+
+            if tag == "clade":
+                cladeChildren.append( ch )
+
+            elif tag == "name":
+                if keepNames:
+                    name = ch.text
+
+            elif tag == "eventsRec":
+                if keepEvents:
+                    events = self.parse_eventsRec(ch, obsoleteTagsBehaviour)
+
+            elif keepFeatures:
+                ### treatment for other children
+                self.addExtraElement(additionnalInfo, tag, ch)
+
+
+        ### treatment for keys
+        if keepFeatures:
+            for k,v in element.items():
+                if k != "rooted":
+                    additionnalInfo[k] = v
+
+        node = None
+
+        if reconciled:
+            node = self.recTreeClass()
+        else:
+            node = self.spTreeClass()
+
+        if keepNames:
+            node.name = name
+
+        if reconciled:
+            for e in events:
+                node.addEvent(e)
+
+        if len(additionnalInfo) > 0:
+            node.add_features( **additionnalInfo )
+
+
+        return node , cladeChildren
+
     def parse_eventsRec(self, element, obsoleteTagsBehaviour = 1 ):
         """
         *recursive funtion*
@@ -369,7 +1391,7 @@ class recPhyloXML_parser:
         if not self.isOfTag(element, TAG):
             raise Exception('BadTagException. The element is of tag ' + element.tag + " instead of " + TAG + "." )
 
-        children = element.getchildren()
+        children = list(element)
 
         events = []
 
@@ -379,7 +1401,7 @@ class recPhyloXML_parser:
 
             if obsoleteTagsBehaviour>0:
                 if evtCode in OBSOLETE_EVENT_TAGS:
-                    print OBSOLETEWARNINGTXT(evtCode)
+                    print( OBSOLETEWARNINGTXT(evtCode) )
 
                     if obsoleteTagsBehaviour>1:
                         raise Exception("ERROR. obsolete tag " + evtCode + " encoutered")
@@ -388,21 +1410,23 @@ class recPhyloXML_parser:
             evtCode = REVERSE_EVENTTAGCORRESPONDANCE.get(evtCode, evtCode) ## replace by special code when known tag, otherwise keep as is
 
             species = None
-            speciesTAGs  = ["destinationSpecies" , "speciesLocation"]
             ts = None
             tsTAG = "ts"
             additionnalInfo = {}
 
             it = ch.items()
             for k,v in it:
-                if k in speciesTAGs:
-                    species = v
+                if k in SPECIES_ATTRIBUTES:
+                    species = v ## interned by RecEvent
                 elif k == tsTAG:
                     ts = int(v)
                 else:
                     additionnalInfo[k] = v
 
 
+            if len(additionnalInfo) == 0:
+                additionnalInfo = EMPTY_ADDITIONNALINFO ## shared by RecEvent rather than copied
+
             evt = RecEvent(evtCode , species, ts, additionnalInfo)
 
             events.append(evt)
@@ -411,6 +1435,323 @@ class recPhyloXML_parser:
         return events
 
 
+## attributes giving the species of an event (see recPhyloXML_parser.parse_eventsRec)
+SPECIES_ATTRIBUTES = ( "destinationSpecies" , "speciesLocation" )
+
+
+class EventsSummaryCounter:
+    """
+    Counts the events of eventsRec elements, for recPhyloXML_parser.parse_eventsSummary.
+    The events are classified as in ReconciledTreeBase.iterEventsSummary.
+
+    Atributes:
+        - self.includeTransferReception , self.includeTransferDeparture : (bool) options of the summary
+        - self.obsoleteTagsBehaviour (int) : behaviour when an event tag that is in OBSOLETE_EVENT_TAGS is encountered
+        - self.counts        : (dict) ( event type , species id ) -> number of events
+        - self.sisterLosses  : (dict) species id -> number of speciationLoss events followed by an event in this species
+                                                    (the lost species is its sister, resolved in getEventsSummary)
+        - self.tagTypes      : (dict) cache : xml tag -> ( event type or None , (bool) is it a speciationLoss , (bool) is it obsolete )
+    """
+
+    def __init__(self, includeTransferReception = True , includeTransferDeparture = False , obsoleteTagsBehaviour = 1):
+        self.includeTransferReception = includeTransferReception
+        self.includeTransferDeparture = includeTransferDeparture
+        self.obsoleteTagsBehaviour = obsoleteTagsBehaviour
+        self.counts = {}
+        self.sisterLosses = {}
+        self.tagTypes = {}
+
+    def getTagType(self, tag):
+        """
+        Takes:
+            - tag (str) : tag of an event element
+
+        Returns:
+            (tuple) : ( event type or None , (bool) is it a speciationLoss , (bool) is it obsolete )
+        """
+        evtCode = tag.rpartition("}")[2]
+        obsolete = evtCode in OBSOLETE_EVENT_TAGS
+
+        kind = EVENTCODE_TO_KIND.get( REVERSE_EVENTTAGCORRESPONDANCE.get(evtCode, evtCode) )
+
+        eventType = None
+        if kind == KIND_SPECIATION_LOSS or kind == KIND_BRANCHING_OUT_LOSS or kind == KIND_LOSS:
+            eventType = "loss"
+        elif kind == KIND_DUPLICATION:
+            eventType = "duplication"
+        elif kind == KIND_TRANSFER_BACK and self.includeTransferReception:
+            eventType = "transferReception"
+        elif kind == KIND_BRANCHING_OUT and self.includeTransferDeparture: ## a branchingOutLoss is reported as a loss only
+            eventType = "transferDeparture"
+
+        tagType = ( eventType , kind == KIND_SPECIATION_LOSS , obsolete )
+        self.tagTypes[tag] = tagType
+        return tagType
+
+    def countEventsRec(self, element):
+        """
+        Takes:
+            - element (Element) : element with the "eventsRec" tag
+        """
+        children = list(element)
+
+        for i, ch in enumerate(children):
+
+            tagType = self.tagTypes.get(ch.tag)
+            if tagType is None:
+                tagType = self.getTagType(ch.tag)
+
+            eventType , speciationLoss , obsolete = tagType
+
+            if obsolete and self.obsoleteTagsBehaviour > 0:
+                evtCode = ch.tag.rpartition("}")[2]
+                print( OBSOLETEWARNINGTXT(evtCode) )
+                if self.obsoleteTagsBehaviour > 1:
+                    raise Exception("ERROR. obsolete tag " + evtCode + " encoutered")
+
+            if eventType is None:
+                continue
+
+            if speciationLoss:
+                ## the lost species is the sister of the species of the next event
+                if i + 1 >= len(children):
+                    raise Exception("recPhyloXML exception. A speciationLoss event is the last event of its node.")
+                ch = children[i+1]
+
+            species = None
+            for k, v in ch.items():
+                if k in SPECIES_ATTRIBUTES:
+                    species = v
+
+            if speciationLoss:
+                self.sisterLosses[species] = self.sisterLosses.get(species, 0) + 1
+            else:
+                key = ( eventType , species )
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def getEventsSummary(self, spTree, speciesIdFeature = "name"):
+        """
+        Takes:
+            - spTree (ete3.Tree) : the species tree
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+        Returns:
+            (dict) : the events summary indexed by species (see recPhyloXML_parser.parse_eventsSummary)
+        """
+        spTreeIndex = SpeciesTreeIndex(spTree, speciesIdFeature)
+
+        eventTypes = getEventsSummaryTypes(self.includeTransferReception , self.includeTransferDeparture)
+        columns = { e : j for j, e in enumerate(eventTypes) }
+
+        matrix = [ [ 0 ] * len(eventTypes) for sp in spTreeIndex.ids ]
+        rows = spTreeIndex.idToIndex
+
+        for ( e , sp ) , n in self.counts.items():
+            matrix[ rows[sp] ][ columns[e] ] += n
+
+        loss = columns["loss"]
+        for sp , n in self.sisterLosses.items():
+            matrix[ rows[ spTreeIndex.getSister(sp) ] ][loss] += n
+
+        return eventsCountMatrixToSummary(spTree , spTreeIndex.ids , eventTypes , matrix , speciesIdFeature)
+
+
+def parseSpans(parser, fileName, spans, obsoleteTagsBehaviour = 1):
+    """
+    Takes:
+        - parser (recPhyloXML_parser) : the parser to use
+        - fileName (str) : name of a recPhyloXML file
+        - spans (list) : (start, end) offsets of recGeneTree or spTree elements in the file
+        - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                     1 : warning
+                                                     2 : throw exception
+
+    Returns:
+        (list) : the parsed trees, in the same order as the spans
+    """
+    trees = []
+    IN = open(fileName, "rb")
+    for start, end in spans:
+        IN.seek(start)
+        trees.append( parser.parse_fragment( IN.read(end - start) , obsoleteTagsBehaviour ) )
+    IN.close()
+    return trees
+
+
+def parserFromSettings(settings):
+    """
+    Takes:
+        - settings (tuple) : settings of a parser (see recPhyloXML_parser.getSettings)
+
+    Returns:
+        (recPhyloXML_parser) : a new parser with these settings
+    """
+    recursiveCladeParsing, backend, lxmlFallback, fields, extraElements, treeBackend = settings
+    parser = recPhyloXML_parser(recursiveCladeParsing, backend, fields, extraElements, treeBackend)
+    parser.lxmlFallback = lxmlFallback
+    return parser
+
+
+def parseSpansWithSettings(settings, fileName, spans, obsoleteTagsBehaviour = 1):
+    """
+    parseSpans, with a parser rebuilt from its settings (for worker processes)
+
+    Takes:
+        - settings (tuple) : settings of the parser to use (see recPhyloXML_parser.getSettings)
+        - fileName (str) : name of a recPhyloXML file
+        - spans (list) : (start, end) offsets of recGeneTree elements in the file
+        - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                     1 : warning
+                                                     2 : throw exception
+
+    Returns:
+        (list) : the parsed trees, in the same order as the spans
+    """
+    return parseSpans(parserFromSettings(settings), fileName, spans, obsoleteTagsBehaviour)
+
+
+def parseSpansWorker(settings, fileName, spans, obsoleteTagsBehaviour = 1, function = None, arguments = ()):
+    """
+    Function executed by the worker processes of recPhyloXML_parser.parse_parallel and recPhyloXML_parser.map_parallel.
+
+    Takes:
+        - settings (tuple) : settings of the parser to use (see recPhyloXML_parser.getSettings)
+        - fileName (str) : name of a recPhyloXML file
+        - spans (list) : (start, end) offsets of recGeneTree elements in the file
+        - obsoleteTagsBehaviour (int) [default = 1]: 0 : ignore
+                                                     1 : warning
+                                                     2 : throw exception
+        - function (function) [default = None] : if not None, function(trees , *arguments) is computed on the parsed trees
+        - arguments (tuple) [default = ()] : additional arguments of the function
+
+    Returns:
+        (list) : if function is None, the flattened parsed trees (see flattenTree), in the same order as the spans
+            or
+        the result of the function
+    """
+    trees = parseSpansWithSettings(settings, fileName, spans, obsoleteTagsBehaviour)
+
+    if function is None:
+        return [ flattenTree(RT) for RT in trees ]
+
+    return function(trees, *arguments)
+
+
+def toStdlibElement(element):
+    """
+    Takes:
+        - element (lxml.etree._Element)
+
+    Returns:
+        (xml.etree.ElementTree.Element) : the same element, which can be pickled
+    """
+    return ET.fromstring( LXML_ET.tostring(element, with_tail = False) )
+
+
+def getPicklableFeatures(features):
+    """
+    Takes:
+        - features (dict) : features of a node
+
+    Returns:
+        (dict) : features if none of them is an lxml element ; otherwise a copy where they are replaced by their xml.etree equivalent
+    """
+    if LXML_ET is None:
+        return features
+
+    for v in features.values():
+        if isinstance(v, LXML_ET._Element):
+            return { k : ( toStdlibElement(v) if isinstance(v, LXML_ET._Element) else v ) for k, v in features.items() }
+
+    return features
+
+
+def flattenTree(tree):
+    """
+    Gives a representation of a tree that pickle can handle whatever the depth of the tree
+    (pickling the tree itself fails on deep trees, as pickle recurses along the children).
+    lxml elements (kept by the "element" policy for extra elements) can not be pickled : they are replaced by their xml.etree equivalent.
+
+    Takes:
+        - tree (ete3.TreeNode or LightTree) : a tree
+
+    Returns:
+        (tuple) : (class) class of the nodes , (list) for each node in preorder : (int) index of its parent (-1 for the root) , (dict) its attributes
+    """
+    nodes = []
+    stack = [ ( tree , -1 ) ]
+
+    while len(stack) > 0:
+        node , parentIndex = stack.pop()
+
+        if isinstance(node, LightTree):
+            attributes = node.getAttributes()
+            attributes["features"] = getPicklableFeatures(attributes["features"])
+        else:
+            attributes = getPicklableFeatures(node.__dict__).copy()
+            del attributes["_children"]
+            del attributes["_up"]
+
+        index = len(nodes)
+        nodes.append( ( parentIndex , attributes ) )
+
+        for ch in reversed(node.children):
+            stack.append( ( ch , index ) )
+
+    return ( tree.__class__ , nodes )
+
+
+def unflattenTree(state):
+    """
+    Takes:
+        - state (tuple) : a tree representation returned by flattenTree
+
+    Returns:
+        (ete3.TreeNode or LightTree) : the tree
+    """
+    nodeClass , nodes = state
+
+    light = issubclass(nodeClass, LightTree)
+
+    built = []
+
+    for parentIndex , attributes in nodes:
+        node = nodeClass.__new__(nodeClass)
+
+        if light:
+            node.setAttributes(attributes)
+            node.children = []
+            node.up = None
+            if parentIndex >= 0:
+                parent = built[parentIndex]
+                node.up = parent
+                parent.children.append(node)
+
+        else:
+            node.__dict__.update(attributes)
+            node._children = []
+            node._up = None
+            if parentIndex >= 0:
+                parent = built[parentIndex]
+                node._up = parent
+                parent._children.append(node)
+
+        built.append(node)
+
+    return built[0]
+
+
+def unflattenTrees(states):
+    """
+    Takes:
+        - states (list) : tree representations returned by flattenTree
+
+    Returns:
+        (list) : the trees
+    """
+    return [ unflattenTree(state) for state in states ]
+
+
 if __name__ == "__main__":
 
     parser = recPhyloXML_parser()
@@ -440,4 +1781,4 @@ if __name__ == "__main__":
     RTL = parser.parse(fileName)
 
     for RT in RTL.recTrees:
-        print RT
+        print( RT )
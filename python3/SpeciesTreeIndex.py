@@ -0,0 +1,259 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        18-Oct-2026
+##  Last modified:  18-Oct-2026
+##
+##  Decribes the SpeciesTreeIndex class : an index of a species tree, built once,
+##  giving constant time access to the nodes of the tree from their id,
+##  to their parent, sister and depth, and to the last common ancestor (LCA) of 2 species.
+##
+##  The LCA queries use an Euler tour of the tree and a sparse table of range minimums over it :
+##  the index is built in O(n log n) and each query is answered in O(1).
+##
+##  requires : nothing outside of the standard library
+##             (works with ete3 trees as well as with LightTree, see LightReconciledTree.py)
+##
+##  developped for python3.0
+##
+#########################################
+
+
+class SpeciesTreeIndex:
+    """
+    Index of a species tree.
+    The nodes are numbered in pre-order : the root has index 0
+    and the descendants of the node with index i have indexes i+1 to self.lastDescendants[i].
+
+    Atributes:
+        - self.speciesTree      : the indexed species tree
+        - self.speciesIdFeature : (str) the feature used as id of the species
+        - self.nodes            : (list) the nodes of the tree, in pre-order
+        - self.ids              : (list) the ids of the nodes, in pre-order
+        - self.idToIndex        : (dict) species id -> index of the node
+        - self.ambiguousIds     : (dict) species id -> number of nodes, for the ids borne by several nodes
+        - self.parents          : (list) index of the parent of each node (-1 for the root)
+        - self.sisters          : (list) index of the (first) sister of each node (-1 if the node has no sister)
+        - self.depths           : (list) depth of each node (0 for the root)
+        - self.lastDescendants  : (list) index of the last descendant of each node (itself for a leaf)
+        - self.eulerTour        : (list) indexes of the nodes in the order of a depth-first walk of the tree (2n-1 elements)
+        - self.firstOccurrences : (list) position of the first occurrence of each node in the Euler tour
+        - self.sparseTable      : (list) self.sparseTable[k][i] is the minimum of the Euler tour between positions i and i + 2**k - 1
+    """
+
+    def __init__(self, speciesTree, speciesIdFeature = "name"):
+        """
+        Takes:
+            - speciesTree (ete3.Tree) : a species tree (or a LightTree)
+            - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+        """
+        self.speciesTree = speciesTree
+        self.speciesIdFeature = speciesIdFeature
+
+        self.nodes = []
+        self.ids = []
+        self.idToIndex = {}
+        self.ambiguousIds = {}
+        self.parents = []
+        self.depths = []
+        self.lastDescendants = []
+        self.eulerTour = []
+        self.firstOccurrences = []
+
+        children = []
+
+        ## iterative depth-first walk : a (None, i) element marks the end of the subtree of node i
+        stack = [ ( speciesTree , -1 ) ]
+        while len(stack) > 0:
+            node , i = stack.pop()
+
+            if node is None:
+                self.lastDescendants[i] = len(self.nodes) - 1
+                if self.parents[i] != -1:
+                    self.eulerTour.append( self.parents[i] ) ## back to the parent
+                continue
+
+            index = len(self.nodes)
+            speciesId = getattr(node, speciesIdFeature, None)
+
+            if speciesId in self.idToIndex:
+                self.ambiguousIds[speciesId] = self.ambiguousIds.get(speciesId, 1) + 1
+            else:
+                self.idToIndex[speciesId] = index
+
+            self.nodes.append(node)
+            self.ids.append(speciesId)
+            self.parents.append(i)
+            self.depths.append( 0 if i == -1 else self.depths[i] + 1 )
+            self.lastDescendants.append(index)
+            self.firstOccurrences.append( len(self.eulerTour) )
+            self.eulerTour.append(index)
+            children.append([])
+            if i != -1:
+                children[i].append(index)
+
+            stack.append( ( None , index ) )
+            for ch in reversed(node.children):
+                stack.append( ( ch , index ) )
+
+        self.sisters = [ -1 ] * len(self.nodes)
+        for ch in children:
+            if len(ch) > 1: ## as with get_sisters()[0] : the first child other than the node
+                self.sisters[ch[0]] = ch[1]
+                for c in ch[1:]:
+                    self.sisters[c] = ch[0]
+
+        ## sparse table : as nodes are numbered in pre-order, the LCA of 2 nodes
+        ## is the node with the smallest index between their occurrences in the Euler tour
+        self.sparseTable = [ self.eulerTour ]
+        width = 1
+        while 2 * width <= len(self.eulerTour):
+            previous = self.sparseTable[-1]
+            self.sparseTable.append( list( map( min , previous[:-width] , previous[width:] ) ) )
+            width *= 2
+
+
+    def __len__(self):
+        """
+        Returns:
+            (int) : number of nodes in the species tree
+        """
+        return len(self.nodes)
+
+    def __contains__(self, speciesId):
+        return speciesId in self.idToIndex
+
+
+    def getIndex(self, speciesId):
+        """
+        Takes:
+            - speciesId : id of a species
+
+        Returns:
+            (int) : index of the node of the species
+            OR raises an exception if the id is not borne by exactly one node
+        """
+        index = self.idToIndex.get(speciesId)
+
+        if index is None:
+            raise Exception("recPhyloXML exception. Species " + str(speciesId) + " is not in the species tree.")
+
+        if speciesId in self.ambiguousIds:
+            raise Exception("recPhyloXML exception. " + str(self.ambiguousIds[speciesId]) + " nodes with Id " + str(speciesId) + " in the species tree (1 expected).")
+
+        return index
+
+    def getNode(self, speciesId):
+        """
+        Takes:
+            - speciesId : id of a species
+
+        Returns:
+            the node of the species
+        """
+        return self.nodes[ self.getIndex(speciesId) ]
+
+    def getParent(self, speciesId):
+        """
+        Takes:
+            - speciesId : id of a species
+
+        Returns:
+            the id of the parent of the species (None for the root)
+        """
+        i = self.parents[ self.getIndex(speciesId) ]
+        if i == -1:
+            return None
+        return self.ids[i]
+
+    def getSister(self, speciesId):
+        """
+        Takes:
+            - speciesId : id of a species
+
+        Returns:
+            the id of the (first) sister of the species
+            OR raises an exception if the species has no sister (the root, or the single child of a node)
+        """
+        i = self.sisters[ self.getIndex(speciesId) ]
+        if i == -1:
+            raise Exception("recPhyloXML exception. Species " + str(speciesId) + " has no sister in the species tree.")
+        return self.ids[i]
+
+    def getDepth(self, speciesId):
+        """
+        Takes:
+            - speciesId : id of a species
+
+        Returns:
+            (int) : depth of the species in the tree (0 for the root)
+        """
+        return self.depths[ self.getIndex(speciesId) ]
+
+    def isAncestor(self, ancestorId, speciesId):
+        """
+        Takes:
+            - ancestorId : id of a species
+            - speciesId : id of a species
+
+        Returns:
+            (bool) : True if the first species is an ancestor of (or the same as) the second one
+        """
+        a = self.getIndex(ancestorId)
+        return a <= self.getIndex(speciesId) <= self.lastDescendants[a]
+
+
+    def getLCAIndex(self, i, j):
+        """
+        Takes:
+            - i (int) : index of a node
+            - j (int) : index of a node
+
+        Returns:
+            (int) : index of the last common ancestor of the 2 nodes
+        """
+        left = self.firstOccurrences[i]
+        right = self.firstOccurrences[j]
+        if left > right:
+            left , right = right , left
+
+        k = ( right - left + 1 ).bit_length() - 1
+        row = self.sparseTable[k]
+        return min( row[left] , row[ right - ( 1 << k ) + 1 ] )
+
+    def getLCA(self, speciesIds):
+        """
+        Takes:
+            - speciesIds (iterable) : ids of species (at least one)
+
+        Returns:
+            the id of the last common ancestor of the species
+        """
+        lca = None
+        for sp in speciesIds:
+            i = self.getIndex(sp)
+            lca = i if lca is None else self.getLCAIndex(lca, i)
+
+        if lca is None:
+            raise Exception("recPhyloXML exception. Can't compute the LCA of an empty set of species.")
+
+        return self.ids[lca]
+
+
+def getSpeciesTreeIndex(speciesTree, speciesIdFeature = "name"):
+    """
+    Takes:
+        - speciesTree (ete3.Tree or SpeciesTreeIndex) : a species tree, or its index
+        - speciesIdFeature (str) [default = "name"] : the feature to use as Id in the species tree (by default the name is used)
+
+    Returns:
+        (SpeciesTreeIndex) : the given index if it uses the given speciesIdFeature, otherwise a new index of the species tree
+    """
+    if isinstance(speciesTree, SpeciesTreeIndex):
+        if speciesTree.speciesIdFeature == speciesIdFeature:
+            return speciesTree
+        speciesTree = speciesTree.speciesTree
+
+    return SpeciesTreeIndex(speciesTree, speciesIdFeature)
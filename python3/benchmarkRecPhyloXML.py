@@ -0,0 +1,919 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        18-Oct-2026
+##  Last modified:  18-Oct-2026
+##
+##
+##  This script times the reading and writing functions
+##  of ReconciledTree and ReconciledTreeIO on synthetic recPhyloXML data
+##
+##  requires : ete3 ( http://etetoolkit.org/ )
+##             ReconciledTree
+##             ReconciledTreeIO
+##
+##  developped for python3.0
+##
+#########################################
+
+from ReconciledTree import ReconciledTreeList, myBasicTreeXMLLines
+from ReconciledTreeIO import recPhyloXML_parser, LXML_ET, TREE_BACKENDS
+from RecPhyloXMLIndex import buildRecPhyloXMLIndex
+
+import sys
+import os
+import time
+import tracemalloc
+import resource
+import tempfile
+import shutil
+import subprocess
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+def makeLadderCladeLines(depth, nbSpecies = 50):
+    """
+    Generates the lines of a ladder-like reconciled gene tree, in the way
+    a loss-independent conversion produces them (one speciation + loss per level).
+
+    Takes:
+        - depth (int) : number of nested clades on the main branch of the ladder
+        - nbSpecies (int) [default = 50] : number of different species names to use
+
+    Returns:
+        (list) : list of xml lines
+    """
+    lines = []
+    for i in range(depth):
+        sp = str( i % nbSpecies )
+        lines.append( "<clade><name>n" + str(i) + "</name><eventsRec><speciation speciesLocation=\"" + sp + "\"></speciation></eventsRec>" )
+        lines.append( "<clade><name>LOSS</name><eventsRec><loss speciesLocation=\"" + sp + "\"></loss></eventsRec></clade>" )
+
+    lines.append( "<clade><name>leaf</name><eventsRec><leaf speciesLocation=\"0\"></leaf></eventsRec></clade>" )
+    lines += [ "</clade>" ] * depth
+
+    return lines
+
+
+def makeBalancedCladeLines(depth, nbSpecies = 50):
+    """
+    Generates the lines of a balanced reconciled gene tree, whose internal nodes are duplications.
+
+    Takes:
+        - depth (int) : depth of the tree (it has 2**depth leaves)
+        - nbSpecies (int) [default = 50] : number of different species names to use
+
+    Returns:
+        (list) : list of xml lines
+    """
+    lines = []
+    stack = [ ( 0 , 0 ) ] ## (depth , number) of the clades to write ; (None , None) closes a clade
+    while len(stack) > 0:
+        d , i = stack.pop()
+        if d is None:
+            lines.append( "</clade>" )
+            continue
+        sp = str( i % nbSpecies )
+        if d == depth:
+            lines.append( "<clade><name>n" + str(i) + "</name><eventsRec><leaf speciesLocation=\"" + sp + "\"></leaf></eventsRec></clade>" )
+            continue
+        lines.append( "<clade><name>n" + str(i) + "</name><eventsRec><duplication speciesLocation=\"" + sp + "\"></duplication></eventsRec>" )
+        stack.append( ( None , None ) )
+        stack.append( ( d + 1 , 2 * i + 1 ) )
+        stack.append( ( d + 1 , 2 * i ) )
+
+    return lines
+
+
+def writeSyntheticFile(fileName, nbTrees, depth):
+    """
+    Takes:
+        - fileName (str) : name of the file to write
+        - nbTrees (int) : number of reconciled gene trees to write
+        - depth (int) : depth of each tree (see makeLadderCladeLines)
+    """
+    writeSyntheticTreesFile(fileName, nbTrees, makeLadderCladeLines(depth))
+
+
+def writeSyntheticTreesFile(fileName, nbTrees, cladeLines):
+    """
+    Takes:
+        - fileName (str) : name of the file to write
+        - nbTrees (int) : number of reconciled gene trees to write
+        - cladeLines (list) : xml lines of the root clade of each tree
+    """
+    treeLines = ["<recGeneTree>", "<phylogeny rooted=\"true\">"] + cladeLines + ["</phylogeny>", "</recGeneTree>"]
+    treeStr = "\n".join(treeLines) + "\n"
+
+    OUT = open(fileName, "w")
+    OUT.write("<recPhylo>\n")
+    for i in range(nbTrees):
+        OUT.write(treeStr)
+    OUT.write("</recPhylo>\n")
+    OUT.close()
+
+
+def writeScaledUpFile(fileName, sourceFileName, nbCopies):
+    """
+    Writes a recPhyloXML file containing several copies of the reconciled gene trees of an existing file.
+
+    Takes:
+        - fileName (str) : name of the file to write
+        - sourceFileName (str) : name of a recPhyloXML file whose root is a recPhylo element
+        - nbCopies (int) : number of copies of the reconciled gene trees of the source file
+    """
+    IN = open(sourceFileName, "r")
+    content = IN.read()
+    IN.close()
+
+    start = content.index("<recGeneTree")
+    end = content.rindex("</recGeneTree>") + len("</recGeneTree>")
+
+    OUT = open(fileName, "w")
+    OUT.write( content[:start] )
+    for i in range(nbCopies):
+        OUT.write( content[start:end] + "\n" )
+    OUT.write( content[end:] )
+    OUT.close()
+
+
+def writeAnnotatedFile(fileName, sourceFileName, nbCopies):
+    """
+    Writes a recPhyloXML file like writeScaledUpFile, where every clade of the reconciled gene trees
+    is annotated with taxonomy and sequence elements (which are not part of the recPhyloXML format).
+
+    Takes:
+        - fileName (str) : name of the file to write
+        - sourceFileName (str) : name of a recPhyloXML file whose root is a recPhylo element
+        - nbCopies (int) : number of copies of the reconciled gene trees of the source file
+    """
+    writeScaledUpFile(fileName, sourceFileName, nbCopies)
+
+    IN = open(fileName, "r")
+    content = IN.read()
+    IN.close()
+
+    annotation = "</name><taxonomy><code>SPECI</code><scientific_name>Genus species</scientific_name></taxonomy>"
+    annotation += "<sequence><name>protein</name><mol_seq>" + "ACDEFGHIKLMNPQRSTVWY" * 10 + "</mol_seq></sequence>"
+
+    start = content.index("<recGeneTree")
+    content = content[:start] + content[start:].replace("</name>", annotation)
+
+    OUT = open(fileName, "w")
+    OUT.write(content)
+    OUT.close()
+
+
+def writeRandomFamiliesFile(fileName, nbSpecies, nbTrees, maxTreeSpecies = 32, seed = 0):
+    """
+    Writes a recPhyloXML file with a random species tree and reconciled gene trees
+    simulated along subtrees of it with random duplications and losses.
+
+    Takes:
+        - fileName (str) : name of the file to write
+        - nbSpecies (int) : number of leaves of the species tree
+        - nbTrees (int) : number of reconciled gene trees to write
+        - maxTreeSpecies (int) [default = 32] : maximum number of leaves of the species subtree of a gene tree (the minimum is a quarter of it)
+        - seed (int) [default = 0] : seed of the random number generator
+    """
+    import random
+    from LightReconciledTree import LightTree
+
+    generator = random.Random(seed)
+
+    ## random binary species tree : leaves are split until there are nbSpecies of them
+    spTree = LightTree()
+    leaves = [ spTree ]
+    while len(leaves) < nbSpecies:
+        leaf = leaves.pop( generator.randrange(len(leaves)) )
+        leaves += [ leaf.add_child() , leaf.add_child() ]
+    for i, n in enumerate(spTree.traverse("preorder")):
+        n.name = "s" + str(i)
+
+    roots = [ n for n in spTree.traverse() if maxTreeSpecies // 4 <= len(n.get_leaves()) <= maxTreeSpecies ]
+
+    def cladeLines(spNode, counter):
+        """ simulates the gene lineage in spNode """
+        counter[0] += 1
+        name = "<clade><name>g" + str(counter[0]) + "</name><eventsRec>"
+
+        if generator.random() < 0.1:
+            return [ name + "<duplication speciesLocation=\"" + spNode.name + "\"></duplication></eventsRec>" ] + cladeLines(spNode, counter) + cladeLines(spNode, counter) + [ "</clade>" ]
+
+        if spNode.is_leaf():
+            return [ name + "<leaf speciesLocation=\"" + spNode.name + "\"></leaf></eventsRec></clade>" ]
+
+        lines = [ name + "<speciation speciesLocation=\"" + spNode.name + "\"></speciation></eventsRec>" ]
+        for ch in spNode.children:
+            if generator.random() < 0.2:
+                lines.append( "<clade><name>LOSS</name><eventsRec><loss speciesLocation=\"" + ch.name + "\"></loss></eventsRec></clade>" )
+            else:
+                lines += cladeLines(ch, counter)
+        lines.append("</clade>")
+        return lines
+
+    OUT = open(fileName, "w")
+    OUT.write("<recPhylo>\n<spTree>\n")
+    OUT.write( "\n".join( myBasicTreeXMLLines(spTree) ) + "\n" )
+    OUT.write("</spTree>\n")
+    for i in range(nbTrees):
+        lines = ["<recGeneTree>", "<phylogeny rooted=\"true\">"] + cladeLines( generator.choice(roots) , [ 0 ] ) + ["</phylogeny>", "</recGeneTree>"]
+        OUT.write( "\n".join(lines) + "\n" )
+    OUT.write("</recPhylo>\n")
+    OUT.close()
+
+
+GENEFAMILY0 = os.path.join( os.path.dirname(os.path.abspath(__file__)) , ".." , "testFiles" , "geneFamily0.phyloxml" )
+
+
+def timeIt(function, repeat = 3):
+    """
+    Takes:
+        - function (callable) : function to time (called without argument)
+        - repeat (int) [default = 3] : number of times the function is called
+
+    Returns:
+        (float) : best time (in seconds) over the repeats
+    """
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        t = time.perf_counter() - start
+        if best is None or t < best:
+            best = t
+    return best
+
+
+def benchmarkDeepClades(tmpDir):
+    """ compares the recursive and iterative clade parsers on deep ladder-like trees """
+
+    ## same xml backend for both, to compare only the clade parsing engines
+    recursiveParser = recPhyloXML_parser(recursiveCladeParsing = True , backend = "stdlib")
+    iterativeParser = recPhyloXML_parser(backend = "stdlib")
+
+    depth = 300 ## stays under the default recursion limit for the recursive parser
+    fileName = os.path.join(tmpDir, "deep.xml")
+    writeSyntheticFile(fileName, 50, depth)
+
+    tRec = timeIt( lambda : recursiveParser.parse(fileName) )
+    tIt = timeIt( lambda : iterativeParser.parse(fileName) )
+
+    print("deep clades : 50 trees of depth", depth)
+    print("  recursive :", round(tRec, 3), "s")
+    print("  iterative :", round(tIt, 3), "s", "( x" + str(round(tRec / tIt, 2)) , ")")
+
+    depth = 20000
+    writeSyntheticFile(fileName, 1, depth)
+
+    try:
+        recursiveParser.parse(fileName)
+        print("  recursive : parsed a tree of depth", depth)
+    except RecursionError:
+        print("  recursive : RecursionError on a tree of depth", depth)
+
+    t = timeIt( lambda : iterativeParser.parse(fileName) , 1 )
+    print("  iterative : parsed a tree of depth", depth, "in", round(t, 3), "s")
+
+
+def benchmarkBackends(tmpDir):
+    """ compares the throughput of the stdlib and lxml parsing backends """
+
+    nbCopies = 200
+    fileName = os.path.join(tmpDir, "scaledUp.xml")
+    writeScaledUpFile(fileName, GENEFAMILY0, nbCopies)
+    size = os.path.getsize(fileName) / 2.**20
+
+    print("backends :", nbCopies, "copies of geneFamily0.phyloxml (" + str(round(size, 1)) + " MB)")
+
+    backends = ["stdlib"]
+    if LXML_ET is None:
+        print("  lxml is not installed, only the stdlib backend is timed.")
+    else:
+        backends.append("lxml")
+
+    for backend in backends:
+        parser = recPhyloXML_parser(backend = backend)
+
+        tParse = timeIt( lambda : parser.parse(fileName) )
+        tIter = timeIt( lambda : [ x for x in parser.iterparse(fileName) ] )
+
+        print("  " + backend , ": parse" , round(size / tParse, 1) , "MB/s ; iterparse" , round(size / tIter, 1) , "MB/s")
+
+
+def benchmarkIndex(tmpDir):
+    """ compares a full parse with an indexed access to 10 trees """
+
+    nbCopies = 10000
+    fileName = os.path.join(tmpDir, "indexed.xml")
+    writeScaledUpFile(fileName, os.path.join( os.path.dirname(GENEFAMILY0) , "9999.nhx.xml" ), nbCopies)
+    size = os.path.getsize(fileName) / 2.**20
+
+    print("index :", nbCopies, "copies of 9999.nhx.xml (" + str(round(size, 1)) + " MB)")
+
+    positions = range(0, nbCopies, nbCopies // 10)
+
+    tParse = timeIt( lambda : recPhyloXML_parser().parse(fileName) , 1 )
+    print("  full parse            :", round(tParse, 3), "s")
+
+    tBuild = timeIt( lambda : buildRecPhyloXMLIndex(fileName) )
+    print("  index scan            :", round(tBuild, 3), "s (" + str(round(size / tBuild, 1)) + " MB/s)")
+
+    ReconciledTreeList.open_indexed(fileName) ## writes the index file
+    tIndexed = timeIt( lambda : ReconciledTreeList.open_indexed(fileName).getTrees(positions) )
+    print("  open index + 10 trees :", round(tIndexed, 3), "s")
+
+
+def benchmarkParallel(tmpDir):
+    """ compares a serial parse with parse_parallel, and the streaming events summary with the one computed by the workers of map_parallel, for increasing numbers of workers """
+
+    nbCopies = 5000
+    fileName = os.path.join(tmpDir, "parallel.xml")
+    writeScaledUpFile(fileName, os.path.join( os.path.dirname(GENEFAMILY0) , "9999.nhx.xml" ), nbCopies)
+
+    parser = recPhyloXML_parser()
+
+    print("parallel :", nbCopies, "copies of 9999.nhx.xml ,", os.cpu_count(), "processors")
+
+    tSerial = timeIt( lambda : parser.parse(fileName) , 1 )
+    print("  serial parse :", round(tSerial, 3), "s")
+
+    workers = 1
+    while workers <= os.cpu_count():
+        t = timeIt( lambda : parser.parse_parallel(fileName, workers = workers) , 1 )
+        print("  " + str(workers) , "worker(s) :", round(t, 3), "s ( x" + str(round(tSerial / t, 2)) , ")")
+        workers *= 2
+
+    ## the trees are not sent back : only the count matrices of the chunks
+    summaryParser = recPhyloXML_parser( fields = {"events"} , treeBackend = "light" )
+
+    tStream = timeIt( lambda : summaryParser.parse_eventsSummary(fileName) , 1 )
+    print("  streaming events summary :", round(tStream, 3), "s")
+
+    workers = 2
+    while workers <= os.cpu_count():
+        t = timeIt( lambda : summaryParser.parse_eventsSummary(fileName, workers = workers) , 1 )
+        print("  events summary ," , workers , "workers :", round(t, 3), "s ( x" + str(round(tStream / t, 2)) , ")")
+        workers *= 2
+
+
+def benchmarkFields(tmpDir):
+    """ compares the time and memory needed to parse all the fields of the gene trees, or only some of them """
+
+    nbCopies = 50
+    fileName = os.path.join(tmpDir, "fields.xml")
+    writeScaledUpFile(fileName, GENEFAMILY0, nbCopies)
+
+    print("fields :", nbCopies, "copies of geneFamily0.phyloxml")
+
+    for fields in [ None , {"topology","events"} , {"events"} , {"topology"} ]:
+        parser = recPhyloXML_parser(fields = fields)
+
+        t = timeIt( lambda : parser.parse(fileName) , 5 )
+
+        tracemalloc.start()
+        RTL = parser.parse(fileName)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del RTL
+
+        label = "all" if fields is None else ",".join(sorted(fields))
+        print("  " + label.ljust(15) , ":", round(t, 3), "s ;", round(size / 2.**20, 1), "MB retained")
+
+
+def benchmarkExtraElements(tmpDir):
+    """ compares the time and memory needed to parse an annotated file with the different policies for extra elements """
+
+    nbCopies = 50
+    fileName = os.path.join(tmpDir, "annotated.xml")
+    writeAnnotatedFile(fileName, GENEFAMILY0, nbCopies)
+    size = os.path.getsize(fileName) / 2.**20
+
+    print("extra elements :", nbCopies, "annotated copies of geneFamily0.phyloxml (" + str(round(size, 1)) + " MB)")
+
+    ## stdlib backend : tracemalloc does not see the memory allocated by libxml2
+    for policy in [ "element" , "text" , "drop" ]:
+        parser = recPhyloXML_parser(backend = "stdlib" , extraElements = policy)
+
+        t = timeIt( lambda : parser.parse(fileName) , 5 )
+
+        tracemalloc.start()
+        RTL = parser.parse(fileName)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del RTL
+
+        print("  " + policy.ljust(8) , ":", round(t, 3), "s ;", round(size / 2.**20, 1), "MB retained")
+
+
+def measureParsedMemory(fileName):
+    """
+    Parses a file with iterparse and keeps all its trees.
+    Meant to be run in a fresh process, so that the growth of its peak RSS is the memory taken by the trees.
+
+    Takes:
+        - fileName (str) : name of a recPhyloXML file
+
+    Returns:
+        (tuple) : (float) growth of the peak RSS of the process (in MB) , (int) number of events in the trees
+    """
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    trees = list( recPhyloXML_parser().iterparse(fileName) )
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    nbEvents = sum( len(n.eventRecs) for RT in trees for n in RT.traverse() )
+
+    return ( (after - before) / 2.**10 , nbEvents ) ## ru_maxrss is in kB on linux
+
+
+def benchmarkSymbols(tmpDir):
+    """ measures the memory taken by the events of a large synthetic corpus (species are interned, known event codes are stored as kinds) """
+
+    nbTrees = 500
+    depth = 300
+    fileName = os.path.join(tmpDir, "symbols.xml")
+    writeSyntheticFile(fileName, nbTrees, depth)
+
+    with ProcessPoolExecutor(max_workers = 1) as executor:
+        rss , nbEvents = executor.submit( measureParsedMemory , fileName ).result()
+
+    print("symbols :", nbTrees, "trees of depth", depth, "(" + str(nbEvents), "events on 50 species)")
+    print("  RSS growth :", round(rss, 1), "MB (" + str(round(rss * 2.**20 / nbEvents)), "bytes per event, nodes included)")
+
+
+def benchmarkForest(tmpDir):
+    """ compares a ReconciledTreeList and a ReconciledForest in memory and for the computation of event summaries """
+    from ReconciledForest import ReconciledForest
+
+    nbCopies = 5000
+    fileName = os.path.join(tmpDir, "forest.xml")
+    writeScaledUpFile(fileName, os.path.join( os.path.dirname(GENEFAMILY0) , "9999.nhx.xml" ), nbCopies)
+
+    parser = recPhyloXML_parser()
+
+    tracemalloc.start()
+    RTL = parser.parse(fileName)
+    sizeRTL = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    forest = parser.parse_forest(fileName)
+    sizeForest = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print("forest :", nbCopies, "copies of 9999.nhx.xml (" + str(forest.nbNodes()), "nodes ,", forest.nbEvents(), "events)")
+    print("  retained memory        : ReconciledTreeList", round(sizeRTL / 2.**20, 1), "MB ; ReconciledForest", round(sizeForest / 2.**20, 1), "MB")
+
+    tList = timeIt( lambda : RTL.getEventsSummary(indexBySpecies = True) )
+    tForest = timeIt( lambda : forest.getEventsSummary(indexBySpecies = True) )
+    print("  summary by species     : ReconciledTreeList", round(tList, 3), "s ; ReconciledForest", round(tForest, 3), "s ( x" + str(round(tList / tForest, 1)) , ")")
+
+    tParse = timeIt( lambda : parser.parse(fileName) , 1 )
+    tParseForest = timeIt( lambda : parser.parse_forest(fileName) , 1 )
+    print("  parse                  : ReconciledTreeList", round(tParse, 3), "s ; ReconciledForest", round(tParseForest, 3), "s")
+
+
+def measureImportTime(statement, repeat = 5):
+    """
+    Takes:
+        - statement (str) : python import statement(s)
+        - repeat (int) [default = 5] : number of fresh interpreters to time the statement in
+
+    Returns:
+        (float) : best time (in seconds) taken by the statement in a fresh python interpreter
+    """
+    code = "import time ; t = time.perf_counter() ; " + statement + " ; print( time.perf_counter() - t )"
+    directory = os.path.dirname( os.path.abspath(__file__) )
+    best = None
+    for i in range(repeat):
+        out = subprocess.run( [ sys.executable , "-c" , code ] , cwd = directory , capture_output = True , text = True , check = True ).stdout
+        t = float(out)
+        if best is None or t < best:
+            best = t
+    return best
+
+
+def benchmarkLightTrees(tmpDir):
+    """ compares the ete3 and lightweight tree backends : start-up time, memory per node and parsing time """
+
+    tEte3 = measureImportTime("import ReconciledTreeIO , ReconciledTree")
+    tLight = measureImportTime("import ReconciledTreeIO , LightReconciledTree")
+    print("light trees :")
+    print("  start-up (imports)     : ete3", round(tEte3, 3), "s ; light", round(tLight, 3), "s")
+
+    nbCopies = 50
+    fileName = os.path.join(tmpDir, "light.xml")
+    writeScaledUpFile(fileName, GENEFAMILY0, nbCopies)
+
+    for treeBackend in TREE_BACKENDS:
+        parser = recPhyloXML_parser(treeBackend = treeBackend)
+
+        t = timeIt( lambda : parser.parse(fileName) , 5 )
+
+        tracemalloc.start()
+        RTL = parser.parse(fileName)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        nbNodes = sum( 1 for RT in RTL for n in RT.traverse() )
+        del RTL
+
+        print("  " + treeBackend.ljust(22) , ":", round(t, 3), "s ;", round(size / 2.**20, 1), "MB retained (" + str(round(size / nbNodes)), "bytes per node, events included)")
+
+
+def benchmarkSpeciesTreeIndex(tmpDir):
+    """ compares the lookups of ete3 in a large species tree with those of a SpeciesTreeIndex """
+    import random
+    import ete3
+    from SpeciesTreeIndex import SpeciesTreeIndex
+
+    nbLeaves = 5000
+    nbQueries = 200
+    random.seed(0)
+
+    spTree = ete3.Tree()
+    spTree.populate(nbLeaves)
+    for i, n in enumerate(spTree.traverse()):
+        n.name = "sp" + str(i)
+
+    nodes = list(spTree.traverse())
+    pairs = [ ( random.choice(nodes) , random.choice(nodes) ) for i in range(nbQueries) ]
+
+    tBuild = timeIt( lambda : SpeciesTreeIndex(spTree) )
+    index = SpeciesTreeIndex(spTree)
+
+    print("species tree index :", nbLeaves, "leaves ;", nbQueries, "queries ; index built in", round(tBuild, 3), "s")
+
+    tEte3 = timeIt( lambda : [ spTree.search_nodes(name = a.name)[0].get_sisters() for a, b in pairs ] , 1 )
+    tIndex = timeIt( lambda : [ index.getSister(a.name) for a, b in pairs ] )
+    print("  sister lookup          : ete3 search_nodes", round(tEte3, 3), "s ; SpeciesTreeIndex", round(tIndex, 4), "s")
+
+    tEte3 = timeIt( lambda : [ spTree.get_common_ancestor(a, b) for a, b in pairs ] , 1 )
+    tIndex = timeIt( lambda : [ index.getLCA( ( a.name , b.name ) ) for a, b in pairs ] )
+    print("  LCA                    : ete3 get_common_ancestor", round(tEte3, 3), "s ; SpeciesTreeIndex", round(tIndex, 4), "s")
+
+
+def benchmarkSummaryMatrix(tmpDir):
+    """ times the events summaries of a corpus of 10000 gene families reconciled with a species tree of 1000 species """
+
+    nbSpecies = 1000
+    nbTrees = 10000
+    fileName = os.path.join(tmpDir, "summary.xml")
+    writeRandomFamiliesFile(fileName, nbSpecies, nbTrees)
+
+    RTL = recPhyloXML_parser(treeBackend = "light").parse(fileName)
+    nbEvents = sum( len(n.eventRecs) for RT in RTL for n in RT.traverse() )
+
+    print("summary matrix :", nbTrees, "families ,", nbSpecies, "species ,", nbEvents, "events")
+
+    t = timeIt( lambda : RTL.getEventsSummary() )
+    print("  summary (lists)        :", round(t, 3), "s")
+    t = timeIt( lambda : RTL.getEventsSummary(indexBySpecies = True) )
+    print("  summary by species     :", round(t, 3), "s")
+    t = timeIt( lambda : RTL.getEventsCountMatrix() )
+    print("  count matrix           :", round(t, 3), "s")
+
+
+def benchmarkParallelSummary(tmpDir):
+    """ compares a serial parse and events summary of a corpus with the parallel summary of its indexed file, for increasing numbers of workers """
+
+    nbSpecies = 1000
+    nbTrees = 10000
+    fileName = os.path.join(tmpDir, "parallelSummary.xml")
+    writeRandomFamiliesFile(fileName, nbSpecies, nbTrees)
+
+    parser = recPhyloXML_parser(fields = {"events"}, treeBackend = "light")
+
+    print("parallel summary :", nbTrees, "families ,", nbSpecies, "species ,", os.cpu_count(), "processors")
+
+    tSerial = timeIt( lambda : parser.parse(fileName).getEventsSummary(indexBySpecies = True) , 1 )
+    print("  serial parse + summary :", round(tSerial, 3), "s")
+
+    workers = 1
+    while workers <= max( 2 , os.cpu_count() ):
+        RTL = ReconciledTreeList.open_indexed(fileName, writeIndex = False, parser = parser, maxResident = 0)
+        t = timeIt( lambda : RTL.getEventsSummary(indexBySpecies = True, workers = workers) , 1 )
+        print("  " + str(workers) , "worker(s) :", round(t, 3), "s ( x" + str(round(tSerial / t, 2)) , ")")
+        workers *= 2
+
+
+def benchmarkIncrementalSummary(tmpDir):
+    """ compares the summaries of a list of trees growing by batches, recounted from scratch or kept up to date incrementally """
+
+    nbSpecies = 1000
+    nbTrees = 10000
+    batchSize = 1000
+    fileName = os.path.join(tmpDir, "incrementalSummary.xml")
+    writeRandomFamiliesFile(fileName, nbSpecies, nbTrees)
+
+    RTL = recPhyloXML_parser(treeBackend = "light").parse(fileName)
+
+    print("incremental summary :", nbTrees, "families ,", nbSpecies, "species , a summary every", batchSize, "appended trees")
+
+    def growing(incremental):
+        growingRTL = ReconciledTreeList(RTL.spTree)
+        for i, RT in enumerate(RTL.recTrees):
+            growingRTL.append(RT)
+            if i % batchSize == batchSize - 1:
+                if incremental:
+                    growingRTL.getEventsSummary(indexBySpecies = True)
+                else:
+                    ReconciledTreeList(RTL.spTree, growingRTL.recTrees).getEventsSummary(indexBySpecies = True)
+
+    tScratch = timeIt( lambda : growing(False) , 1 )
+    tIncremental = timeIt( lambda : growing(True) , 1 )
+    print("  from scratch           :", round(tScratch, 3), "s ; incremental", round(tIncremental, 3), "s ( x" + str(round(tScratch / tIncremental, 1)) , ")")
+
+
+def measureSummaryMemory(fileName, streaming):
+    """
+    Computes the events summary of a file, with or without building its trees.
+    Meant to be run in a fresh process, so that the growth of its peak RSS is the memory taken by the computation.
+
+    Takes:
+        - fileName (str) : name of a recPhyloXML file
+        - streaming (bool) : if True, the events are counted with parse_eventsSummary ; otherwise the trees are parsed first
+
+    Returns:
+        (float) : growth of the peak RSS of the process (in MB)
+    """
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    parser = recPhyloXML_parser(fields = {"events"}, treeBackend = "light")
+    if streaming:
+        parser.parse_eventsSummary(fileName)
+    else:
+        parser.parse(fileName).getEventsSummary(indexBySpecies = True)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return (after - before) / 2.**10 ## ru_maxrss is in kB on linux
+
+
+def benchmarkStreamingSummary(tmpDir):
+    """ compares the events summary of parsed trees with the one counted as the file streams by, in time and memory """
+
+    nbSpecies = 1000
+    parser = recPhyloXML_parser(fields = {"events"}, treeBackend = "light")
+
+    for nbTrees in [5000, 20000]:
+        fileName = os.path.join(tmpDir, "streamingSummary.xml")
+        writeRandomFamiliesFile(fileName, nbSpecies, nbTrees)
+
+        print("streaming summary :", nbTrees, "families ,", nbSpecies, "species")
+
+        tTrees = timeIt( lambda : parser.parse(fileName).getEventsSummary(indexBySpecies = True) , 1 )
+        tStreaming = timeIt( lambda : parser.parse_eventsSummary(fileName) , 1 )
+
+        with ProcessPoolExecutor(max_workers = 1) as executor:
+            rssTrees = executor.submit( measureSummaryMemory , fileName , False ).result()
+        with ProcessPoolExecutor(max_workers = 1) as executor:
+            rssStreaming = executor.submit( measureSummaryMemory , fileName , True ).result()
+
+        print("  parsed trees           :", round(tTrees, 3), "s ,", round(rssTrees, 1), "MB")
+        print("  streaming              :", round(tStreaming, 3), "s ,", round(rssStreaming, 1), "MB ( x" + str(round(tTrees / tStreaming, 1)) , "faster )")
+
+
+def measureWritingMemory(fileName, outFileName, streaming):
+    """
+    Parses a file, then writes it back, as a whole or with a RecPhyloXMLWriter.
+    Meant to be run in a fresh process, so that the growth of its peak RSS during the writing is the memory taken by the writing.
+
+    Takes:
+        - fileName (str) : name of a recPhyloXML file
+        - outFileName (str) : name of the file to write
+        - streaming (bool) : if True, the trees are written one at a time with writeRecPhyloXML ; otherwise the lines of the document are built by getRecPhyloXMLLines first
+
+    Returns:
+        (tuple) : (float) growth of the peak RSS of the process during the writing (in MB) , (float) time of the writing (in s)
+    """
+    RTL = recPhyloXML_parser(treeBackend = "light").parse(fileName)
+
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.time()
+    if streaming:
+        RTL.writeRecPhyloXML(outFileName)
+    else:
+        OUT = open(outFileName, "w")
+        for l in RTL.getRecPhyloXMLLines():
+            OUT.write( l + "\n" )
+        OUT.close()
+    t = time.time() - t0
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return ( (after - before) / 2.**10 , t ) ## ru_maxrss is in kB on linux
+
+
+def benchmarkWriter(tmpDir):
+    """ compares the writing of a corpus from the lines of the whole document with the streaming RecPhyloXMLWriter, in time and memory """
+
+    nbSpecies = 1000
+    nbTrees = 10000
+    fileName = os.path.join(tmpDir, "writer.xml")
+    outFileName = os.path.join(tmpDir, "writer.out.xml")
+    writeRandomFamiliesFile(fileName, nbSpecies, nbTrees)
+
+    print("writer :", nbTrees, "families ,", nbSpecies, "species ,", round(os.path.getsize(fileName) / 2.**20, 1), "MB")
+
+    for streaming in [False, True]:
+        with ProcessPoolExecutor(max_workers = 1) as executor:
+            rss , t = executor.submit( measureWritingMemory , fileName , outFileName , streaming ).result()
+        print("  " + ( "RecPhyloXMLWriter      :" if streaming else "getRecPhyloXMLLines    :" ), round(t, 3), "s , peak memory +", round(rss, 1), "MB")
+
+
+def benchmarkSerializer(tmpDir):
+    """ times the recPhyloXML serialization of deep and wide trees of increasing sizes (it is linear in the number of nodes, whatever the depth) """
+
+    fileName = os.path.join(tmpDir, "serializer.xml")
+    parser = recPhyloXML_parser(treeBackend = "light")
+
+    for shape, sizes in [ ( "deep" , [1000, 4000, 16000] ) , ( "wide" , [10, 12, 14] ) ]:
+        for size in sizes:
+            if shape == "deep":
+                writeSyntheticFile(fileName, 1, size)
+            else:
+                writeSyntheticTreesFile(fileName, 1, makeBalancedCladeLines(size))
+
+            RT = parser.parse(fileName)[0]
+            nbNodes = sum( 1 for n in RT.traverse() )
+            t = timeIt( lambda : RT.getTreeRecPhyloXMLLines() )
+            print("serializer :", shape, "tree of", nbNodes, "nodes :", round(t, 3), "s (", round(t / nbNodes * 1e6, 2), "us per node )")
+
+
+def benchmarkCompact(tmpDir):
+    """ compares the size and writing time of indented and compact (indent = None) recPhyloXML output """
+
+    fileName = os.path.join(tmpDir, "compact.xml")
+    outFileName = os.path.join(tmpDir, "compact.out.xml")
+    parser = recPhyloXML_parser(treeBackend = "light")
+
+    for label, write in [ ( "10000 families" , lambda : writeRandomFamiliesFile(fileName, 1000, 10000) ) ,
+                          ( "200 ladders of depth 300" , lambda : writeSyntheticFile(fileName, 200, 300) ) ]:
+        write()
+        RTL = parser.parse(fileName)
+
+        print("compact output :", label)
+        sizes = {}
+        times = {}
+        for indent in ["  ", None]:
+            times[indent] = timeIt( lambda : RTL.writeRecPhyloXML(outFileName, indent = indent) )
+            sizes[indent] = os.path.getsize(outFileName)
+            print("  " + ( "indented               :" if indent else "compact                :" ), round(sizes[indent] / 2.**20, 2), "MB ,", round(times[indent], 3), "s")
+        print("  reduction              : size x" + str(round(sizes["  "] / sizes[None], 2)) , ", time x" + str(round(times["  "] / times[None], 2)))
+
+
+def benchmarkParallelWriter(tmpDir):
+    """ compares the serial writing of a corpus with its parallel ordered serialization, for increasing numbers of workers and in-flight windows """
+
+    nbSpecies = 1000
+    nbTrees = 10000
+    fileName = os.path.join(tmpDir, "parallelWriter.xml")
+    outFileName = os.path.join(tmpDir, "parallelWriter.out.xml")
+    writeRandomFamiliesFile(fileName, nbSpecies, nbTrees)
+
+    RTL = recPhyloXML_parser(treeBackend = "light").parse(fileName)
+
+    print("parallel writer :", nbTrees, "families ,", os.cpu_count(), "processors")
+
+    tSerial = timeIt( lambda : RTL.writeRecPhyloXML(outFileName) , 1 )
+    print("  serial                 :", round(tSerial, 3), "s")
+
+    for workers in [2, 4]:
+        for window in [None, 1]:
+            t = timeIt( lambda : RTL.writeRecPhyloXML(outFileName, workers = workers, window = window) , 1 )
+            print("  " + str(workers) + " workers , window " + ( str(window) + "   " if not window is None else "2/worker" ) + ":", round(t, 3), "s ( x" + str(round(tSerial / t, 2)) , ")")
+
+
+def benchmarkColumnar(tmpDir):
+    """ compares parsing a corpus from its recPhyloXML file with opening it from a forest directory of memory-mapped .npy columns """
+    from ReconciledForest import ReconciledForest
+
+    nbSpecies = 1000
+    nbTrees = 10000
+    fileName = os.path.join(tmpDir, "columnar.xml")
+    forestDir = os.path.join(tmpDir, "columnar.forest")
+    writeRandomFamiliesFile(fileName, nbSpecies, nbTrees)
+
+    parser = recPhyloXML_parser(treeBackend = "light")
+
+    tSave = timeIt( lambda : parser.parse(fileName).writeForest(forestDir) , 1 )
+    print("columnar forest :", nbTrees, "families (" + str(round(os.path.getsize(fileName) / 2.**20, 1)), "MB of xml ,",
+          round( sum( os.path.getsize(os.path.join(forestDir, f)) for f in os.listdir(forestDir) ) / 2.**20 , 1 ), "MB of columns )")
+    print("  conversion (once)      :", round(tSave, 3), "s")
+
+    tParse = timeIt( lambda : parser.parse(fileName) , 1 )
+    tLoad = timeIt( lambda : ReconciledForest.load(forestDir, treeBackend = "light") )
+    print("  open                   : parse", round(tParse, 3), "s ; memory-mapped load", round(tLoad, 4), "s ( x" + str(round(tParse / tLoad, 1)) , ")")
+
+    RTL = parser.parse(fileName)
+    tList = timeIt( lambda : RTL.getEventsSummary(indexBySpecies = True) )
+    tForest = timeIt( lambda : ReconciledForest.load(forestDir, treeBackend = "light").getEventsSummary(indexBySpecies = True) )
+    print("  open + summary         : parse", round(tParse + tList, 3), "s ; memory-mapped load", round(tForest, 3), "s ( x" + str(round((tParse + tList) / tForest, 1)) , ")")
+
+
+def measureEventTableMemory(fileName, outFileName, streaming):
+    """
+    Writes the event table of a file to a .npy file, streamed from the file or from its parsed trees.
+    Meant to be run in a fresh process, so that the growth of its peak RSS is the memory taken by the writing.
+
+    Takes:
+        - fileName (str) : name of a recPhyloXML file
+        - outFileName (str) : name of the .npy file to write
+        - streaming (bool) : if True, the rows are streamed with recPhyloXML_parser.iter_event_rows ; otherwise the trees are parsed first
+
+    Returns:
+        (float) : growth of the peak RSS of the process (in MB)
+    """
+    from EventTableWriter import writeEventRowsNpy
+
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    parser = recPhyloXML_parser(fields = {"topology", "events"}, treeBackend = "light")
+    if streaming:
+        writeEventRowsNpy( parser.iter_event_rows(fileName) , outFileName )
+    else:
+        writeEventRowsNpy( parser.parse(fileName).iter_event_rows() , outFileName )
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return (after - before) / 2.**10 ## ru_maxrss is in kB on linux
+
+
+def benchmarkEventTable(tmpDir):
+    """ times the export of the event table of a file to tsv and npy, and compares the memory taken when it is streamed from the file or from its parsed trees """
+    from EventTableWriter import writeEventRowsTSV, writeEventRowsNpy
+
+    nbSpecies = 1000
+    parser = recPhyloXML_parser(fields = {"topology", "events"}, treeBackend = "light")
+    outFileName = os.path.join(tmpDir, "eventTable.npy")
+
+    for nbTrees in [5000, 20000]:
+        fileName = os.path.join(tmpDir, "eventTable.xml")
+        writeRandomFamiliesFile(fileName, nbSpecies, nbTrees)
+
+        nbRows = sum( 1 for row in parser.iter_event_rows(fileName) )
+        print("event table :", nbTrees, "families ,", nbRows, "events")
+
+        tTSV = timeIt( lambda : writeEventRowsTSV( parser.iter_event_rows(fileName) , os.path.join(tmpDir, "eventTable.tsv") ) , 1 )
+        tNpy = timeIt( lambda : writeEventRowsNpy( parser.iter_event_rows(fileName) , outFileName ) , 1 )
+        print("  streamed to tsv        :", round(tTSV, 3), "s")
+        print("  streamed to npy        :", round(tNpy, 3), "s")
+
+        with ProcessPoolExecutor(max_workers = 1) as executor:
+            rssTrees = executor.submit( measureEventTableMemory , fileName , outFileName , False ).result()
+        with ProcessPoolExecutor(max_workers = 1) as executor:
+            rssStreaming = executor.submit( measureEventTableMemory , fileName , outFileName , True ).result()
+        print("  memory (npy)           : parsed trees", round(rssTrees, 1), "MB ; streamed", round(rssStreaming, 1), "MB")
+
+
+BENCHMARKS = { "deep" : benchmarkDeepClades ,
+               "backends" : benchmarkBackends ,
+               "index" : benchmarkIndex ,
+               "parallel" : benchmarkParallel ,
+               "fields" : benchmarkFields ,
+               "extra" : benchmarkExtraElements ,
+               "symbols" : benchmarkSymbols ,
+               "forest" : benchmarkForest ,
+               "light" : benchmarkLightTrees ,
+               "speciesindex" : benchmarkSpeciesTreeIndex ,
+               "summary" : benchmarkSummaryMatrix ,
+               "parallelsummary" : benchmarkParallelSummary ,
+               "incremental" : benchmarkIncrementalSummary ,
+               "streaming" : benchmarkStreamingSummary ,
+               "writer" : benchmarkWriter ,
+               "serializer" : benchmarkSerializer ,
+               "compact" : benchmarkCompact ,
+               "parallelwriter" : benchmarkParallelWriter ,
+               "columnar" : benchmarkColumnar ,
+               "eventtable" : benchmarkEventTable }
+
+
+if __name__ == "__main__":
+
+    help =  """
+                This script times the reading and writing functions on synthetic recPhyloXML data.
+
+                usage : python benchmarkRecPhyloXML.py [benchmark1 benchmark2 ...]
+
+                            benchmark1 benchmark2 ...   : (optional) names of the benchmarks to run (by default all are run)
+                                                          among : """ + " ".join(sorted(BENCHMARKS.keys())) + """
+
+               """
+
+    names = sys.argv[1:]
+
+    if len(names) == 0:
+        names = sorted(BENCHMARKS.keys())
+
+    for n in names:
+        if not n in BENCHMARKS:
+            print("error: unknown benchmark", n)
+            print(help)
+            exit(1)
+
+    tmpDir = tempfile.mkdtemp()
+
+    for n in names:
+        BENCHMARKS[n](tmpDir)
+
+    shutil.rmtree(tmpDir)
@@ -0,0 +1,190 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        11-Sept-2017
+##  Last modified:  18-Oct-2026
+##
+##
+##  This script is used to extract some trees from a recPhyloXML file
+##  Only the requested trees are parsed, thanks to a byte-offset index of the file (see RecPhyloXMLIndex.py)
+##
+##  requires : ReconciledTreeBase
+##             ReconciledTreeIO
+##             RecPhyloXMLIndex
+##             RecPhyloXMLWriter
+##             CompressedFileIO
+##  (ete3 is not needed : the trees are read with the lightweight tree backend)
+##
+##  developped for python3.0
+##
+#########################################
+
+from ReconciledTreeBase import ReconciledTreeList
+from ReconciledTreeIO import recPhyloXML_parser
+from CompressedFileIO import getCompression
+
+
+import sys
+import os
+
+
+
+if __name__ == "__main__":
+
+    help =  """
+                This script is used to extract one or several trees from a recPhyloXML file (containing different reconciled gene trees).
+                ( NB: positions start at index 0 )
+
+                usage : python extractTreefromRecPhyloXML.py -i inputRecPhyloXML  p1 [p2 p3 ...  -p positionFile -o outputRecPhyloXML --compress.level level --compact -j workers]
+
+                            -i inputRecPhyloXML         : input recPhyloXML file (may be compressed with gzip, bz2 or xz)
+
+                            p1 p2 p3 ...                :  a set of positions in the recPhyloXML object (integers)
+
+                            -o outputRecPhyloXML        : (optional) file to write in (by default stdout will be used)
+                                                          it is compressed if its name ends with .gz, .bz2 or .xz
+                            --compress.level level      : (optional) compression level of the output file (1-9, by default the one of the compression library)
+                            --compact                   : (optional) write the xml without indentation, each tree on a single line
+                            -j workers                  : (optional) number of worker processes serializing the extracted trees (default: 1)
+                            -p positionFile             : (optional) a file containing positions (one per line)
+                            --include.species.tree      : (optional) whether the species tree should be included in the output file
+                            --no.index.file             : (optional) do not write the index of the input file (inputRecPhyloXML.rpxi)
+                                                          NB: when this index exists and is up to date, it is used to avoid scanning the input file
+
+                example : python extractTreefromRecPhyloXML.py -i file.xml 1 4 5
+                          will extract trees at index 1, 4 and 5 in the file file.xml and write them in stdout
+
+               """
+
+
+    nextKEY = None
+    params = {
+                "-i" : None, #: input recPhyloXML file
+                "-o" : None, #: (optional) file to write in (by default stdout will be used)
+                "-p" : None, #: (optional) a file containing positions (one per line)
+                "--include.species.tree" : False, #: (optional) whether the species tree should be included in the output file
+                "--no.index.file" : False, #: (optional) do not write the index of the input file
+                "--compress.level" : None, #: (optional) compression level of the output file
+                "--compact" : False, #: (optional) write the xml without indentation
+                "-j" : 1 #: (optional) number of worker processes serializing the trees
+            }
+
+    flagArgs = ["--include.species.tree", "--no.index.file", "--compact"]
+
+    additionalArguments = []
+
+    for i in range(1,len(sys.argv)):
+
+        if not nextKEY is None:
+            params[nextKEY] = sys.argv[i]
+            print("argument ",nextKEY,":", sys.argv[i], file=sys.stderr)
+            nextKEY = None
+            continue
+
+        if sys.argv[i] in params.keys():
+
+            if sys.argv[i] in flagArgs:
+                params[sys.argv[i]] = True
+                print(sys.argv[i],"flag activated", file=sys.stderr)
+            else:
+                nextKEY = sys.argv[i]
+            continue
+        else:
+            additionalArguments.append(sys.argv[i])
+
+
+    if params["-i"] is None:
+        print("error: input file name not given.")
+        print(help)
+        exit(1)
+
+    elif not os.path.isfile(params["-i"]):
+            print("error: " + params["-i"] + " is not an existing file.")
+            exit(1)
+
+
+    if not params["--compress.level"] is None:
+        try:
+            params["--compress.level"] = int(params["--compress.level"])
+        except:
+            print("error: --compress.level must be an integer between 1 and 9.")
+            exit(1)
+        if not 1 <= params["--compress.level"] <= 9:
+            print("error: --compress.level must be an integer between 1 and 9.")
+            exit(1)
+
+    try:
+        params["-j"] = int(params["-j"])
+        if params["-j"] < 1:
+            raise ValueError()
+    except ValueError:
+        print("error: -j must be a positive integer.")
+        exit(1)
+
+
+    ## getting more files
+
+    if not params["-p"] is None:
+
+        if not os.path.isfile(params["-p"]):
+            print("error: " + params["-p"] + " is not an existing file.")
+            exit(1)
+
+        IN = open(params["-p"], "r")
+        l = IN.readline()
+        while l !="":
+            additionalArguments.append(l.strip())
+            l = IN.readline()
+
+        IN.close()
+
+
+    if len(additionalArguments) == 0:
+        print('no position to extract specified. Please specify at least one.')
+        print(help)
+        exit(1)
+
+    ## loading the data
+
+    parser = recPhyloXML_parser( treeBackend = "light" )
+
+    if getCompression(params["-i"]) is None:
+        RTL = ReconciledTreeList.open_indexed(params["-i"] , writeIndex = not params["--no.index.file"] , parser = parser)
+    else: ## a compressed file cannot be read at random offsets
+        RTL = parser.parse(params["-i"])
+
+    newRTL = ReconciledTreeList()
+
+    if params["--include.species.tree"]:
+        newRTL.setSpTree( RTL.spTree )
+
+
+    for strP in additionalArguments:
+        intP = None
+        try:
+            intP =int(strP)
+
+        except:
+            print("error : position" , strP, "does not convert into an integer.")
+            exit(1)
+
+        if intP >= len(RTL):
+           print("error : position" , strP, "is too big (There are", len(RTL) ,"reconciled trees in the provided input file).")
+           exit(1)
+
+        newRTL.append( RTL[intP] )
+
+
+    ### now ouput
+
+    indent = "  "
+    if params["--compact"]:
+        indent = None
+
+    if params["-o"] is None:
+        newRTL.writeRecPhyloXML( sys.stdout , indent = indent , workers = params["-j"] )
+    else:
+        newRTL.writeRecPhyloXML( params["-o"] , params["--compress.level"] , indent , workers = params["-j"] )
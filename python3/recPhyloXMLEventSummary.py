@@ -0,0 +1,209 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        12-Sept-2017
+##  Last modified:  18-Oct-2026
+##
+##
+##  This script is used to extract a summary of events count per species
+##  from a recPhyloXML file
+##
+##  requires : ReconciledTreeBase
+##             ReconciledTreeIO
+##             CompressedFileIO
+##             ReconciledForest ( for a forest directory as input, requires numpy )
+##  (ete3 is not needed : by default the events are counted as they are read, without building the trees ;
+##   with several workers the trees are read with the lightweight tree backend)
+##
+##  developped for python3.0
+##
+#########################################
+
+from ReconciledTreeBase import ReconciledTreeList
+from ReconciledTreeIO import recPhyloXML_parser
+from CompressedFileIO import openFile, getCompression
+
+
+import sys
+import os
+
+
+
+if __name__ == "__main__":
+
+    help =  """
+                This script is used to extract a summary of events count per species from a recPhyloXML file
+                (or from a forest directory, written by ReconciledTreeList.writeForest).
+
+                usage : python recPhyloXMLEventSummary.py -i inputRecPhyloXML [-o outputFile] [--include.transfer.departure] [-j workers]
+
+                            -i inputRecPhyloXML         : input recPhyloXML file (may be compressed with gzip, bz2 or xz)
+                                                          or forest directory (its columns are memory-mapped and the events counted with numpy)
+
+                            -o outputFile               : (optional) file to write in (by default stdout will be used)
+                                                          it is compressed if its name ends with .gz, .bz2 or .xz
+
+                            --include.transfer.departure: (optional) if true, transfer departure (or branchingOut) events will be counted
+
+                            -j workers                  : (optional) number of worker processes among which the gene families are sharded (default: 1)
+                                                          with an uncompressed input, the workers also parse the gene families
+                                                          with 1 worker, the events are counted as the file streams by, in constant memory
+
+               """
+
+
+    nextKEY = None
+    params = {
+                "-i" : None, #: input recPhyloXML file
+                "-o" : None, #: (optional) file to write in (by default stdout will be used)
+                "--include.transfer.departure" : False, #(optional) if true, transfer departure (or branchingOut) events will be counted
+                "-j" : 1 #(optional) number of worker processes
+            }
+
+    flagArgs = ["--include.transfer.departure"]
+
+
+
+    for i in range(1,len(sys.argv)):
+
+        if not nextKEY is None:
+            params[nextKEY] = sys.argv[i]
+            print("argument ",nextKEY,":", sys.argv[i], file=sys.stderr)
+            nextKEY = None
+            continue
+
+        if sys.argv[i] in params.keys():
+
+            if sys.argv[i] in flagArgs:
+                params[sys.argv[i]] = True
+                print(sys.argv[i],"flag activated", file=sys.stderr)
+            else:
+                nextKEY = sys.argv[i]
+            continue
+
+
+    if params["-i"] is None:
+        print("error: input file name not given.")
+        print(help)
+        exit(1)
+
+    elif not os.path.isfile(params["-i"]) and not os.path.isdir(params["-i"]):
+            print("error: " + params["-i"] + " is not an existing file or directory.")
+            exit(1)
+
+    try:
+        params["-j"] = int(params["-j"])
+        if params["-j"] < 1:
+            raise ValueError()
+    except ValueError:
+        print("error: -j must be a positive integer.")
+        exit(1)
+
+
+    parser = recPhyloXML_parser( fields = {"events"} , treeBackend = "light" ) ## only the events are needed for the summary
+
+    if os.path.isdir(params["-i"]):
+
+        ## the columns of the forest are read from the disk as they are needed
+        from ReconciledForest import ReconciledForest
+
+        try:
+            forest = ReconciledForest.load( params["-i"] , treeBackend = "light" )
+        except Exception as e:
+            print("an error occured while loading the forest" , params["-i"] , ":" , e)
+            exit(1)
+
+        if not forest.hasSpTree():
+            print("The forest in" , params["-i"] , "does not contain a species tree.")
+            exit(1)
+
+        summary = forest.getEventsSummary( includeTransferReception  = True , includeTransferDeparture = params["--include.transfer.departure"]  , indexBySpecies=True )
+
+    elif params["-j"] == 1:
+
+        ## the events are counted straight from the xml, the trees are never built
+
+        try:
+            summary = parser.parse_eventsSummary( params["-i"] , includeTransferReception  = True , includeTransferDeparture = params["--include.transfer.departure"] )
+        except Exception as e:
+            print("an error occured while parsing the file" , params["-i"] , ":" , e)
+            print("(if the file does not contain a species tree, you can use the combineRecPhyloXMLfiles.py script to add one)")
+            exit(1)
+
+    else:
+
+        ## loading the data
+
+        if getCompression(params["-i"]) is None:
+            ## the trees are parsed by the workers, from the byte spans of the file
+            RTL = ReconciledTreeList.open_indexed( params["-i"] , writeIndex = False , parser = parser , maxResident = 0 )
+        else:
+            RTL = parser.parse(params["-i"])
+
+        if RTL is None:
+            print("an error occured while parsing the file" , params["-i"] , ".")
+            exit(1)
+
+
+        if not isinstance(RTL,ReconciledTreeList):
+            print("The file" , params["-i"] , "should contain a recPhylo object, none was detected.")
+            exit(1)
+
+        if not RTL.hasSpTree():
+            print("The recPhylo object in file" , params["-i"] , "does not contain a species tree. Please add one (you can use the combineRecPhyloXMLfiles.py script to do so).")
+            exit(1)
+
+        ## getting the summary
+
+        summary = RTL.getEventsSummary( includeTransferReception  = True , includeTransferDeparture = params["--include.transfer.departure"]  , indexBySpecies=True , workers = params["-j"] )
+
+    ### now ouput
+    if len(summary) == 0:
+        print("no events to report.")
+        exit(0)
+
+    OUT = sys.stdout
+
+    if not params["-o"] is None:
+        OUT = openFile( params["-o"] , "w" )
+
+    ## setting parameters
+
+    events = sorted( next(iter(summary.values())).keys() )
+
+    species = sorted( summary.keys() )
+
+    columnWidths = []
+
+    columnWidths.append( max( [len("species")] + [len(i) for i in species]) + 3 )
+
+    for e in events:
+        columnWidths.append( len(e) + 3 )
+
+    def filledUp(s,l,c = " "):
+        return s  + max(1,(l - len(s))) * c ##at minimum 1 space
+
+    def lineFilledUp(S,L,c=" "):
+        l = ""
+        for i,s in enumerate(S):
+
+            l += filledUp(s,L[i],c)
+        return l
+
+    ## printing first line
+    OUT.write( lineFilledUp( ["species"] + events , columnWidths," ") + "\n" )
+
+    for sp in summary.keys():
+
+        elements = []
+        elements.append(sp)
+        elements += [str( summary[sp][e] ) for e in events]
+
+        line = lineFilledUp(elements , columnWidths , " ")
+
+        OUT.write( line + "\n" )
+
+    OUT.close()
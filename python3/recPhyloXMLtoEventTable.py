@@ -0,0 +1,133 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+
+#########################################
+##  Author:         Wandrille Duchemin
+##  Created:        18-Oct-2026
+##  Last modified:  18-Oct-2026
+##
+##
+##  This script is used to write the events of the reconciled trees of a recPhyloXML file
+##  as a flat table (one row per event, see ReconciledTreeBase.iter_event_rows), in tsv or numpy (.npy) format.
+##  The trees are streamed from the file one at a time : the memory used does not depend on the number of trees.
+##
+##  requires : ReconciledTreeIO
+##             EventTableWriter
+##             numpy ( for the npy format only )
+##  (ete3 is not needed : the trees are read with the lightweight tree backend)
+##
+##  developped for python3.0
+##
+#########################################
+
+from ReconciledTreeIO import recPhyloXML_parser
+from EventTableWriter import writeEventRowsTSV, writeEventRowsNpy
+
+
+import sys
+import os
+
+
+if __name__ == "__main__":
+
+    help =  """
+                This script is used to write the events of the reconciled gene trees of a recPhyloXML file as a table, with one row per event :
+                tree_id  node_name  event_index  event_kind  species  time_slice  lost_species
+                ( NB: tree_id is the position of the tree in the file, starting at 0 ; event_index is the position of the event in the eventsRec of its node )
+
+                usage : python recPhyloXMLtoEventTable.py -i inputRecPhyloXML  [-o outputFile --format format --compress.level level]
+
+                            -i inputRecPhyloXML         : input recPhyloXML file (may be compressed with gzip, bz2 or xz)
+                            -o outputFile               : (optional) file to write in (by default stdout will be used, in tsv format)
+                                                          a tsv file is compressed if its name ends with .gz, .bz2 or .xz
+                            --format format             : (optional) tsv or npy (a structured numpy array, readable with numpy.load)
+                                                          by default npy if the name of the output file ends with .npy, tsv otherwise
+                            --compress.level level      : (optional) compression level of a tsv output file (1-9, by default the one of the compression library)
+
+                NB: the lost species of speciationLoss events can only be given if the file contains a species tree.
+                    In the npy format, missing strings are empty and missing time slices are -1.
+               """
+
+
+    nextKEY = None
+    params = {
+                "-i" : None, #: input recPhyloXML file
+                "-o" : None, #: (optional) file to write in (by default stdout will be used)
+                "--format" : None, #: (optional) tsv or npy
+                "--compress.level" : None #: (optional) compression level of a tsv output file
+            }
+
+    flagArgs = []
+
+    for i in range(1,len(sys.argv)):
+
+        if not nextKEY is None:
+            params[nextKEY] = sys.argv[i]
+            print("argument ",nextKEY,":", sys.argv[i], file=sys.stderr)
+            nextKEY = None
+            continue
+
+        if sys.argv[i] in params.keys():
+
+            if sys.argv[i] in flagArgs:
+                params[sys.argv[i]] = True
+                print(sys.argv[i],"flag activated", file=sys.stderr)
+            else:
+                nextKEY = sys.argv[i]
+            continue
+
+
+    if params["-i"] is None:
+        print("error: input file name not given.")
+        print(help)
+        exit(1)
+
+    elif not os.path.isfile(params["-i"]):
+            print("error: " + params["-i"] + " is not an existing file.")
+            exit(1)
+
+    if params["--format"] is None:
+        params["--format"] = "tsv"
+        if not params["-o"] is None and params["-o"].endswith(".npy"):
+            params["--format"] = "npy"
+
+    if not params["--format"] in ["tsv", "npy"]:
+        print("error: --format must be tsv or npy.")
+        exit(1)
+
+    if params["--format"] == "npy" and params["-o"] is None:
+        print("error: an output file name (-o) is needed for the npy format.")
+        exit(1)
+
+    if not params["--compress.level"] is None:
+        try:
+            params["--compress.level"] = int(params["--compress.level"])
+        except:
+            print("error: --compress.level must be an integer between 1 and 9.")
+            exit(1)
+        if not 1 <= params["--compress.level"] <= 9:
+            print("error: --compress.level must be an integer between 1 and 9.")
+            exit(1)
+
+
+    parser = recPhyloXML_parser( fields = {"topology", "events"} , treeBackend = "light" ) ## the features of the nodes are not needed
+
+    ## the species tree is read first, so that the trees can be streamed afterwards whatever its position in the file
+    spTree = parser.read_species_tree(params["-i"])
+
+    if spTree is None:
+        print("warning: no species tree in" , params["-i"] , ": the lost species of speciationLoss events are left empty.", file=sys.stderr)
+
+    rows = parser.iter_event_rows( params["-i"] , spTree )
+
+    ### now ouput
+
+    if params["--format"] == "npy":
+        nbRows = writeEventRowsNpy( rows , params["-o"] )
+    elif params["-o"] is None:
+        nbRows = writeEventRowsTSV( rows , sys.stdout )
+    else:
+        nbRows = writeEventRowsTSV( rows , params["-o"] , params["--compress.level"] )
+
+    print(nbRows , "events written.", file=sys.stderr)
@@ -0,0 +1,5 @@
+## the modules of python3/ are imported as top-level modules, as the scripts do
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
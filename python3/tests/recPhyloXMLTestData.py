@@ -0,0 +1,53 @@
+## small synthetic recPhyloXML documents shared by the tests
+
+import os
+
+
+TESTFILES = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "testFiles")
+
+
+def ladderClade(depth, species = "A"):
+    """
+    Returns:
+        (str) : xml text of a clade which is a ladder of depth duplications above a leaf
+    """
+    lines = []
+    for i in range(depth):
+        lines.append('<clade><name>n' + str(i) + '</name><eventsRec><duplication speciesLocation="' + species + '"/></eventsRec>')
+    lines.append('<clade><name>leaf</name><eventsRec><leaf speciesLocation="' + species + '"/></eventsRec></clade>')
+    lines.append("</clade>" * depth)
+    return "".join(lines)
+
+
+def recGeneTree(clade):
+    return "<recGeneTree><phylogeny rooted=\"true\">" + clade + "</phylogeny></recGeneTree>"
+
+
+def recPhyloDocument(clades):
+    """
+    Returns:
+        (str) : a recPhylo document (without species tree) with one reconciled tree per clade
+    """
+    return "<recPhylo>" + "".join( recGeneTree(c) for c in clades ) + "</recPhylo>"
+
+
+## species tree R(A,B) ; C is the single child of B
+SPTREE = ( "<spTree><phylogeny><clade><name>R</name>"
+           "<clade><name>A</name></clade>"
+           "<clade><name>B</name><clade><name>C</name></clade></clade>"
+           "</clade></phylogeny></spTree>" )
+
+
+def eventsClade(name, events, children = []):
+    """
+    Takes:
+        - name (str) : name of the node
+        - events (list) : ( event tag , species ) pairs
+        - children (list) : xml text of the children clades
+
+    Returns:
+        (str) : xml text of the clade
+    """
+    return ( "<clade><name>" + name + "</name><eventsRec>"
+             + "".join( '<' + tag + ' speciesLocation="' + sp + '"/>' for tag, sp in events )
+             + "</eventsRec>" + "".join(children) + "</clade>" )
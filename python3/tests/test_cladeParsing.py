@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from ReconciledTreeIO import recPhyloXML_parser
+from recPhyloXMLTestData import TESTFILES, ladderClade, recPhyloDocument
+
+
+TEST_FILE_NAMES = [ "9999.nhx.xml" , "reconciledTreeNOTUNG.0.ntg.xml" , "testAleTree.nwk.xml" , "Prime.unpruned.tree.xml" ]
+
+
+def getXML(RTL):
+    return [ RT.getTreeRecPhyloXMLLines() for RT in RTL ]
+
+
+@pytest.mark.parametrize("name", TEST_FILE_NAMES)
+@pytest.mark.parametrize("backend", [ "stdlib" , "auto" ])
+def test_recursive_and_iterative_parsing_agree(name, backend):
+    fileName = os.path.join(TESTFILES, name)
+
+    recursive = recPhyloXML_parser(recursiveCladeParsing = True, backend = backend).parse(fileName)
+    iterative = recPhyloXML_parser(recursiveCladeParsing = False, backend = backend).parse(fileName)
+
+    assert getXML(iterative) == getXML(recursive)
+    assert [ RT.getTreeNewick() for RT in iterative ] == [ RT.getTreeNewick() for RT in recursive ]
+
+
+def test_deep_trees(tmp_path):
+    fileName = str(tmp_path / "deep.xml")
+    with open(fileName, "w") as OUT:
+        OUT.write( recPhyloDocument([ ladderClade(300) ]) )
+
+    ## within the recursion limit, both engines give the same tree
+    iterative = recPhyloXML_parser(recursiveCladeParsing = False, backend = "stdlib").parse(fileName)
+    recursive = recPhyloXML_parser(recursiveCladeParsing = True, backend = "stdlib").parse(fileName)
+    assert getXML(iterative) == getXML(recursive)
+
+    ## beyond it, the iterative engine still parses the tree
+    with open(fileName, "w") as OUT:
+        OUT.write( recPhyloDocument([ ladderClade(5000) ]) )
+
+    deep = recPhyloXML_parser(recursiveCladeParsing = False, backend = "stdlib").parse(fileName)[0]
+    assert [ n.name for n in deep.traverse() ] == [ "n" + str(i) for i in range(5000) ] + [ "leaf" ]
+
+    ## and the written tree is parsed back to the same tree
+    xml = "\n".join( deep.getTreeRecPhyloXMLLines() )
+    assert recPhyloXML_parser(backend = "stdlib").parse_fragment(xml).getTreeRecPhyloXMLLines() == deep.getTreeRecPhyloXMLLines()
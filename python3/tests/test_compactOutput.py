@@ -0,0 +1,59 @@
+import os
+import sys
+import subprocess
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from ReconciledTreeIO import recPhyloXML_parser
+from recPhyloXMLTestData import TESTFILES
+
+
+PYTHON3_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def canonical(xml):
+    """ C14N form of a document, without the whitespace-only text which indentation adds """
+    return ET.canonicalize(xml, strip_text = True)
+
+
+@pytest.mark.parametrize("name", [ "9999.nhx.xml" , "reconciledTreeNOTUNG.0.ntg.xml" , "geneFamily0.phyloxml" ])
+def test_compact_and_indented_outputs_agree(tmp_path, name):
+    parser = recPhyloXML_parser()
+    RTL = parser.parse( os.path.join(TESTFILES, name) )
+
+    indented = "\n".join( RTL.getRecPhyloXMLLines() )
+    compact = "\n".join( RTL.getRecPhyloXMLLines(indent = None) )
+
+    assert len(compact) < len(indented)
+    assert canonical(compact) == canonical(indented)
+
+    ## the species tree and each reconciled tree are on a single line
+    assert len( compact.split("\n") ) == 2 + len(RTL) + RTL.hasSpTree()
+
+    with open(str(tmp_path / "compact.xml"), "w") as OUT:
+        RTL.writeRecPhyloXML(OUT, indent = None)
+    with open(str(tmp_path / "compact.xml")) as IN:
+        assert IN.read().strip() == compact
+
+    assert "\n".join( parser.parse( str(tmp_path / "compact.xml") ).getRecPhyloXMLLines() ) == indented
+
+
+def test_compact_flag_of_the_converters(tmp_path):
+    arguments = [ "-g" , os.path.join(TESTFILES, "9999.nhx") , "-s" , os.path.join(TESTFILES, "species.testnhx.nwk") , "--include.species" ]
+
+    outputs = {}
+    for flags in [ [] , [ "--compact" ] ]:
+        fileName = str(tmp_path / ( "out" + "".join(flags) + ".xml" ))
+        result = subprocess.run( [ sys.executable , "NHXtoRecPhyloXML.py" ] + arguments + [ "-o" , fileName ] + flags,
+                                 cwd = PYTHON3_DIR , capture_output = True , text = True )
+        assert result.returncode == 0 , result.stderr
+        with open(fileName) as IN:
+            outputs[ len(flags) ] = IN.read()
+
+    indented , compact = outputs[0] , outputs[1]
+    assert len(compact) < len(indented)
+    assert canonical(compact) == canonical(indented)
+
+    parser = recPhyloXML_parser()
+    assert parser.parse( str(tmp_path / "out--compact.xml") ).getRecPhyloXMLLines() == parser.parse( str(tmp_path / "out.xml") ).getRecPhyloXMLLines()
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from CompressedFileIO import openFile, getCompression
+from ReconciledTreeIO import recPhyloXML_parser
+from recPhyloXMLTestData import TESTFILES
+
+
+COMPRESSIONS = [ ( ".gz" , "gzip" ) , ( ".bz2" , "bz2" ) , ( ".xz" , "xz" ) ]
+
+
+@pytest.mark.parametrize("extension, compression", COMPRESSIONS)
+def test_recPhyloXML_round_trip(tmp_path, extension, compression):
+    RTL = recPhyloXML_parser().parse( os.path.join(TESTFILES, "reconciledTreeNOTUNG.0.ntg.xml") )
+
+    fileName = str(tmp_path / ( "trees.xml" + extension ))
+    RTL.writeRecPhyloXML(fileName, compressLevel = 1)
+    assert getCompression(fileName) == compression
+
+    plainName = str(tmp_path / "trees.xml")
+    RTL.writeRecPhyloXML(plainName)
+    with open(plainName) as IN:
+        plain = IN.read()
+    with openFile(fileName) as IN:
+        assert IN.read() == plain
+
+    assert recPhyloXML_parser().parse(fileName).getRecPhyloXMLLines() == RTL.getRecPhyloXMLLines()
+
+
+@pytest.mark.parametrize("extension, compression", COMPRESSIONS)
+def test_invalid_compression_level(tmp_path, extension, compression):
+    for level in [ -1 , 10 ] + ( [ 0 ] if compression == "bz2" else [] ):
+        with pytest.raises(Exception, match = "recPhyloXML exception. Invalid compression level " + str(level) + " for " + compression):
+            openFile( str(tmp_path / ( "out.txt" + extension )) , "w" , level )
+
+    with openFile( str(tmp_path / ( "out.txt" + extension )) , "w" , 9 ) as OUT:
+        OUT.write("ok")
+    with openFile( str(tmp_path / ( "out.txt" + extension )) ) as IN:
+        assert IN.read() == "ok"
@@ -0,0 +1,79 @@
+import numpy as np
+
+from ReconciledTreeBase import EVENT_ROW_FIELDS
+from ReconciledTreeIO import recPhyloXML_parser
+from EventTableWriter import NO_VALUE, writeEventRowsTSV, writeEventRowsNpy
+from CompressedFileIO import openFile
+from recPhyloXMLTestData import SPTREE, eventsClade, recGeneTree
+
+
+## the events of two trees : a speciationLoss in R (B is lost), a loss in A, a transfer from A to C
+CLADES = [ eventsClade("g", [ ( "duplication" , "R" ) ],
+                       [ eventsClade("a", [ ( "SL" , "R" ) , ( "leaf" , "A" ) ]) ,
+                         eventsClade("b", [ ( "loss" , "A" ) ]) ]) ,
+           eventsClade("h", [ ( "branchingOut" , "A" ) ],
+                       [ eventsClade("c", [ ( "transferBack" , "C" ) , ( "leaf" , "C" ) ]) ,
+                         eventsClade("d", [ ( "leaf" , "A" ) ]) ]) ]
+
+EXPECTED_ROWS = [ ( 0 , "g" , 0 , "duplication" , "R" , None , None ) ,
+                  ( 0 , "a" , 0 , "speciationLoss" , "R" , None , "B" ) ,
+                  ( 0 , "a" , 1 , "leaf" , "A" , None , None ) ,
+                  ( 0 , "b" , 0 , "loss" , "A" , None , "A" ) ,
+                  ( 1 , "h" , 0 , "branchingOut" , "A" , None , None ) ,
+                  ( 1 , "c" , 0 , "transferBack" , "C" , None , None ) ,
+                  ( 1 , "c" , 1 , "leaf" , "C" , None , None ) ,
+                  ( 1 , "d" , 0 , "leaf" , "A" , None , None ) ]
+
+
+def writeDocument(fileName, withSpTree = True):
+    with open(fileName, "w") as OUT:
+        OUT.write( "<recPhylo>" + ( SPTREE if withSpTree else "" ) + "".join( recGeneTree(c) for c in CLADES ) + "</recPhylo>" )
+
+
+def test_event_rows(tmp_path):
+    fileName = str(tmp_path / "events.xml")
+    writeDocument(fileName)
+
+    parser = recPhyloXML_parser(treeBackend = "light")
+    assert list( parser.iter_event_rows(fileName) ) == EXPECTED_ROWS
+    assert list( parser.parse(fileName).iter_event_rows() ) == EXPECTED_ROWS
+
+    ## without species tree, the lost species of speciationLoss events is unknown
+    writeDocument(fileName, withSpTree = False)
+    rows = list( parser.iter_event_rows(fileName) )
+    assert rows[1][-1] is None
+    assert rows[:1] + rows[2:] == EXPECTED_ROWS[:1] + EXPECTED_ROWS[2:]
+
+
+def test_tsv(tmp_path):
+    for name in [ "events.tsv" , "events.tsv.gz" ]:
+        fileName = str(tmp_path / name)
+        assert writeEventRowsTSV( iter(EXPECTED_ROWS) , fileName ) == len(EXPECTED_ROWS)
+
+        with openFile(fileName) as IN:
+            lines = IN.read().split("\n")
+
+        assert lines[0] == "\t".join(EVENT_ROW_FIELDS)
+        assert lines[1] == "0\tg\t0\tduplication\tR\t\t"
+        assert lines[2] == "0\ta\t0\tspeciationLoss\tR\t\tB"
+        assert len(lines) == len(EXPECTED_ROWS) + 2 and lines[-1] == ""
+
+
+def test_npy(tmp_path):
+    fileName = str(tmp_path / "events.npy")
+
+    ## small chunks : the string widths grow from one chunk to the next
+    rows = EXPECTED_ROWS + [ ( 2 , "aVeryLongNodeName" , 0 , "leaf" , "A" , 12 , None ) ]
+    assert writeEventRowsNpy( iter(rows) , fileName , chunkSize = 3 ) == len(rows)
+
+    array = np.load(fileName)
+    assert array.dtype.names == EVENT_ROW_FIELDS
+    assert len(array) == len(rows)
+
+    for row, expected in zip(array.tolist(), rows):
+        expected = tuple( ( NO_VALUE if f == "time_slice" else "" ) if v is None else v for f, v in zip(EVENT_ROW_FIELDS, expected) )
+        assert row == expected
+
+    ## no rows
+    assert writeEventRowsNpy( iter([]) , fileName ) == 0
+    assert len( np.load(fileName) ) == 0
@@ -0,0 +1,247 @@
+import os
+import gzip
+
+import pytest
+
+from ReconciledTreeIO import recPhyloXML_parser
+from ReconciledForest import ReconciledForest
+from recPhyloXMLTestData import TESTFILES, SPTREE, eventsClade, recGeneTree
+
+
+def writeDocument(fileName, clades):
+    with open(fileName, "w") as OUT:
+        OUT.write( "<recPhylo>" + SPTREE + "".join( recGeneTree(c) for c in clades ) + "</recPhylo>" )
+
+
+def getAllSummaries(fileName):
+    """ computes the events summary of a file by each path : the list, its count matrix, the streaming counter, the workers of map_parallel, the forest, the event rows """
+    parser = recPhyloXML_parser(treeBackend = "light")
+    RTL = parser.parse(fileName)
+    forest = ReconciledForest.fromReconciledTreeList(RTL)
+    return [ lambda : RTL.getEventsSummary() ,
+             lambda : RTL.getEventsSummary(indexBySpecies = True) ,
+             lambda : parser.parse_eventsSummary(fileName) ,
+             lambda : parser.parse_eventsSummary(fileName , workers = 2) ,
+             lambda : forest.getEventsSummary() ,
+             lambda : forest.getEventsSummary(indexBySpecies = True) ,
+             lambda : list( RTL.iter_event_rows() ) ]
+
+
+## duplication in R, speciationLoss in R (B is lost), loss in A, transfer from A to C ; B is the species of no event
+EVENTS_CLADES = [ eventsClade("g", [ ( "duplication" , "R" ) ],
+                              [ eventsClade("g1", [ ( "speciation" , "R" ) ],
+                                            [ eventsClade("a", [ ( "SL" , "R" ) , ( "leaf" , "A" ) ]) ,
+                                              eventsClade("b", [ ( "loss" , "A" ) ]) ]) ,
+                                eventsClade("g2", [ ( "branchingOut" , "A" ) ],
+                                            [ eventsClade("c", [ ( "transferBack" , "C" ) , ( "leaf" , "C" ) ]) ,
+                                              eventsClade("d", [ ( "leaf" , "A" ) ]) ]) ]) ,
+                  eventsClade("h", [ ( "leaf" , "A" ) ]) ]
+
+EXPECTED_SUMMARY = { "duplication" : [ "R" ] , "loss" : [ "B" , "A" ] , "transferReception" : [ "C" ] }
+
+
+def test_events_summaries_agree(tmp_path):
+    fileName = str(tmp_path / "events.xml")
+    writeDocument(fileName, EVENTS_CLADES)
+
+    listSummary , listCounts , streamCounts , parallelCounts , forestSummary , forestCounts , rows = [ summary() for summary in getAllSummaries(fileName) ]
+
+    assert listSummary == EXPECTED_SUMMARY
+    assert forestSummary == EXPECTED_SUMMARY
+
+    expectedCounts = { sp : { e : species.count(sp) for e, species in EXPECTED_SUMMARY.items() } for sp in [ "R" , "A" , "B" , "C" ] }
+    assert listCounts == expectedCounts
+    assert streamCounts == expectedCounts
+    assert parallelCounts == expectedCounts
+    assert forestCounts == expectedCounts
+
+    assert [ row[-1] for row in rows if not row[-1] is None ] == EXPECTED_SUMMARY["loss"]
+
+
+def test_forest_summary_leaves_species_ids_unchanged(tmp_path):
+    fileName = str(tmp_path / "events.xml")
+    writeDocument(fileName, EVENTS_CLADES)
+
+    forest = ReconciledForest.fromReconciledTreeList( recPhyloXML_parser(treeBackend = "light").parse(fileName) )
+    speciesIds = list(forest.speciesIds)
+    assert not "B" in speciesIds
+
+    forest.save( str(tmp_path / "before") )
+
+    assert forest.getEventsSummary() == EXPECTED_SUMMARY
+    speciesIdsMatrix , eventTypes , matrix = forest.getEventsCountMatrix(includeTransferDeparture = True)
+    assert speciesIdsMatrix == [ "R" , "A" , "B" , "C" ]
+    assert matrix[:, eventTypes.index("transferDeparture")].tolist() == [ 0 , 1 , 0 , 0 ]
+    assert forest.speciesIds == speciesIds
+
+    forest.save( str(tmp_path / "after") )
+    for name in os.listdir( str(tmp_path / "before") ):
+        with open( str(tmp_path / "before" / name) , "rb" ) as before , open( str(tmp_path / "after" / name) , "rb" ) as after:
+            assert before.read() == after.read() , name
+
+
+def test_speciationLoss_without_sister_raises_on_every_path(tmp_path):
+    fileName = str(tmp_path / "noSister.xml")
+    ## the speciationLoss is followed by an event in the root : its lost species would be the sister of the root
+    ## (NB: the obsolete speciationLoss tag is read as a branchingOutLoss ; the short code SL gives a speciationLoss)
+    writeDocument(fileName, [ eventsClade("g", [ ( "SL" , "R" ) , ( "duplication" , "R" ) ],
+                                          [ eventsClade("a1", [ ( "leaf" , "A" ) ]) , eventsClade("a2", [ ( "leaf" , "A" ) ]) ]) ])
+
+    for summary in getAllSummaries(fileName):
+        with pytest.raises(Exception, match = "recPhyloXML exception. Species R has no sister in the species tree."):
+            summary()
+
+
+def test_count_matrix_agrees_with_the_summary(tmp_path):
+    fileName = str(tmp_path / "events.xml")
+    writeDocument(fileName, EVENTS_CLADES)
+
+    RTL = recPhyloXML_parser(treeBackend = "light").parse(fileName)
+
+    speciesIds , eventTypes , matrix = RTL.getEventsCountMatrix(includeTransferDeparture = True)
+    assert speciesIds == [ "R" , "A" , "B" , "C" ] ## pre-order of the species tree
+    assert eventTypes == [ "duplication" , "loss" , "transferReception" , "transferDeparture" ]
+
+    summary = RTL.getEventsSummary(includeTransferDeparture = True)
+    assert matrix == [ [ summary[e].count(sp) for e in eventTypes ] for sp in speciesIds ]
+
+    assert RTL.getEventsCountMatrix(includeTransferDeparture = True, workers = 2) == ( speciesIds , eventTypes , matrix )
+    assert RTL.getEventsSummary(includeTransferDeparture = True, workers = 2) == summary
+
+    ## the cached counts follow the appended trees
+    RTL.append( RTL[0] )
+    speciesIds , eventTypes , matrix2 = RTL.getEventsCountMatrix(includeTransferDeparture = True)
+    summary = RTL.getEventsSummary(includeTransferDeparture = True)
+    assert matrix2 == [ [ summary[e].count(sp) for e in eventTypes ] for sp in speciesIds ]
+    assert matrix2 != matrix
+
+
+def test_parallel_summary_shares_the_trees(tmp_path, monkeypatch):
+    import multiprocessing
+    from ReconciledTreeBase import ReconciledTreeList
+
+    fileName = str(tmp_path / "events.xml")
+    writeDocument(fileName, EVENTS_CLADES * 50)
+
+    RTL = recPhyloXML_parser(treeBackend = "light").parse(fileName)
+    serial = RTL.getEventsCountMatrix(includeTransferDeparture = True)
+    summary = RTL.getEventsSummary(includeTransferDeparture = True)
+
+    def noShards(self, shardSize):
+        raise AssertionError("the trees should not be flattened")
+
+    ## forked workers inherit the trees : they only receive positions
+    monkeypatch.setattr(ReconciledTreeList, "getTreeShards", noShards)
+    if "fork" in multiprocessing.get_all_start_methods():
+        assert RTL.getEventsCountMatrix(includeTransferDeparture = True, workers = 2) == serial
+        assert RTL.getEventsSummary(includeTransferDeparture = True, workers = 2) == summary
+
+    ## without fork, the summary is done serially
+    monkeypatch.setattr(multiprocessing, "get_all_start_methods", lambda : [ "spawn" ])
+    monkeypatch.setattr(ReconciledTreeList, "mapEventsSummaryShards", noShards)
+    assert RTL.getEventsCountMatrix(includeTransferDeparture = True, workers = 2) == serial
+    assert RTL.getEventsSummary(includeTransferDeparture = True, workers = 2) == summary
+
+
+def test_summary_of_a_deep_tree(tmp_path):
+    ## 3000 nested duplications in A : deeper than the recursion limit
+    clade = eventsClade("leaf", [ ( "leaf" , "A" ) ])
+    for i in range(3000):
+        clade = eventsClade("n" + str(i), [ ( "duplication" , "A" ) ], [ clade ])
+
+    fileName = str(tmp_path / "deep.xml")
+    writeDocument(fileName, [ clade ])
+
+    expected = { "duplication" : [ "A" ] * 3000 , "loss" : [] , "transferReception" : [] }
+    RTL = recPhyloXML_parser(treeBackend = "light", backend = "stdlib").parse(fileName)
+    assert RTL[0].getEventsSummary(RTL.spTree) == expected
+    assert RTL.getEventsSummary() == expected
+
+
+@pytest.mark.parametrize("name", [ "9999.nhx.xml" , "reconciledTreeNOTUNG.0.ntg.xml" , "NOTUNGtest_gTree.txt.reconciled.xml" ])
+@pytest.mark.parametrize("backend", [ "stdlib" , "auto" ])
+def test_streaming_summary_of_the_test_files(tmp_path, name, backend):
+    fileName = os.path.join(TESTFILES, name)
+
+    parser = recPhyloXML_parser(backend = backend, treeBackend = "light")
+    expected = parser.parse(fileName).getEventsSummary(indexBySpecies = True, includeTransferDeparture = True)
+    assert parser.parse_eventsSummary(fileName, includeTransferDeparture = True) == expected
+
+    ## from a compressed file, and from a handle
+    with open(fileName, "rb") as IN, gzip.open(str(tmp_path / ( name + ".gz" )), "wb") as OUT:
+        OUT.write(IN.read())
+    assert parser.parse_eventsSummary(str(tmp_path / ( name + ".gz" )), includeTransferDeparture = True) == expected
+    with open(fileName, "rb") as IN:
+        assert parser.parse_eventsSummary(IN, includeTransferDeparture = True) == expected
+
+
+def test_streaming_summary_without_species_tree(tmp_path):
+    fileName = str(tmp_path / "noSpTree.xml")
+    with open(fileName, "w") as OUT:
+        OUT.write( "<recPhylo>" + "".join( recGeneTree(c) for c in EVENTS_CLADES ) + "</recPhylo>" )
+
+    with pytest.raises(Exception, match = "no species tree"):
+        recPhyloXML_parser().parse_eventsSummary(fileName)
+
+    RTL = recPhyloXML_parser(treeBackend = "light").parse(fileName)
+    for summary in [ RTL.getEventsSummary , RTL.getEventsCountMatrix ]:
+        with pytest.raises(Exception, match = "recPhyloXML exception. Can't get an events summary when no species tree has been assigned."):
+            summary()
+
+
+def test_events_count_cache(tmp_path, monkeypatch):
+    from ReconciledTreeBase import ReconciledTreeList, EventsCountCache
+    from RecEvent import RecEvent
+
+    fileName = str(tmp_path / "events.xml")
+    writeDocument(fileName, EVENTS_CLADES)
+
+    parser = recPhyloXML_parser(treeBackend = "light")
+    RTL = parser.parse(fileName)
+
+    def freshMatrix():
+        """ counts all the trees of RTL again, in a list without cached counts """
+        fresh = ReconciledTreeList(RTL.spTree)
+        for RT in RTL:
+            fresh.append(RT)
+        return fresh.getEventsCountMatrix(includeTransferDeparture = True)
+
+    counted = []
+    countTree = EventsCountCache.countTree
+    def countingTree(self, RT):
+        counted.append(RT)
+        return countTree(self, RT)
+    monkeypatch.setattr(EventsCountCache, "countTree", countingTree)
+
+    RTL.getEventsCountMatrix(includeTransferDeparture = True)
+    assert counted == list(RTL)
+
+    ## an appended tree is folded in the counts without recounting the others
+    del counted[:]
+    RTL.append( parser.parse(fileName)[0] )
+    matrix = RTL.getEventsCountMatrix(includeTransferDeparture = True)
+    assert counted == [ RTL[-1] ]
+    assert matrix == freshMatrix()
+
+    ## the events of some trees are modified : only these trees are recounted
+    RTL[1].addEvent( RecEvent("D", "B") )
+    RTL[0].popEvent(0)
+    del counted[:]
+    RTL.refreshEventsSummary([ 0 , 1 ])
+    assert counted == [ RTL[0] , RTL[1] ]
+
+    del counted[:]
+    speciesIds , eventTypes , matrix = RTL.getEventsCountMatrix(includeTransferDeparture = True)
+    assert counted == []
+    assert ( speciesIds , eventTypes , matrix ) == freshMatrix()
+    counts = RTL.getEventsSummary(indexBySpecies = True)
+    assert counts["B"]["duplication"] == 1
+    assert counts["R"]["duplication"] == 1 ## the duplication of the appended copy of the first tree
+
+    ## a new species tree drops the counts
+    RTL.setSpTree( parser.parse(fileName).spTree )
+    assert RTL.eventsCountCaches == {}
+    del counted[:]
+    matrix = RTL.getEventsCountMatrix(includeTransferDeparture = True)
+    assert counted == list(RTL)
+    assert matrix == freshMatrix()
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from ReconciledTreeIO import recPhyloXML_parser, LXML_ET
+from recPhyloXMLTestData import TESTFILES
+
+
+GENE_FAMILY = os.path.join(TESTFILES, "geneFamily0.phyloxml")
+
+PHYLOGENY_ELEMENT = '<description>gene family 0</description>'
+LEAF_ELEMENTS = [ '<taxonomy><code>SP{0}</code></taxonomy>' , '<sequence type="dna"><mol_seq>ACGT</mol_seq></sequence>' ]
+
+
+def withExtraElements(lines):
+    """ adds elements which are not part of the recPhyloXML format to the phylogeny and to each leaf of the tree, as the writer places them """
+    extended = []
+    inLeaf = False
+    nbLeaves = 0
+    for l in lines:
+        extended.append(l)
+        indent = l[ : len(l) - len(l.lstrip()) ]
+        if l.strip() == '<phylogeny rooted="true">':
+            extended.append( indent + "  " + PHYLOGENY_ELEMENT )
+        elif l.strip().startswith("<leaf"):
+            inLeaf = True
+        elif l.strip() == "</eventsRec>" and inLeaf:
+            extended += [ indent + e.format(nbLeaves) for e in LEAF_ELEMENTS ]
+            inLeaf = False
+            nbLeaves += 1
+    return extended
+
+
+def iterFeatureValues(RTL):
+    """ the features of the nodes : a set of names with ete3, a dict with the light backend """
+    for RT in RTL:
+        for node in RT.traverse():
+            for f in node.features:
+                yield getattr(node, f)
+
+
+@pytest.fixture
+def extendedFile(tmp_path):
+    with open(GENE_FAMILY) as IN:
+        lines = IN.read().split("\n")
+    fileName = str(tmp_path / "extended.phyloxml")
+    with open(fileName, "w") as OUT:
+        OUT.write( "\n".join( withExtraElements(lines) ) )
+    return fileName
+
+
+@pytest.mark.parametrize("treeBackend", [ "ete3" , "light" ])
+@pytest.mark.parametrize("backend", [ "stdlib" , pytest.param("lxml", marks = pytest.mark.skipif(LXML_ET is None, reason = "lxml is not installed")) ])
+def test_extra_elements_policies(extendedFile, backend, treeBackend):
+    with open(GENE_FAMILY) as IN:
+        original = IN.read().strip()
+    with open(extendedFile) as IN:
+        extended = IN.read().strip()
+
+    ## the file of the tests is written back as is
+    assert "\n".join( recPhyloXML_parser(backend = backend, treeBackend = treeBackend).parse(GENE_FAMILY).getRecPhyloXMLLines() ) == original
+
+    ## "text" : the extra elements are written back verbatim, at their place
+    RTL = recPhyloXML_parser(backend = backend, treeBackend = treeBackend, extraElements = "text").parse(extendedFile)
+    assert "\n".join( RTL.getRecPhyloXMLLines() ) == extended
+    assert RTL[0].description == PHYLOGENY_ELEMENT
+    assert [ node.taxonomy for node in RTL[0].traverse("preorder") if hasattr(node, "taxonomy") ] == [ LEAF_ELEMENTS[0].format(i) for i in range(39) ]
+
+    ## "drop" : nothing of the extra elements is kept
+    RTL = recPhyloXML_parser(backend = backend, treeBackend = treeBackend, extraElements = "drop").parse(extendedFile)
+    assert "\n".join( RTL.getRecPhyloXMLLines() ) == original
+    assert not any( hasattr(value, "tag") for value in iterFeatureValues(RTL) )
+
+    ## "element" : the Element objects are kept
+    RTL = recPhyloXML_parser(backend = backend, treeBackend = treeBackend, extraElements = "element").parse(extendedFile)
+    assert RTL[0].description.tag == "description"
+    assert sum( hasattr(value, "tag") for value in iterFeatureValues(RTL) ) == 1 + 2 * 39
@@ -0,0 +1,88 @@
+import os
+import gc
+import weakref
+
+from ReconciledTreeBase import ReconciledTreeList
+from ReconciledTreeIO import recPhyloXML_parser
+from RecPhyloXMLIndex import LazyReconciledTreeList, LazyTreeView, getRecPhyloXMLIndex
+from recPhyloXMLTestData import TESTFILES, ladderClade, recGeneTree
+
+
+SPTREE = "<spTree><phylogeny><clade><name>R</name><clade><name>A</name></clade><clade><name>B</name></clade></clade></phylogeny></spTree>"
+
+
+def writeFamiliesFile(fileName, nbTrees):
+    """ writes a file whose trees i have i duplications in species A """
+    with open(fileName, "w") as OUT:
+        OUT.write("<recPhylo>" + SPTREE)
+        for i in range(nbTrees):
+            OUT.write( recGeneTree( ladderClade(i) ) )
+        OUT.write("</recPhylo>")
+
+
+def openLazy(fileName, maxResident, treeBackend = "light"):
+    index = getRecPhyloXMLIndex(fileName, writeIndex = False)
+    return LazyReconciledTreeList(index, recPhyloXML_parser(treeBackend = treeBackend), maxResident = maxResident)
+
+
+class AliveTreesWatcher:
+    """ records the largest number of trees parsed by a LazyReconciledTreeList which are alive at the same time """
+
+    def __init__(self, RTL):
+        self.alive = weakref.WeakSet()
+        self.maxAlive = 0
+        parseSpan = RTL.parseSpan
+        def watchedParseSpan(span):
+            gc.collect()
+            RT = parseSpan(span)
+            self.alive.add(RT)
+            self.maxAlive = max( self.maxAlive , len(self.alive) )
+            return RT
+        RTL.parseSpan = watchedParseSpan
+
+
+def test_lru_evicts_at_maxResident(tmp_path):
+    fileName = str(tmp_path / "families.xml")
+    writeFamiliesFile(fileName, 10)
+
+    RTL = openLazy(fileName, 3)
+    for i in range(10):
+        RTL[i]
+        assert len(RTL.resident) == min( i + 1 , 3 )
+    assert list(RTL.resident.keys()) == [ 7 , 8 , 9 ]
+
+    RTL[7] ## a hit moves the tree to the end, so the next eviction is the one of tree 8
+    RTL[0]
+    assert list(RTL.resident.keys()) == [ 9 , 7 , 0 ]
+
+    assert len( openLazy(fileName, 0)[4].get_leaves() ) == 1
+    assert len( openLazy(fileName, 0).resident ) == 0
+
+
+def test_summaries_respect_maxResident(tmp_path):
+    fileName = str(tmp_path / "families.xml")
+    writeFamiliesFile(fileName, 20)
+
+    expected = recPhyloXML_parser(treeBackend = "light").parse(fileName)
+
+    RTL = openLazy(fileName, 2, "ete3") ## ete3 nodes can be weakly referenced
+    watcher = AliveTreesWatcher(RTL)
+
+    assert RTL.getEventsSummary() == expected.getEventsSummary()
+    assert RTL.getEventsSummary(indexBySpecies = True) == expected.getEventsSummary(indexBySpecies = True)
+    assert sum( 1 for RT in RTL.recTrees ) == 20
+    assert watcher.maxAlive <= 4 ## the resident trees, the one being counted and the one being parsed
+
+    assert isinstance(RTL.recTrees, LazyTreeView)
+    assert len(RTL.recTrees) == 20
+    assert [ len(RT.get_leaves()) for RT in RTL.recTrees[3:6] ] == [ 1 , 1 , 1 ]
+
+
+def test_lazy_trees_equal_parsed_trees():
+    fileName = os.path.join(TESTFILES, "9999.nhx.xml")
+    index = getRecPhyloXMLIndex(fileName, writeIndex = False)
+    RTL = LazyReconciledTreeList(index, recPhyloXML_parser())
+    expected = recPhyloXML_parser().parse(fileName)
+
+    assert len(RTL) == len(expected)
+    assert RTL.getRecPhyloXMLLines() == expected.getRecPhyloXMLLines()
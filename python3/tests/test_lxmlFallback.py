@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+from ReconciledTreeIO import recPhyloXML_parser, LXML_ET
+from recPhyloXMLTestData import ladderClade, recPhyloDocument
+
+
+pytestmark = pytest.mark.skipif(LXML_ET is None, reason = "lxml is not installed")
+
+## deeper than what libxml2 accepts, between two shallow trees
+DEEP_DOCUMENT = recPhyloDocument([ ladderClade(2) , ladderClade(5000) , ladderClade(3) ]).encode()
+
+
+class UnseekableStream(io.RawIOBase):
+    """ a read-only stream which can not be rewound, as a pipe """
+
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self.data.readinto(b)
+
+
+def getXML(trees):
+    return [ "\n".join( RT.getTreeRecPhyloXMLLines() ) for RT in trees ]
+
+
+def test_fallback_gives_the_stdlib_trees(tmp_path):
+    fileName = str(tmp_path / "deep.xml")
+    with open(fileName, "wb") as OUT:
+        OUT.write(DEEP_DOCUMENT)
+
+    expected = getXML( recPhyloXML_parser(backend = "stdlib").iterparse(fileName) )
+
+    assert len(expected) == 3
+    assert getXML( recPhyloXML_parser().iterparse(fileName) ) == expected
+    assert getXML( recPhyloXML_parser().iterparse( io.BytesIO(DEEP_DOCUMENT) ) ) == expected
+    assert getXML( recPhyloXML_parser().parse(fileName) ) == expected
+
+
+def test_fallback_does_not_rebuild_the_yielded_trees():
+    parser = recPhyloXML_parser()
+
+    built = []
+    parse_recGeneTree = parser.parse_recGeneTree
+    def countingParse(element, obsoleteTagsBehaviour = 1):
+        built.append(element)
+        return parse_recGeneTree(element, obsoleteTagsBehaviour)
+    parser.parse_recGeneTree = countingParse
+
+    trees = list( parser.iterparse( io.BytesIO(DEEP_DOCUMENT) ) )
+
+    assert len(trees) == 3
+    assert len(built) == 3 ## the first tree, yielded by lxml, is not built again by the stdlib
+
+
+def test_unseekable_stream_raises_a_clear_exception():
+    with pytest.raises(Exception, match = "recPhyloXML exception.*can not be read again"):
+        list( recPhyloXML_parser().iterparse( UnseekableStream(DEEP_DOCUMENT) ) )
+
+    with pytest.raises(Exception, match = "recPhyloXML exception.*can not be read again"):
+        recPhyloXML_parser().parse( UnseekableStream(DEEP_DOCUMENT) )
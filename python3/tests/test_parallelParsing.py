@@ -0,0 +1,49 @@
+import os
+import gzip
+
+from ReconciledTreeIO import recPhyloXML_parser
+from recPhyloXMLTestData import TESTFILES, ladderClade, recPhyloDocument
+
+
+def writeLadders(fileName, depths):
+    with open(fileName, "w") as OUT:
+        OUT.write( recPhyloDocument([ ladderClade(d) for d in depths ]) )
+
+
+def nbNodes(trees):
+    return [ len(list(RT.traverse())) for RT in trees ]
+
+
+def test_parse_parallel_gives_the_trees_of_parse(tmp_path):
+    fileName = str(tmp_path / "ladders.xml")
+    writeLadders(fileName, range(0, 60, 3))
+
+    parser = recPhyloXML_parser(treeBackend = "light")
+    expected = parser.parse(fileName).getRecPhyloXMLLines()
+
+    for workers in [ 1 , 2 ]:
+        assert parser.parse_parallel(fileName, workers = workers, chunkSize = 500).getRecPhyloXMLLines() == expected
+
+
+def test_map_parallel_sends_back_the_results(tmp_path):
+    fileName = str(tmp_path / "ladders.xml")
+    depths = list(range(0, 60, 3))
+    writeLadders(fileName, depths)
+
+    parser = recPhyloXML_parser(treeBackend = "light")
+
+    for workers in [ 1 , 2 ]:
+        results = list( parser.map_parallel(fileName, nbNodes, workers = workers, chunkSize = 500) )
+        assert len(results) > 1 ## several chunks
+        assert sum(results, []) == [ d + 1 for d in depths ] ## in the order of the file
+
+    ## a compressed file is read sequentially
+    with open(fileName, "rb") as IN, gzip.open(fileName + ".gz", "wb") as OUT:
+        OUT.write(IN.read())
+    assert sum( parser.map_parallel(fileName + ".gz", nbNodes, workers = 2), [] ) == [ d + 1 for d in depths ]
+
+
+def test_parallel_events_summary_of_a_test_file():
+    fileName = os.path.join(TESTFILES, "9999.nhx.xml")
+    parser = recPhyloXML_parser(fields = {"events"}, treeBackend = "light")
+    assert parser.parse_eventsSummary(fileName, workers = 2) == parser.parse_eventsSummary(fileName)
@@ -0,0 +1,58 @@
+import os
+import gzip
+import bz2
+
+import pytest
+
+from ReconciledTreeIO import recPhyloXML_parser, flattenTree
+from recPhyloXMLTestData import TESTFILES, SPTREE, recGeneTree, ladderClade, recPhyloDocument
+
+
+def multiTreeDocument(spTreeFirst):
+    """ a recPhylo document with 50 reconciled trees, with the species tree before or after them """
+    trees = "".join( recGeneTree(ladderClade(i % 7, "C")) for i in range(50) )
+    if spTreeFirst:
+        return "<recPhylo>" + SPTREE + trees + "</recPhylo>"
+    return "<recPhylo>" + trees + SPTREE + "</recPhylo>"
+
+
+@pytest.mark.parametrize("treeBackend", [ "ete3" , "light" ])
+@pytest.mark.parametrize("backend", [ "stdlib" , "auto" ])
+def test_read_species_tree(tmp_path, backend, treeBackend):
+    parser = recPhyloXML_parser(backend = backend, treeBackend = treeBackend)
+
+    fileNames = [ os.path.join(TESTFILES, "9999.nhx.xml") ]
+
+    for spTreeFirst in [ True , False ]:
+        fileName = str(tmp_path / ( "multi." + str(spTreeFirst) + ".xml" ))
+        with open(fileName, "w") as OUT:
+            OUT.write( multiTreeDocument(spTreeFirst) )
+        fileNames.append(fileName)
+
+    for fileName in list(fileNames):
+        with open(fileName, "rb") as IN:
+            data = IN.read()
+        for extension , compress in [ ( ".gz" , gzip.compress ) , ( ".bz2" , bz2.compress ) ]:
+            with open(str(tmp_path / ( os.path.basename(fileName) + extension )), "wb") as OUT:
+                OUT.write( compress(data) )
+            fileNames.append( str(tmp_path / ( os.path.basename(fileName) + extension )) )
+
+    for fileName in fileNames:
+        expected = flattenTree( parser.parse(fileName).spTree )
+        assert flattenTree( parser.read_species_tree(fileName) ) == expected
+        if not fileName.endswith(".xml"):
+            continue
+        with open(fileName, "rb") as IN:
+            assert flattenTree( parser.read_species_tree(IN) ) == expected
+
+
+@pytest.mark.parametrize("backend", [ "stdlib" , "auto" ])
+def test_read_species_tree_without_species_tree(tmp_path, backend):
+    parser = recPhyloXML_parser(backend = backend)
+
+    assert parser.read_species_tree( os.path.join(TESTFILES, "testAleTree.nwk.xml") ) is None
+
+    fileName = str(tmp_path / "noSpTree.xml.gz")
+    with gzip.open(fileName, "wt") as OUT:
+        OUT.write( recPhyloDocument([ ladderClade(i) for i in range(20) ]) )
+    assert parser.read_species_tree(fileName) is None
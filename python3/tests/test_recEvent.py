@@ -0,0 +1,90 @@
+import sys
+import pickle
+
+import pytest
+
+from RecEvent import RecEvent, EventKind, KIND_OTHER, EVENTKIND_CODES, EVENTTAGCORRESPONDANCE, EMPTY_ADDITIONNALINFO
+
+
+CODES = [ code for code in EVENTKIND_CODES if not code is None ]
+
+
+def getFields(e):
+    return ( e.kind , e.rawCode , e.eventCode , e.species , e.timeSlice , dict(e.additionnalInfo) )
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_event_code_normalization(code):
+    e = RecEvent(code, "A")
+    assert e.eventCode == code
+    assert EVENTKIND_CODES[e.kind] == code
+    assert e.rawCode is None
+
+    ## the recPhyloXML tag of the code gives an event written the same way
+    tagged = RecEvent(EVENTTAGCORRESPONDANCE[code], "A")
+    assert tagged.kind != KIND_OTHER
+    assert tagged.makeRecXMLstr({}) == e.makeRecXMLstr({})
+
+    ## the setter normalizes as the constructor does
+    other = RecEvent("unknownEvent", "A")
+    other.eventCode = EVENTTAGCORRESPONDANCE[code]
+    assert other.kind == tagged.kind
+    assert other.rawCode is None
+
+
+def test_unknown_event_code():
+    e = RecEvent("unknownEvent", "A", 3)
+    assert e.kind == KIND_OTHER
+    assert e.eventCode == "unknownEvent"
+    assert e.makeRecXMLstr({}) == '<unknownEvent speciesLocation="A" ts="3"></unknownEvent>'
+
+    e.eventCode = "D"
+    assert ( e.kind , e.rawCode , e.eventCode ) == ( EventKind.DUPLICATION , None , "D" )
+
+
+def test_shared_empty_additionnal_info():
+    e = RecEvent("D", "A", None, EMPTY_ADDITIONNALINFO)
+    assert e.additionnalInfo is EMPTY_ADDITIONNALINFO
+    with pytest.raises(TypeError):
+        e.additionnalInfo["confidence"] = "0.5"
+    assert len(EMPTY_ADDITIONNALINFO) == 0
+
+    ## any other mapping is copied
+    info = { "confidence" : "0.5" }
+    e = RecEvent("D", "A", None, info)
+    e.additionnalInfo["geneName"] = "g"
+    assert info == { "confidence" : "0.5" }
+
+
+def test_pickling():
+    events = [ RecEvent("D", "A", None, EMPTY_ADDITIONNALINFO) ,
+               RecEvent("leaf", "B", 2, { "geneName" : "g1" }) ,
+               RecEvent("unknownEvent", 7) ]
+
+    for e in events:
+        loaded = pickle.loads( pickle.dumps(e) )
+        assert getFields(loaded) == getFields(e)
+        assert loaded.makeRecXMLstr({}) == e.makeRecXMLstr({})
+        assert isinstance(loaded.kind, EventKind)
+
+    ## the shared empty mapping is restored, not a copy of it
+    assert pickle.loads( pickle.dumps(events[0]) ).additionnalInfo is EMPTY_ADDITIONNALINFO
+    loaded = pickle.loads( pickle.dumps(events[1]) )
+    loaded.additionnalInfo["confidence"] = "1"
+    assert not "confidence" in events[1].additionnalInfo
+
+
+def test_species_are_interned():
+    ## two equal str built at run time, which are distinct objects
+    species = [ "".join([ "species" , str(42) ]) , "".join([ "spe" , "cies42" ]) ]
+    assert not species[0] is species[1]
+
+    e = RecEvent("S", species[0])
+    assert e.species is sys.intern(species[1])
+    assert RecEvent("S", species[1]).species is e.species
+
+    assert pickle.loads( pickle.dumps(e) ).species is e.species
+
+    ## other identifiers are kept as they are
+    assert RecEvent("S", 42).species == 42
+    assert RecEvent("S", None).species is None
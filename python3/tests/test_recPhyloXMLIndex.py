@@ -0,0 +1,103 @@
+import os
+
+from ReconciledTreeBase import ReconciledTreeList
+from ReconciledTreeIO import recPhyloXML_parser
+from RecPhyloXMLIndex import INDEX_EXTENSION, buildRecPhyloXMLIndex, readRecPhyloXMLIndex, getRecPhyloXMLIndex
+from recPhyloXMLTestData import TESTFILES, SPTREE, ladderClade
+
+
+def familyTree(i, depth):
+    return '<recGeneTree><phylogeny rooted="true"><name>family' + str(i) + '</name>' + ladderClade(depth) + '</phylogeny></recGeneTree>'
+
+
+def writeFamilies(fileName, depths):
+    """ writes a file whose tree i is named familyi and is a ladder of depths[i] duplications, with a species tree between the first two trees """
+    clades = [ familyTree(i, d) for i, d in enumerate(depths) ]
+    with open(fileName, "w") as OUT:
+        OUT.write( '<?xml version="1.0"?>\n<recPhylo xmlns="http://www.recg.org">\n  ' + clades[0] + "\n  " + SPTREE + "\n" )
+        for c in clades[1:]:
+            OUT.write( "  <!-- <recGeneTree> in a comment -->" + c + "\n" )
+        OUT.write("</recPhylo>\n")
+
+
+def test_spans_give_the_trees(tmp_path):
+    fileName = str(tmp_path / "families.xml")
+    depths = [ 3 , 0 , 7 , 2 ]
+    writeFamilies(fileName, depths)
+
+    index = buildRecPhyloXMLIndex(fileName, withFamilyNames = True)
+    assert len(index) == len(depths)
+    assert index.familyNames == [ "family0" , "family1" , "family2" , "family3" ]
+
+    with open(fileName, "rb") as IN:
+        data = IN.read()
+
+    start, end = index.spTreeSpan
+    assert data[start:end].startswith(b"<spTree>") and data[start:end].endswith(b"</spTree>")
+
+    parser = recPhyloXML_parser(treeBackend = "light")
+    expected = parser.parse(fileName)
+    for (start, end), RT in zip(index.treeSpans, expected):
+        assert data[start:end].startswith(b"<recGeneTree>") and data[start:end].endswith(b"</recGeneTree>")
+        assert parser.parse_fragment( data[start:end] ).getTreeRecPhyloXMLLines() == RT.getTreeRecPhyloXMLLines()
+
+
+def test_written_index_is_read_back(tmp_path):
+    fileName = os.path.join(TESTFILES, "9999.nhx.xml")
+    index = buildRecPhyloXMLIndex(fileName, withFamilyNames = True)
+
+    indexFileName = str(tmp_path / ( "9999.nhx.xml" + INDEX_EXTENSION ))
+    index.write(indexFileName)
+    read = readRecPhyloXMLIndex(indexFileName, fileName)
+
+    assert read.treeSpans == index.treeSpans
+    assert read.spTreeSpan == index.spTreeSpan
+    assert read.familyNames == index.familyNames
+    assert read.isUpToDate()
+
+
+def test_stale_index_is_rebuilt(tmp_path):
+    fileName = str(tmp_path / "families.xml")
+    writeFamilies(fileName, [ 1 , 2 ])
+
+    index = getRecPhyloXMLIndex(fileName)
+    assert os.path.isfile(fileName + INDEX_EXTENSION)
+    assert len(index) == 2
+
+    ## the file changes : the index is detected as stale, and rebuilt
+    writeFamilies(fileName, [ 1 , 2 , 3 ])
+    stat = os.stat(fileName)
+    os.utime(fileName, ( stat.st_atime , stat.st_mtime + 10 ))
+
+    assert not readRecPhyloXMLIndex(fileName + INDEX_EXTENSION, fileName).isUpToDate()
+
+    index = getRecPhyloXMLIndex(fileName)
+    assert len(index) == 3
+    assert readRecPhyloXMLIndex(fileName + INDEX_EXTENSION, fileName).isUpToDate()
+
+    ## an index of the family names is built when it is asked for, even if the index is up to date
+    assert index.familyNames is None
+    assert getRecPhyloXMLIndex(fileName, withFamilyNames = True).familyNames == [ "family0" , "family1" , "family2" ]
+
+
+def test_trees_in_comments_are_not_indexed(tmp_path):
+    fileName = str(tmp_path / "comments.xml")
+    trees = [ familyTree(i, d) for i, d in enumerate([ 2 , 0 , 4 ]) ]
+    with open(fileName, "w") as OUT:
+        OUT.write( '<?xml version="1.0"?>\n<recPhylo>\n'
+                   '<!-- old: ' + familyTree(10, 1) + ' -->\n' + trees[0] + "\n"
+                   '<![CDATA[ ' + familyTree(11, 1) + ' ]]>\n' + SPTREE + "\n" + trees[1] + "\n"
+                   '<?note <recGeneTree> ?>\n' + trees[2] + "\n</recPhylo>\n" )
+
+    index = buildRecPhyloXMLIndex(fileName, withFamilyNames = True)
+    assert index.familyNames == [ "family0" , "family1" , "family2" ]
+
+    parser = recPhyloXML_parser(treeBackend = "light")
+    expected = [ RT.getTreeRecPhyloXMLLines() for RT in parser.parse(fileName) ]
+    assert len(expected) == 3
+
+    lazy = ReconciledTreeList.open_indexed(fileName, writeIndex = False, parser = parser)
+    assert [ RT.getTreeRecPhyloXMLLines() for RT in lazy ] == expected
+    assert lazy.hasSpTree()
+
+    assert [ RT.getTreeRecPhyloXMLLines() for RT in parser.parse_parallel(fileName, workers = 2) ] == expected
@@ -0,0 +1,68 @@
+import io
+import os
+
+import pytest
+
+from ReconciledTreeBase import ReconciledTreeList
+from RecPhyloXMLWriter import RecPhyloXMLWriter
+from ReconciledTreeIO import recPhyloXML_parser
+from recPhyloXMLTestData import TESTFILES, ladderClade, recPhyloDocument
+
+
+def test_closing_tag_only_on_success(tmp_path):
+    RT = recPhyloXML_parser().parse( io.BytesIO( recPhyloDocument([ ladderClade(2) ]).encode() ) )[0]
+
+    fileName = str(tmp_path / "complete.xml")
+    with RecPhyloXMLWriter(fileName) as writer:
+        writer.write_tree(RT)
+    with open(fileName) as IN:
+        assert IN.read().rstrip().endswith("</recPhylo>")
+
+    fileName = str(tmp_path / "truncated.xml.gz")
+    with pytest.raises(ValueError):
+        with RecPhyloXMLWriter(fileName) as writer:
+            writer.write_tree(RT)
+            raise ValueError("conversion failed")
+    assert writer.OUT.closed ## the handle is closed even on error
+
+    parser = recPhyloXML_parser()
+    with pytest.raises(Exception):
+        parser.parse(fileName) ## the truncated document is not well-formed
+
+
+def getWritten(write):
+    OUT = io.StringIO()
+    write(OUT)
+    return OUT.getvalue()
+
+
+@pytest.mark.parametrize("treeBackend", [ "ete3" , "light" ])
+@pytest.mark.parametrize("indent", [ "  " , None ])
+def test_parallel_write_is_identical_to_serial(tmp_path, treeBackend, indent):
+    fileName = str(tmp_path / "trees.xml")
+    with open(fileName, "w") as OUT:
+        OUT.write( recPhyloDocument([ ladderClade(d) for d in [ 0 , 3 , 3000 , 1 , 7 ] ]) )
+
+    parser = recPhyloXML_parser(treeBackend = treeBackend)
+    RTL = parser.parse( os.path.join(TESTFILES, "9999.nhx.xml") )
+    for RT in parser.parse(fileName):
+        RTL.append(RT)
+
+    serial = getWritten( lambda OUT : RTL.writeRecPhyloXML(OUT, indent = indent) )
+    assert serial == "\n".join( RTL.getRecPhyloXMLLines(indent = indent) ) + "\n"
+
+    assert getWritten( lambda OUT : RTL.writeRecPhyloXML(OUT, indent = indent, workers = 2) ) == serial
+    assert getWritten( lambda OUT : RTL.writeRecPhyloXML(OUT, indent = indent, workers = 2, window = 1) ) == serial
+
+    def writeStreamed(OUT):
+        with RecPhyloXMLWriter(OUT, indent = indent) as writer:
+            writer.write_species_tree(RTL.spTree)
+            writer.write_trees(iter(RTL), workers = 2, shardSize = 1)
+
+    assert getWritten(writeStreamed) == serial
+
+    ## the trees of an indexed file are serialized by the workers straight from their byte spans
+    with open(str(tmp_path / "serial.xml"), "w") as OUT:
+        OUT.write(serial)
+    lazy = ReconciledTreeList.open_indexed( str(tmp_path / "serial.xml") , writeIndex = False , parser = parser , maxResident = 0 )
+    assert getWritten( lambda OUT : lazy.writeRecPhyloXML(OUT, indent = indent, workers = 2) ) == serial
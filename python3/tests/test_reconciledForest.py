@@ -0,0 +1,68 @@
+import os
+import sys
+import subprocess
+
+from ReconciledTreeIO import recPhyloXML_parser
+from ReconciledForest import ReconciledForest
+from recPhyloXMLTestData import TESTFILES
+
+
+PYTHON3_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+## imports fail for ete3, then a saved forest is loaded and summarized with the lightweight backend
+NO_ETE3_SCRIPT = """
+import sys
+
+class BlockEte3:
+    def find_spec(self, name, path, target = None):
+        if name == "ete3" or name.startswith("ete3."):
+            raise ImportError("ete3 is blocked")
+
+sys.meta_path.insert(0, BlockEte3())
+
+from ReconciledForest import ReconciledForest
+from ReconciledTreeIO import recPhyloXML_parser
+
+forest = ReconciledForest.fromReconciledTreeList( recPhyloXML_parser(treeBackend = "light").parse(sys.argv[1]) )
+forest.save(sys.argv[2])
+forest = ReconciledForest.load(sys.argv[2], treeBackend = "light")
+print( sorted( forest.getEventsSummary(indexBySpecies = True) ) )
+print( forest.toReconciledTreeList().getRecPhyloXMLLines() == recPhyloXML_parser(treeBackend = "light").parse(sys.argv[1]).getRecPhyloXMLLines() )
+"""
+
+
+def test_forest_without_ete3(tmp_path):
+    fileName = os.path.join(TESTFILES, "reconciledTreeNOTUNG.0.ntg.xml")
+    result = subprocess.run( [ sys.executable , "-c" , NO_ETE3_SCRIPT , fileName , str(tmp_path / "forest") ],
+                             cwd = PYTHON3_DIR , capture_output = True , text = True )
+    assert result.returncode == 0 , result.stderr
+
+    expected = ReconciledForest.fromReconciledTreeList( recPhyloXML_parser(treeBackend = "light").parse(fileName) )
+    assert result.stdout.split("\n")[:2] == [ str( sorted( expected.getEventsSummary(indexBySpecies = True) ) ) , "True" ]
+
+
+def test_saved_forest_gives_back_the_trees(tmp_path):
+    RTL = recPhyloXML_parser().parse( os.path.join(TESTFILES, "testAleTree.nwk.xml") )
+    RTL.writeForest( str(tmp_path / "forest") )
+
+    forest = ReconciledForest.load( str(tmp_path / "forest") )
+    assert len(forest) == len(RTL)
+    assert forest.toReconciledTreeList().getRecPhyloXMLLines() == RTL.getRecPhyloXMLLines()
+
+
+def test_forest_trees_follow_the_backend(tmp_path):
+    from ReconciledTree import ReconciledTree
+    from LightReconciledTree import LightReconciledTree
+
+    fileName = os.path.join(TESTFILES, "reconciledTreeNOTUNG.0.ntg.xml")
+    for treeBackend , nodeClass in [ ( "ete3" , ReconciledTree ) , ( "light" , LightReconciledTree ) ]:
+        RTL = recPhyloXML_parser(treeBackend = treeBackend).parse(fileName)
+
+        forest = ReconciledForest.fromReconciledTreeList(RTL)
+        assert forest.treeBackend == treeBackend
+        assert type( forest.getTree(0) ) is nodeClass
+
+        RTL.writeForest( str(tmp_path / treeBackend) )
+        forest = ReconciledForest.load( str(tmp_path / treeBackend) , treeBackend = treeBackend )
+        assert all( type(node) is nodeClass for node in forest.getTree(-1).traverse() )
+        assert forest.toReconciledTreeList().getRecPhyloXMLLines() == RTL.getRecPhyloXMLLines()
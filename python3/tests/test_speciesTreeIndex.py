@@ -0,0 +1,44 @@
+import os
+import itertools
+
+import pytest
+
+from ReconciledTreeIO import recPhyloXML_parser
+from SpeciesTreeIndex import SpeciesTreeIndex
+from recPhyloXMLTestData import TESTFILES, SPTREE
+
+
+SPECIES_TREE_FILES = [ "9999.nhx.xml" , "NOTUNGtest_gTree.txt.reconciled.xml" , "reconciledTreeNOTUNG.0.ntg.xml" ]
+
+
+def getSpeciesTrees(tmp_path):
+    fileName = str(tmp_path / "spTree.xml")
+    with open(fileName, "w") as OUT:
+        OUT.write( "<recPhylo>" + SPTREE + "</recPhylo>" )
+
+    parser = recPhyloXML_parser()
+    return [ parser.read_species_tree(f) for f in [ os.path.join(TESTFILES, name) for name in SPECIES_TREE_FILES ] + [ fileName ] ]
+
+
+def test_index_agrees_with_ete3(tmp_path):
+    for spTree in getSpeciesTrees(tmp_path):
+        index = SpeciesTreeIndex(spTree)
+        nodes = list( spTree.traverse() )
+
+        for a , b in itertools.product(nodes, repeat = 2):
+            assert index.getLCA([ a.name , b.name ]) == spTree.get_common_ancestor(a, b).name
+            assert index.isAncestor(a.name, b.name) == ( a is b or a in b.get_ancestors() )
+
+        for a , b , c in zip(nodes, nodes[1:], nodes[2:]):
+            assert index.getLCA([ a.name , b.name , c.name ]) == spTree.get_common_ancestor(a, b, c).name
+
+        for node in nodes:
+            sisters = node.get_sisters()
+            if len(sisters) == 0:
+                with pytest.raises(Exception, match = "has no sister"):
+                    index.getSister(node.name)
+            else:
+                assert index.getSister(node.name) == sisters[0].name
+
+            assert index.getParent(node.name) == ( None if node.up is None else node.up.name )
+            assert index.getDepth(node.name) == len( node.get_ancestors() )